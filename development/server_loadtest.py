@@ -0,0 +1,292 @@
+#!/usr/bin/env python2
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Load test for the multiplayer server.
+
+Simulates many clients in one process. Clients are grouped into games: the
+first client of every game creates it, the others look it up with
+cmd_listgames and join. When all games are running, every client sends
+game data at a fixed rate, which the server relays to the other players of
+the game. The script reports how long the phases took, the latency of list
+requests and the throughput and latency of the relayed game data.
+
+Start a server first, e.g.
+  ./run_server.py -h 127.0.0.1 -p 2002
+and run
+  python2 development/server_loadtest.py -h 127.0.0.1 -p 2002 -c 2000
+"""
+
+import getopt
+import os
+import struct
+import sys
+import time
+import uuid
+
+sys.path.append(os.getcwd())
+from horizons.network import enet, packets
+from horizons.network.common import Game
+from horizons.network.connection import SERVER_PROTOCOL
+
+if not enet:
+	raise Exception("Could not find enet module.")
+
+# relayed game data, the server doesn't look into it
+GAMEDATA_HEADER = struct.Struct('<4sId')
+GAMEDATA_MAGIC = 'LDTS'
+
+
+class State(object):
+	Connecting = 0
+	Listing = 1
+	Lobby = 2
+	Ready = 3
+	Running = 4
+
+
+class SimulatedClient(object):
+	def __init__(self, index, game, slot, peer):
+		self.index = index
+		self.game = game # index of the game
+		self.slot = slot # position inside of the game, 0 is the creator
+		self.peer = peer
+		self.key = str(index)
+		self.sid = None
+		self.state = State.Connecting
+		self.list_sent = None
+
+	@property
+	def mapname(self):
+		return u"loadtest-%d" % self.game
+
+	def send(self, packet):
+		packet.sid = self.sid
+		self.peer.send(0, enet.Packet(packet.serialize(), enet.PACKET_FLAG_RELIABLE))
+
+
+def percentile(values, fraction):
+	if not values:
+		return 0.0
+	values = sorted(values)
+	return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class LoadTest(object):
+	def __init__(self, hostname, port, clients, players, version, rate, payload):
+		self.address = enet.Address(hostname, port)
+		self.players = players
+		self.version = version
+		self.rate = rate
+		self.payload = max(payload, GAMEDATA_HEADER.size)
+		# the server tells players apart by address, so the players of a game have to
+		# use different hosts (ports): host i is used for slot i of every game
+		games = clients // players
+		self.hosts = [enet.Host(None, games, 0, 0, 0) for i in xrange(players)]
+		self.clients = []
+		for game in xrange(games):
+			for slot in xrange(players):
+				peer = self.hosts[slot].connect(self.address, 1, SERVER_PROTOCOL)
+				client = SimulatedClient(len(self.clients), game, slot, peer)
+				# enet doesn't keep a reference to peer.data, the client does
+				peer.data = client.key
+				self.clients.append(client)
+		self.list_latencies = []
+		self.relay_latencies = []
+		self.sent = 0
+		self.received = 0
+		self.errors = 0
+
+	def count(self, state):
+		return sum(1 for client in self.clients if client.state >= state)
+
+	def service(self, timeout=0):
+		"""Handles all pending events of all hosts.
+		@return: number of handled events"""
+		handled = 0
+		for host in self.hosts:
+			event = host.service(timeout)
+			while event is not None and event.type != enet.EVENT_TYPE_NONE:
+				handled += 1
+				client = self.clients[int(event.peer.data)]
+				if event.type == enet.EVENT_TYPE_RECEIVE:
+					self.receive(client, event.packet.data)
+				elif event.type == enet.EVENT_TYPE_DISCONNECT:
+					self.errors += 1
+				event = host.check_events()
+		return handled
+
+	def receive(self, client, data):
+		if data.startswith(GAMEDATA_MAGIC):
+			self.received += 1
+			self.relay_latencies.append(time.time() - GAMEDATA_HEADER.unpack_from(data)[2])
+			return
+
+		packet = packets.unserialize(data)
+		if isinstance(packet, packets.server.cmd_session):
+			client.sid = packet.sid
+			if client.slot == 0:
+				client.send(packets.client.cmd_creategame(self.version, uuid.uuid4().hex,
+					u"creator%d" % client.index, 1, u"Load test", client.mapname, self.players))
+				client.state = State.Lobby
+			else:
+				self.list_games(client)
+		elif isinstance(packet, packets.server.data_gameslist):
+			self.list_latencies.append(time.time() - client.list_sent)
+			if packet.games:
+				client.send(packets.client.cmd_joingame(packet.games[0].uuid, self.version, uuid.uuid4().hex,
+					u"player%d" % client.index, client.slot + 1))
+				client.state = State.Lobby
+			else:
+				client.list_sent = None # the game hasn't been created yet, try again later
+		elif isinstance(packet, packets.server.data_gamestate):
+			game = packet.game
+			if client.state == State.Lobby and game.state == Game.State.Open and game.playercnt == self.players:
+				client.send(packets.client.cmd_toggleready())
+				client.state = State.Ready
+		elif isinstance(packet, packets.server.cmd_preparegame):
+			client.send(packets.client.cmd_preparedgame())
+		elif isinstance(packet, packets.server.cmd_startgame):
+			client.state = State.Running
+		elif isinstance(packet, (packets.cmd_error, packets.cmd_fatalerror)):
+			print "Client %d: %s" % (client.index, packet.errorstr)
+			self.errors += 1
+
+	def list_games(self, client):
+		client.state = State.Listing
+		client.list_sent = time.time()
+		client.send(packets.client.cmd_listgames(self.version, client.mapname, self.players))
+
+	def wait_for(self, state, timeout):
+		start = time.time()
+		while self.count(state) < len(self.clients):
+			if time.time() - start > timeout:
+				print "Timeout: only %d of %d clients reached state %d" % (self.count(state), len(self.clients), state)
+				return False
+			if not self.service():
+				for client in self.clients:
+					if client.state == State.Listing and client.list_sent is None:
+						self.list_games(client)
+				time.sleep(0.001)
+		print "%d clients reached state %d after %.2fs" % (len(self.clients), state, time.time() - start)
+		return True
+
+	def relay(self, duration):
+		payload = '\0' * (self.payload - GAMEDATA_HEADER.size)
+		interval = 1.0 / self.rate
+		start = time.time()
+		next_send = start
+		while time.time() - start < duration:
+			now = time.time()
+			if now >= next_send:
+				for client in self.clients:
+					data = GAMEDATA_HEADER.pack(GAMEDATA_MAGIC, client.index, time.time()) + payload
+					client.peer.send(0, enet.Packet(data, enet.PACKET_FLAG_RELIABLE))
+					self.sent += 1
+				for host in self.hosts:
+					host.flush()
+				next_send += interval
+			if not self.service():
+				time.sleep(0.001)
+		# collect packets that are still on their way
+		end = time.time()
+		while self.received < self.sent * (self.players - 1) and time.time() - end < 5:
+			if not self.service():
+				time.sleep(0.001)
+		elapsed = time.time() - start
+
+		print "relay: sent %d, received %d packets (%.0f/s) in %.2fs" % (self.sent, self.received,
+			self.received / elapsed, elapsed)
+		print "relay latency: mean %.1fms, median %.1fms, 99%% %.1fms" % (
+			1000 * sum(self.relay_latencies) / max(1, len(self.relay_latencies)),
+			1000 * percentile(self.relay_latencies, 0.5), 1000 * percentile(self.relay_latencies, 0.99))
+
+	def run(self, duration, timeout):
+		if not self.wait_for(State.Lobby, timeout):
+			return False
+		print "list latency: median %.1fms, 99%% %.1fms (%d requests)" % (1000 * percentile(self.list_latencies, 0.5),
+			1000 * percentile(self.list_latencies, 0.99), len(self.list_latencies))
+		if not self.wait_for(State.Running, timeout):
+			return False
+		self.relay(duration)
+		print "errors: %d" % self.errors
+		return True
+
+	def disconnect(self):
+		for client in self.clients:
+			client.peer.disconnect_later()
+		for i in xrange(100):
+			self.service()
+			time.sleep(0.01)
+
+
+def usage():
+	print "Usage: %s -h host [-p port] [-c clients] [-g players per game] [-r packets per second]" \
+		" [-s payload size] [-d duration] [-v clientversion]" % (sys.argv[0])
+
+
+def main():
+	hostname = None
+	port = 2002
+	clients = 1000
+	players = 2
+	rate = 10
+	payload = 100
+	duration = 10
+	version = u"loadtest"
+
+	try:
+		opts, args = getopt.getopt(sys.argv[1:], 'h:p:c:g:r:s:d:v:')
+		for (key, value) in opts:
+			if key == '-h':
+				hostname = value
+			elif key == '-p':
+				port = int(value)
+			elif key == '-c':
+				clients = int(value)
+			elif key == '-g':
+				players = int(value)
+			elif key == '-r':
+				rate = float(value)
+			elif key == '-s':
+				payload = int(value)
+			elif key == '-d':
+				duration = float(value)
+			elif key == '-v':
+				version = unicode(value)
+	except (getopt.GetoptError, ValueError) as err:
+		print err
+		usage()
+		sys.exit(1)
+	if hostname is None or players < 2 or clients < players:
+		usage()
+		sys.exit(1)
+
+	test = LoadTest(hostname, port, clients, players, version, rate, payload)
+	try:
+		success = test.run(duration, timeout=max(30, clients / 20))
+	finally:
+		test.disconnect()
+	sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+	main()
@@ -40,11 +40,12 @@ from personalitymanager import PersonalityManager
 from landmanager import LandManager
 from settlementmanager import SettlementManager
 from unitbuilder import UnitBuilder
-from constants import GOAL_RESULT
+from constants import GOAL_RESULT, WORK_COST
 from basicbuilder import BasicBuilder
 from specialdomestictrademanager import SpecialDomesticTradeManager
 from internationaltrademanager import InternationalTradeManager
 from settlementfounder import SettlementFounder
+from workscheduler import AIWorkScheduler
 from horizons.ai.aiplayer.combat.unitmanager import UnitManager
 
 # all subclasses of AbstractBuilding have to be imported here to register the available buildings
@@ -93,6 +94,7 @@ class AIPlayer(GenericAI):
 	log = logging.getLogger("ai.aiplayer")
 	tick_interval = 32
 	tick_long_interval = 128
+	work_budget = 16 # work units per tick, see AIWorkScheduler
 
 	def __init__(self, session, id, name, color, clientid, difficulty_level, **kwargs):
 		super(AIPlayer, self).__init__(session, id, name, color, clientid, difficulty_level, **kwargs)
@@ -151,6 +153,7 @@ class AIPlayer(GenericAI):
 		self.behavior_manager = BehaviorManager(self)
 		self.settlement_expansions = []  # [(coords, settlement)]
 		self.goals = [DoNothingGoal(self)]
+		self.work_scheduler = AIWorkScheduler(self.work_budget)
 		self.special_domestic_trade_manager = SpecialDomesticTradeManager(self)
 		self.international_trade_manager = InternationalTradeManager(self)
 		SettlementRangeChanged.subscribe(self._on_settlement_range_changed)
@@ -313,13 +316,30 @@ class AIPlayer(GenericAI):
 
 	def tick(self):
 		Scheduler().add_new_object(Callback(self.tick), self, run_in=self.tick_interval)
+		if self.work_scheduler.busy:
+			# the work of the previous tick continues within the budget, running it all at once
+			# would stall this tick. Its work isn't queued again to not fall further behind.
+			self.log.info('%s work of the previous tick not finished, skipping a tick', self)
+			return
+		self.work_scheduler.add(self._get_tick_work())
+		self.work_scheduler.run()
+
+	def _get_tick_work(self):
+		"""Generator doing the work of a tick, it yields (label, cost) after every step (see AIWorkScheduler)."""
 		self.settlement_founder.tick()
+		yield ('SettlementFounder.tick', WORK_COST.MANAGER_TICK)
 		self.handle_enemy_expansions()
-		self.handle_settlements()
+		yield ('AIPlayer.handle_enemy_expansions', WORK_COST.MANAGER_TICK)
+		for step in self._get_handle_settlements_work():
+			yield step
 		self.special_domestic_trade_manager.tick()
+		yield ('SpecialDomesticTradeManager.tick', WORK_COST.MANAGER_TICK)
 		self.international_trade_manager.tick()
+		yield ('InternationalTradeManager.tick', WORK_COST.MANAGER_TICK)
 		self.unit_manager.tick()
+		yield ('UnitManager.tick', WORK_COST.MANAGER_TICK)
 		self.combat_manager.tick()
+		yield ('CombatManager.tick', WORK_COST.MANAGER_TICK)
 
 	def tick_long(self):
 		"""
@@ -328,14 +348,18 @@ class AIPlayer(GenericAI):
 		Scheduler().add_new_object(Callback(self.tick_long), self, run_in=self.tick_long_interval)
 		self.strategy_manager.tick()
 
-	def handle_settlements(self):
+	def _get_handle_settlements_work(self):
+		"""Generator updating the goals and executing the most important ones, it yields (label, cost)
+		after every step."""
 		goals = []
 		for goal in self.goals:
 			if goal.can_be_activated:
 				goal.update()
 				goals.append(goal)
-		for settlement_manager in self.settlement_managers:
-			settlement_manager.tick(goals)
+				yield (goal.__class__.__name__ + '.update', WORK_COST.GOAL_UPDATE)
+		for settlement_manager in self.settlement_managers[:]:
+			for step in settlement_manager.get_tick_work(goals):
+				yield step
 		goals.sort(reverse=True)
 
 		settlements_blocked = set()  # set([settlement_manager_id, ...])
@@ -345,6 +369,7 @@ class AIPlayer(GenericAI):
 			if isinstance(goal, SettlementGoal) and goal.settlement_manager.worldid in settlements_blocked:
 				continue  # can't build anything in this settlement
 			result = goal.execute()
+			yield (goal.__class__.__name__ + '.execute', WORK_COST.GOAL_EXECUTE)
 			if result == GOAL_RESULT.SKIP:
 				self.log.info('%s, skipped goal %s', self, goal)
 			elif result == GOAL_RESULT.BLOCK_SETTLEMENT_RESOURCE_USAGE:
@@ -474,6 +499,7 @@ class AIPlayer(GenericAI):
 
 	@classmethod
 	def clear_caches(cls):
+		AbstractBuilding.clear_cache()
 		BasicBuilder.clear_cache()
 		AbstractFarm.clear_cache()
 
@@ -506,6 +532,8 @@ class AIPlayer(GenericAI):
 		self.goals = None
 		self.special_domestic_trade_manager = None
 		self.international_trade_manager = None
+		self.work_scheduler.end()
+		self.work_scheduler = None
 		self.strategy_manager.end()
 		self.strategy_manager = None
 		super(AIPlayer, self).end()
@@ -21,7 +21,8 @@
 
 import math
 import logging
-import operator
+
+from heapq import heapify, heappop
 
 from horizons.ai.aiplayer.constants import BUILD_RESULT
 from horizons.entities import Entities
@@ -30,6 +31,32 @@ from horizons.util.python import decorators
 from horizons.world.production.productionline import ProductionLine
 from horizons.world.production.producer import Producer
 
+class RankedEvaluators(object):
+	"""Iterable over BuildingEvaluators in the order of decreasing value.
+
+	The evaluators are kept in a heap and only sorted as far as they are iterated over, usually
+	just the first few are needed. Evaluators of equal value keep their original order, which
+	makes the result the same as sorting them by value in reverse.
+	"""
+
+	def __init__(self, evaluators):
+		self._heap = [(-evaluator.value, i, evaluator) for i, evaluator in enumerate(evaluators)]
+		heapify(self._heap)
+		self._ranked = [] # the evaluators that have been taken out of the heap so far
+
+	def __len__(self):
+		return len(self._heap) + len(self._ranked)
+
+	def __iter__(self):
+		i = 0
+		while True:
+			if i == len(self._ranked):
+				if not self._heap:
+					return
+				self._ranked.append(heappop(self._heap)[2])
+			yield self._ranked[i]
+			i += 1
+
 class AbstractBuilding(object):
 	"""
 	An object of this class tells the AI how to build a specific type of building.
@@ -58,6 +85,11 @@ class AbstractBuilding(object):
 	buildings = {} # building_id: AbstractBuilding instance
 	_available_buildings = {} # building_id: subclass of AbstractBuilding
 
+	# whether the evaluators only depend on the plan of the production builder and the buildings
+	# of the island. In that case they are reused until one of them changes.
+	cache_evaluators = True
+	__evaluator_cache = {} # (settlement manager worldid, building_id): ((island change id, production builder change id), RankedEvaluators)
+
 	def __init_production_lines(self):
 		production_lines = self._get_producer_building().get_component_template(Producer)['productionlines']
 		for key, value in production_lines.iteritems():
@@ -176,12 +208,28 @@ class AbstractBuilding(object):
 				options.append(evaluator)
 		return options
 
+	def get_ranked_evaluators(self, settlement_manager, resource_id):
+		"""Return the BuildingEvaluators for this building type in the given settlement as RankedEvaluators."""
+		if not self.cache_evaluators:
+			return RankedEvaluators(self.get_evaluators(settlement_manager, resource_id))
+
+		production_builder = settlement_manager.production_builder
+		current_cache_changes = (production_builder.island.last_change_id, production_builder.last_change_id)
+		key = (settlement_manager.worldid, self.id)
+		if key not in self.__evaluator_cache or self.__evaluator_cache[key][0] != current_cache_changes:
+			self.__evaluator_cache[key] = (current_cache_changes, RankedEvaluators(self.get_evaluators(settlement_manager, resource_id)))
+		return self.__evaluator_cache[key][1]
+
+	@classmethod
+	def clear_cache(cls):
+		cls.__evaluator_cache.clear()
+
 	def build(self, settlement_manager, resource_id):
 		"""Try to build the best possible instance of this building in the given settlement. Returns (BUILD_RESULT constant, building instance)."""
 		if not self.have_resources(settlement_manager):
 			return (BUILD_RESULT.NEED_RESOURCES, None)
 
-		for evaluator in sorted(self.get_evaluators(settlement_manager, resource_id), key=operator.attrgetter('value'), reverse=True):
+		for evaluator in self.get_ranked_evaluators(settlement_manager, resource_id):
 			result = evaluator.execute()
 			if result[0] != BUILD_RESULT.IMPOSSIBLE:
 				return result
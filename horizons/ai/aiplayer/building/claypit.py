@@ -29,6 +29,8 @@ from horizons.component.storagecomponent import StorageComponent
 from horizons.entities import Entities
 
 class AbstractClayPit(AbstractBuilding):
+	cache_evaluators = False # the locations depend on the remaining clay
+
 	def iter_potential_locations(self, settlement_manager):
 		building_class = Entities.buildings[BUILDINGS.CLAY_PIT]
 		for building in settlement_manager.settlement.buildings_by_id.get(BUILDINGS.CLAY_DEPOSIT, []):
@@ -27,6 +27,8 @@ from horizons.constants import BUILDINGS
 from horizons.util.python import decorators
 
 class AbstractDoctor(AbstractBuilding):
+	cache_evaluators = False # the evaluators depend on the village plan
+
 	def iter_potential_locations(self, settlement_manager):
 		spots_in_settlement = settlement_manager.settlement.buildability_cache.cache[(2, 2)]
 		village_builder = settlement_manager.village_builder
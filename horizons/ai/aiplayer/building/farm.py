@@ -140,6 +140,8 @@ class FarmOptionCache(object):
 		return self._positive_alignment
 
 class AbstractFarm(AbstractBuilding):
+	cache_evaluators = False # the evaluators have their own option cache
+
 	@property
 	def directly_buildable(self):
 		""" farms have to be triggered by fields """
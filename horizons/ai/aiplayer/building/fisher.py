@@ -33,6 +33,8 @@ from horizons.util.shapes import distances
 from horizons.scheduler import Scheduler
 
 class AbstractFisher(AbstractBuilding):
+	cache_evaluators = False # the locations are sampled randomly and the fish deposits change over time
+
 	def get_production_level(self, building, resource_id):
 		return self.get_expected_production_level(resource_id) * building.get_non_paused_utilization()
 
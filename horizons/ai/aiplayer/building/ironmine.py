@@ -29,6 +29,8 @@ from horizons.component.storagecomponent import StorageComponent
 from horizons.entities import Entities
 
 class AbstractIronMine(AbstractBuilding):
+	cache_evaluators = False # the locations depend on the remaining iron
+
 	def iter_potential_locations(self, settlement_manager):
 		building_class = Entities.buildings[BUILDINGS.MOUNTAIN]
 		for building in settlement_manager.settlement.buildings_by_id.get(BUILDINGS.MOUNTAIN, []):
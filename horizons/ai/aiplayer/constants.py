@@ -37,6 +37,13 @@ class GOAL_RESULT:
 	BLOCK_SETTLEMENT_RESOURCE_USAGE = 1 # don't execute any goal that uses resources in this settlement
 	BLOCK_ALL_BUILDING_ACTIONS = 2 # no more building during this tick
 
+class WORK_COST:
+	"""Estimated costs of the steps of an AI tick in work units, see AIWorkScheduler"""
+	GOAL_UPDATE = 1
+	GOAL_EXECUTE = 4
+	SETTLEMENT_TICK = 3 # the start or the end of a settlement manager tick
+	MANAGER_TICK = 2 # the tick of one of the other managers
+
 class BUILDING_PURPOSE:
 	NONE = 1
 	RESERVED = 2
@@ -27,6 +27,7 @@ from horizons.ai.aiplayer.productionbuilder import ProductionBuilder
 from horizons.ai.aiplayer.productionchain import ProductionChain
 from horizons.ai.aiplayer.resourcemanager import ResourceManager
 from horizons.ai.aiplayer.trademanager import TradeManager
+from horizons.ai.aiplayer.constants import WORK_COST
 
 from horizons.ai.aiplayer.goal.boatbuilder import BoatBuilderGoal
 from horizons.ai.aiplayer.goal.depositcoverage import ClayDepositCoverageGoal, MountainCoverageGoal
@@ -390,23 +391,28 @@ class SettlementManager(WorldObject):
 		self.resource_manager.manager_buysell()
 		self.resource_manager.finish_tick()
 
-	def _add_goals(self, goals):
-		"""Add the settlement's goals that can be activated to the goals list."""
+	def get_tick_work(self, goals):
+		"""Refresh the settlement info and add its goals to the player's goal list.
+		This is a generator, it yields (label, cost) after every step (see AIWorkScheduler)."""
+		feeder_island = self.feeder_island
+		if feeder_island:
+			self._start_feeder_tick()
+		else:
+			self._start_general_tick()
+		yield ('SettlementManager.start_tick', WORK_COST.SETTLEMENT_TICK)
+
+		# add the settlement's goals that can be activated to the goals list
 		for goal in self._goals:
 			if goal.can_be_activated:
 				goal.update()
 				goals.append(goal)
+				yield (goal.__class__.__name__ + '.update', WORK_COST.GOAL_UPDATE)
 
-	def tick(self, goals):
-		"""Refresh the settlement info and add its goals to the player's goal list."""
-		if self.feeder_island:
-			self._start_feeder_tick()
-			self._add_goals(goals)
+		if feeder_island:
 			self._end_feeder_tick()
 		else:
-			self._start_general_tick()
-			self._add_goals(goals)
 			self._end_general_tick()
+		yield ('SettlementManager.end_tick', WORK_COST.SETTLEMENT_TICK)
 
 	def add_building(self, building):
 		"""Called when a new building is added to the settlement (the building already exists during the call)."""
@@ -0,0 +1,106 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import time
+
+from collections import deque
+
+from horizons.scheduler import Scheduler
+from horizons.util.python import decorators
+
+class AIWorkScheduler(object):
+	"""Runs the work of an AI player in slices, so that a single tick doesn't take too long.
+
+	Work is added as a generator that does one step of work per iteration and then yields the
+	tuple (label, cost). The cost is a fixed estimate in work units, the label names the kind
+	of work for the statistics. Every tick, steps are run until the budget of work units has
+	been used up, the rest of the work continues in the next tick.
+
+	The budget is not measured in time to keep the slicing the same on every machine, which
+	is necessary for multiplayer games and replays. Measured times are only collected as
+	statistics, see get_statistics.
+
+	Work that hasn't been finished is not saved, the next AI tick starts over.
+	"""
+
+	log = logging.getLogger("ai.aiplayer.workscheduler")
+
+	def __init__(self, budget):
+		"""
+		@param budget: number of work units to spend per tick
+		"""
+		self.budget = budget
+		self._work = deque() # generators
+		self._scheduled = False
+		self._statistics = {} # { label: [steps, work units, seconds] }
+
+	def end(self):
+		if self._scheduled:
+			Scheduler().rem_all_classinst_calls(self)
+		self._work = None
+		self._scheduled = False
+
+	@property
+	def busy(self):
+		return bool(self._work)
+
+	def add(self, work):
+		"""Adds work that is run after all of the work that has been added before.
+		@param work: generator yielding (label, cost) after every step"""
+		self._work.append(work)
+
+	def run(self):
+		"""Runs steps until the budget of this tick is used up and schedules the rest"""
+		self._scheduled = False
+		units = 0
+		while self._work and units < self.budget:
+			units += self._step()
+		if self._work:
+			self._scheduled = True
+			Scheduler().add_new_object(self.run, self, run_in=1)
+
+	def _step(self):
+		"""Runs the next step of the first work.
+		@return: the cost of the step"""
+		start = time.time()
+		try:
+			label, cost = next(self._work[0])
+		except StopIteration:
+			self._work.popleft()
+			return 0
+		duration = time.time() - start
+
+		if label in self._statistics:
+			entry = self._statistics[label]
+			entry[0] += 1
+			entry[1] += cost
+			entry[2] += duration
+		else:
+			self._statistics[label] = [1, cost, duration]
+		return cost
+
+	def get_statistics(self):
+		"""@return: dict { label: {'steps', 'units', 'time'} } for profiling"""
+		return dict((label, {'steps': steps, 'units': units, 'time': duration})
+		            for label, (steps, units, duration) in self._statistics.iteritems())
+
+decorators.bind_all(AIWorkScheduler)
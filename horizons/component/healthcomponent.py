@@ -48,7 +48,7 @@ class HealthComponent(Component):
 		self.add_damage_dealt_listener(self.redraw_health)
 
 	def save(self, db):
-		db("INSERT INTO unit_health(owner_id, health) VALUES(?, ?)", self.instance.worldid, self.health)
+		db.add_row("INSERT INTO unit_health(owner_id, health) VALUES(?, ?)", self.instance.worldid, self.health)
 
 	def load(self, db, worldid):
 		self.health = db.get_health(worldid)
@@ -81,17 +81,17 @@ class NamedComponent(Component):
 class ShipNameComponent(NamedComponent):
 
 	def _possible_names(self):
-		names = self.session.db("SELECT name FROM shipnames WHERE for_player = 1")
+		names = self.session.db.cached_query("SELECT name FROM shipnames WHERE for_player = 1")
 		return [x[0] for x in names]
 
 class PirateShipNameComponent(NamedComponent):
 
 	def _possible_names(self):
-		names = self.session.db("SELECT name FROM shipnames WHERE for_pirate = 1")
+		names = self.session.db.cached_query("SELECT name FROM shipnames WHERE for_pirate = 1")
 		return [x[0] for x in names]
 
 class SettlementNameComponent(NamedComponent):
 
 	def _possible_names(self):
-		names = self.session.db("SELECT name FROM citynames WHERE for_player = 1")
+		names = self.session.db.cached_query("SELECT name FROM citynames WHERE for_player = 1")
 		return [x[0] for x in names]
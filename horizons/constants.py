@@ -355,6 +355,7 @@ class GAME:
 
 	WORLD_WORLDID = 0 # worldid of World object
 	MAX_TICKS = None # exit after on tick MAX_TICKS (disabled by setting to None)
+	CALLBACK_PROFILE = None # file to write the profile of scheduled calls to on session end (disabled by None)
 
 # Map related constants
 class MAP:
@@ -478,6 +479,7 @@ class PATHS:
 	DEFAULT_WINDOW_ICON_PATH = os.path.join("content", "gui", "images", "logos", "uh_32.png")
 	MAC_WINDOW_ICON_PATH = os.path.join("content", "gui", "icons", "Icon.icns")
 	ATLAS_METADATA_PATH = os.path.join(USER_DIR, "atlas-metadata.cache")
+	MINIMAP_CACHE_DIR = os.path.join(USER_DIR, "cache", "minimaps")
 
 	# paths relative to uh dir
 	ACTION_SETS_DIRECTORY = os.path.join("content", "gfx")
@@ -428,6 +428,8 @@ class IngameGui(LivingObject):
 			self.windows.toggle(self.logbook)
 		elif action == _Actions.DEBUG and VERSION.IS_DEV_VERSION:
 			import pdb; pdb.set_trace()
+		elif action == _Actions.PROFILE_CALLBACKS and VERSION.IS_DEV_VERSION:
+			self.session.toggle_callback_profiler()
 		elif action == _Actions.BUILD_TOOL:
 			self.show_build_menu()
 		elif action == _Actions.ROTATE_RIGHT:
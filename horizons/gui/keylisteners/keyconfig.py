@@ -43,7 +43,7 @@ class KeyConfig(object):
 	                'TRANSLUCENCY', 'TILE_OWNER_HIGHLIGHT',
 	                'HEALTH_BAR', 'SHOW_SELECTED', 'REMOVE_SELECTED',
 	                'HELP', 'SCREENSHOT',
-	                'DEBUG', 'CONSOLE', 'GRID', 'COORD_TOOLTIP')
+	                'DEBUG', 'CONSOLE', 'GRID', 'COORD_TOOLTIP', 'PROFILE_CALLBACKS')
 
 	def __init__(self):
 		_Actions = self._Actions
@@ -54,7 +54,7 @@ class KeyConfig(object):
 		self.keyval_action_mappings = {}
 		self.loadKeyConfiguration()
 
-		self.requires_shift = set([_Actions.DEBUG])
+		self.requires_shift = set([_Actions.DEBUG, _Actions.PROFILE_CALLBACKS])
 
 	def loadKeyConfiguration(self):
 		self.keyval_action_mappings = {}
@@ -124,7 +124,7 @@ class KeyConfig(object):
 	def get_bindable_actions_by_name(self):
 		"""Returns a list of the names of the actions which can be binded in the hotkeys interface"""
 		actions = [str(x) for x in self._Actions]
-		unbindable_actions = ['DEBUG', 'ESCAPE']
+		unbindable_actions = ['DEBUG', 'PROFILE_CALLBACKS', 'ESCAPE']
 		for action in unbindable_actions:
 			actions.remove(action)
 		return actions
@@ -38,7 +38,6 @@ from horizons.network.networkinterface import NetworkInterface
 from horizons.savegamemanager import SavegameManager
 from horizons.util.color import Color
 from horizons.util.python.callback import Callback
-from horizons.world import load_raw_world
 
 
 class MultiplayerMenu(Window):
@@ -352,12 +351,13 @@ class CreateGame(Window):
 		if self._map_preview:
 			self._map_preview.end()
 
-		world = load_raw_world(map_file)
+		minimap_icon = self._gui.findChild(name='map_preview_minimap')
+		data = Minimap.get_map_preview_data(map_file, (minimap_icon.width, minimap_icon.height))
 		self._map_preview = Minimap(
-			self._gui.findChild(name='map_preview_minimap'),
+			minimap_icon,
 			session=None,
 			view=None,
-			world=world,
+			world=None,
 			targetrenderer=horizons.globals.fife.targetrenderer,
 			imagemanager=horizons.globals.fife.imagemanager,
 			cam_border=False,
@@ -366,7 +366,7 @@ class CreateGame(Window):
 			on_click=None,
 			preview=True)
 
-		self._map_preview.draw()
+		self._map_preview.draw_data(data)
 
 
 class GameLobby(Window):
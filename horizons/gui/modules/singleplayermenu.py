@@ -39,9 +39,9 @@ from horizons.gui.widgets.minimap import Minimap
 from horizons.gui.windows import Window
 from horizons.savegamemanager import SavegameManager
 from horizons.scenario import ScenarioEventHandler, InvalidScenarioFileFormat
+from horizons.util.minimappreviewcache import MinimapPreviewCache
 from horizons.util.python.callback import Callback
 from horizons.util.random_map import generate_random_map, generate_random_seed
-from horizons.util.shapes import Rect
 from horizons.util.startgameoptions import StartGameOptions
 
 
@@ -192,6 +192,7 @@ class RandomMapWidget(object):
 		self._last_map_parameters = None
 		self._preview_process = None
 		self._preview_output = None
+		self._preview_key = None # key of the preview in the MinimapPreviewCache
 		self._map_preview = None
 
 	def end(self):
@@ -287,10 +288,20 @@ class RandomMapWidget(object):
 
 		if self._preview_process:
 			self._preview_process.kill() # process exists, therefore up is scheduled already
+			self._preview_process = None
 
-		# launch process in background to calculate minimap data
 		minimap_icon = self._gui.findChild(name='map_preview_minimap')
-		params = json.dumps(((minimap_icon.width, minimap_icon.height), current_parameters))
+		size = (minimap_icon.width, minimap_icon.height)
+		# the generator might change between versions, the same parameters can produce another map then
+		self._preview_key = MinimapPreviewCache().get_key('random', VERSION.RELEASE_VERSION, current_parameters, size)
+		data = MinimapPreviewCache().get(self._preview_key)
+		if data is not None:
+			# this map has been previewed before
+			self._draw_map_preview(data)
+			return
+
+		# launch process in background to calculate minimap data
+		params = json.dumps((size, current_parameters))
 
 		args = [sys.executable, sys.argv[0], "--generate-minimap", params]
 		# We're running UH in a new process, make sure fife is setup correctly
@@ -328,6 +339,10 @@ class RandomMapWidget(object):
 		os.unlink(self._preview_output)
 		self._preview_process = None
 
+		MinimapPreviewCache().set(self._preview_key, data)
+		self._draw_map_preview(data)
+
+	def _draw_map_preview(self, data):
 		if self._map_preview:
 			self._map_preview.end()
 
@@ -416,12 +431,13 @@ class FreeMapsWidget(object):
 		if self._map_preview:
 			self._map_preview.end()
 
-		world = load_raw_world(map_file)
+		minimap_icon = self._gui.findChild(name='map_preview_minimap')
+		data = Minimap.get_map_preview_data(map_file, (minimap_icon.width, minimap_icon.height))
 		self._map_preview = Minimap(
-			self._gui.findChild(name='map_preview_minimap'),
+			minimap_icon,
 			session=None,
 			view=None,
-			world=world,
+			world=None,
 			targetrenderer=horizons.globals.fife.targetrenderer,
 			imagemanager=horizons.globals.fife.imagemanager,
 			cam_border=False,
@@ -430,7 +446,7 @@ class FreeMapsWidget(object):
 			on_click=None,
 			preview=True)
 
-		self._map_preview.draw()
+		self._map_preview.draw_data(data)
 
 
 class ScenarioMapWidget(object):
@@ -596,7 +612,6 @@ def generate_random_minimap(size, parameters):
 	"""Called as subprocess, calculates minimap data and passes it via string via stdout"""
 	# called as standalone basically, so init everything we need
 	from horizons.entities import Entities
-	from horizons.ext.dummy import Dummy
 	from horizons.main import _create_main_db
 
 	if not VERSION.IS_DEV_VERSION:
@@ -617,17 +632,6 @@ def generate_random_minimap(size, parameters):
 
 	map_file = generate_random_map(*parameters)
 	world = load_raw_world(map_file)
-	location = Rect.init_from_topleft_and_size_tuples((0, 0), size)
-	minimap = Minimap(
-		location,
-		session=None,
-		view=None,
-		world=world,
-		targetrenderer=Dummy(),
-		imagemanager=Dummy(),
-		cam_border=False,
-		use_rotation=False,
-		preview=True)
 
 	# communicate via stdout
-	print minimap.dump_data()
+	print Minimap.create_preview_data(world, size)
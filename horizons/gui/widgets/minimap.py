@@ -27,6 +27,9 @@ import horizons.globals
 from fife import fife
 
 from horizons.extscheduler import ExtScheduler
+from horizons.ext.dummy import Dummy
+from horizons.util.minimappreviewcache import MinimapPreviewCache
+from horizons.util.python.callback import Callback
 from horizons.util.python.decorators import bind_all
 from horizons.util.shapes import Circle, Point, Rect
 from horizons.command.unit import Act
@@ -122,6 +125,14 @@ class Minimap(object):
 
 		self._image_size_cache = {} # internal detail
 
+		# the base layer (water, islands and settlements) of the minimap, see _recalculate
+		self._pixel_index = None
+		self._pixel_index_key = None
+		self._pixel_positions = None
+		self._pixel_colors = None # colors that are drawn, by pixel number
+		self._dirty_coords = set() # real world coords that have changed since the last redraw
+		self._dirty_update_scheduled = False
+
 		self.imagemanager = imagemanager
 
 		self.minimap_image = _MinimapImage(self, targetrenderer)
@@ -143,6 +154,7 @@ class Minimap(object):
 		but you can disable it with this and enable again with draw().
 		Stops all updates."""
 		ExtScheduler().rem_all_classinst_calls(self)
+		self._dirty_update_scheduled = False
 		if self.view is not None and self.view.has_change_listener(self.update_cam):
 			self.view.remove_change_listener(self.update_cam)
 
@@ -184,6 +196,7 @@ class Minimap(object):
 		if not self.preview:
 			self._timed_update(force=True)
 			ExtScheduler().rem_all_classinst_calls(self)
+			self._dirty_update_scheduled = False
 			ExtScheduler().add_new_object(self._timed_update, self,
 			                              self.SHIP_DOT_UPDATE_INTERVAL, -1)
 
@@ -198,13 +211,44 @@ class Minimap(object):
 		self.icon.image = fife.GuiImage( self.minimap_image.image )
 
 		self.minimap_image.set_drawing_enabled()
-		rt = self.minimap_image.rendertarget
-		render_name = self._get_render_name("base")
-		draw_point = rt.addPoint
-		point = fife.Point()
-		for x, y, r, g, b in json.loads(data):
-			point.set(x, y)
-			draw_point(render_name, point, r, g, b)
+		# the background already is water colored
+		water_col = self.COLORS["water"]
+		self._draw_pixels(((x, y), (r, g, b)) for x, y, r, g, b in json.loads(data)
+		                  if (r, g, b) != water_col)
+
+	@classmethod
+	def create_preview_data(cls, world, size):
+		"""Calculates the data of a preview of world without drawing anything.
+		@param world: World object or fake thereof
+		@param size: (width, height) of the preview
+		@return: string, see dump_data"""
+		location = Rect.init_from_topleft_and_size_tuples((0, 0), size)
+		minimap = cls(
+			location,
+			session=None,
+			view=None,
+			world=world,
+			targetrenderer=Dummy(),
+			imagemanager=Dummy(),
+			cam_border=False,
+			use_rotation=False,
+			preview=True)
+		return minimap.dump_data()
+
+	@classmethod
+	def get_map_preview_data(cls, map_file, size):
+		"""Returns the data of a preview of a map file. Previews are stored in the
+		MinimapPreviewCache, the map is only loaded if it hasn't been previewed before.
+		@param size: (width, height) of the preview
+		@return: string, see dump_data"""
+		cache = MinimapPreviewCache()
+		key = cache.get_file_key(map_file, size)
+		return cache.get_or_create(key, Callback(cls._create_map_preview_data, map_file, size))
+
+	@classmethod
+	def _create_map_preview_data(cls, map_file, size):
+		from horizons.world import load_raw_world # avoid an import cycle
+		return cls.create_preview_data(load_raw_world(map_file), size)
 
 
 	def _get_render_name(self, key):
@@ -251,21 +295,15 @@ class Minimap(object):
 			minimap._update(tup)
 
 	def _update(self, tup):
-		"""Recalculate and redraw minimap for real world coord tup
+		"""Marks the minimap pixels that show real world coord tup for redrawing.
+		All changes of a frame are drawn together, see _draw_dirty_pixels.
 		@param tup: (x, y)"""
 		if self.world is None or not self.world.inited:
 			return # don't draw while loading
-		minimap_point = self._world_to_minimap( tup, self._get_rotation_setting() )
-		world_to_minimap = self._world_to_minimap_ratio
-		# TODO: remove this remnant of the old implementation, perhaps by refactoring recalculate()
-		minimap_point = (
-		  minimap_point[0] + self.location.left,
-		  minimap_point[1] + self.location.top,
-		)
-		rect = Rect.init_from_topleft_and_size(minimap_point[0], minimap_point[1],
-								                           int(round(1/world_to_minimap[0])) + 1,
-								                           int(round(1/world_to_minimap[1])) + 1)
-		self._recalculate(rect)
+		self._dirty_coords.add(tup)
+		if not self._dirty_update_scheduled:
+			self._dirty_update_scheduled = True
+			ExtScheduler().add_new_object(self._draw_dirty_pixels, self, run_in=0)
 
 	def use_overlay_icon(self, icon):
 		"""Configures icon so that clicks get mapped here.
@@ -350,6 +388,8 @@ class Minimap(object):
 			self.icon.helptext = self.fixed_tooltip
 			self.icon.position_tooltip(event)
 			#self.icon.show_tooltip()
+		elif self.world is None:
+			return # only data has been drawn, see draw_data
 		else:
 			coords = self._get_event_coords(event)
 			if not coords: # no valid/relevant event location
@@ -462,89 +502,117 @@ class Minimap(object):
 
 		return True
 
-	def _recalculate(self, where=None, dump_data=False):
+	def _get_pixel_index(self):
+		"""Returns which real world coords each pixel of the minimap displays.
+		Pixels are numbered column by column, pixel (x, y) has the number x * height + y.
+		@return: tuple (list of coords per pixel, dict { coords: list of pixel numbers })"""
+		key = (self._world_to_minimap_ratio, self.world.min_x, self.world.min_y,
+		       self.location.width, self.location.height)
+		if self._pixel_index_key != key:
+			pixel_per_coord_x, pixel_per_coord_y = self._world_to_minimap_ratio
+			# use center of the rect that the pixel covers
+			offset_x = self.world.min_x + int(pixel_per_coord_x / 2)
+			offset_y = self.world.min_y + int(pixel_per_coord_y / 2)
+			xs = [int(x * pixel_per_coord_x) + offset_x for x in xrange(self.location.width)]
+			ys = [int(y * pixel_per_coord_y) + offset_y for y in xrange(self.location.height)]
+			pixel_coords = [(x, y) for x in xs for y in ys]
+			pixels_by_coords = {}
+			for pixel, coords in enumerate(pixel_coords):
+				if coords in pixels_by_coords:
+					pixels_by_coords[coords].append(pixel)
+				else:
+					pixels_by_coords[coords] = [pixel]
+			self._pixel_index = (pixel_coords, pixels_by_coords)
+			self._pixel_index_key = key
+			self._pixel_positions = None
+		return self._pixel_index
+
+	def _get_pixel_positions(self, use_rotation):
+		"""Returns the position relative to the minimap origin where each pixel is drawn."""
+		key = (use_rotation, self.rotation)
+		if self._pixel_positions is None or self._pixel_positions[0] != key:
+			width, height = self.location.width, self.location.height
+			if use_rotation:
+				left, top = self.location.left, self.location.top
+				positions = []
+				for x in xrange(width):
+					for y in xrange(height):
+						rot_x, rot_y = self._rotate((left + x, top + y), self._rotations)
+						positions.append((rot_x - left, rot_y - top))
+			else:
+				positions = [(x, y) for x in xrange(width) for y in xrange(height)]
+			self._pixel_positions = (key, positions)
+		return self._pixel_positions[1]
+
+	def _get_colors(self, coords_list):
+		"""Returns the colors of the minimap pixels that display the given real world coords."""
+		water_col = self.COLORS["water"]
+		island_col = self.COLORS["island"]
+		settlement_colors = {}
+		def get_color(tile):
+			if tile is None or (tile.settlement is None and tile.id <= 0):
+				return water_col
+			settlement = tile.settlement
+			if settlement is None:
+				return island_col
+			if settlement not in settlement_colors:
+				# pixel belongs to a player
+				settlement_colors[settlement] = settlement.owner.color.to_tuple()
+			return settlement_colors[settlement]
+		return map(get_color, map(self.world.full_map.get, coords_list))
+
+	def _recalculate(self, dump_data=False):
 		"""Calculate which pixel of the minimap should display what and draw it
-		@param where: Rect of minimap coords. Defaults to self.location
 		@param dump_data: Don't draw but return calculated data"""
-		self.minimap_image.set_drawing_enabled()
+		pixel_coords = self._get_pixel_index()[0]
+		colors = self._get_colors(pixel_coords)
+		positions = self._get_pixel_positions(self._get_rotation_setting())
 
+		if dump_data:
+			return json.dumps([(x, y, r, g, b) for (x, y), (r, g, b) in itertools.izip(positions, colors)])
+
+		self._pixel_colors = colors
+		self._dirty_coords.clear()
+		self.minimap_image.set_drawing_enabled()
 		rt = self.minimap_image.rendertarget
 		render_name = self._get_render_name("base")
-
-		if where is None:
-			where = self.location
-			rt.removeAll(render_name)
-
-		# calculate which area of the real map is mapped to which pixel on the minimap
-		pixel_per_coord_x, pixel_per_coord_y = self._world_to_minimap_ratio
-
-		# calculate values here so we don't have to do it in the loop
-		pixel_per_coord_x_half_as_int = int(pixel_per_coord_x/2)
-		pixel_per_coord_y_half_as_int = int(pixel_per_coord_y/2)
-
-		world_min_x = self.world.min_x
-		world_min_y = self.world.min_y
-		island_col = self.COLORS["island"]
+		rt.removeAll(render_name)
+		# the background already is water colored
 		water_col = self.COLORS["water"]
-		location_left = self.location.left
-		location_top = self.location.top
-		if dump_data:
-			data = []
-			draw_point = lambda name, fife_point, r, g, b : data.append( (fife_point.x, fife_point.y, r, g, b) )
-		else:
-			draw_point = rt.addPoint
-		fife_point = fife.Point(0, 0)
-
-		use_rotation = self._get_rotation_setting()
-		full_map = self.world.full_map
-
-		# loop through map coordinates, assuming (0, 0) is the origin of the minimap
-		# this facilitates calculating the real world coords
-		for x in xrange(where.left-self.location.left, where.left+where.width-self.location.left):
-			for y in xrange(where.top-self.location.top, where.top+where.height-self.location.top):
-
-				"""
-				This code should be here, but since python can't do inlining, we have to inline
-				ourselves for performance reasons
-				covered_area = Rect.init_from_topleft_and_size(
-				  int(x * pixel_per_coord_x)+world_min_x,
-				  int(y * pixel_per_coord_y)+world_min_y),
-				  int(pixel_per_coord_x), int(pixel_per_coord_y))
-				real_map_point = covered_area.center
-				"""
-				# use center of the rect that the pixel covers
-				real_map_x = int(x * pixel_per_coord_x) + world_min_x + pixel_per_coord_x_half_as_int
-				real_map_y = int(y * pixel_per_coord_y) + world_min_y + pixel_per_coord_y_half_as_int
-				real_map_coords = (real_map_x, real_map_y)
-
-				# check what's at the covered_area
-				if real_map_coords in full_map:
-					# this pixel is an island
-					tile = full_map[real_map_coords]
-					settlement = tile.settlement
-					if settlement is None:
-						# island without settlement
-						if tile.id <= 0:
-							color = water_col
-						else:
-							color = island_col
-					else:
-						# pixel belongs to a player
-						color = settlement.owner.color.to_tuple()
-				else:
-					color = water_col
-
-				if use_rotation:
-					# inlined _get_rotated_coords
-					rot_x, rot_y = self._rotate( (location_left + x, location_top + y), self._rotations)
-					fife_point.set(rot_x - location_left, rot_y - location_top)
-				else:
-					fife_point.set(x, y)
-
-				draw_point(render_name, fife_point, *color)
+		self._draw_pixels(((position, color) for position, color in itertools.izip(positions, colors)
+		                   if color != water_col))
+
+	def _draw_dirty_pixels(self):
+		"""Redraws the pixels that show coords passed to _update since the last call,
+		if their color has changed."""
+		self._dirty_update_scheduled = False
+		if not self._dirty_coords or self.world is None or self._pixel_colors is None:
+			return
+		pixels_by_coords = self._get_pixel_index()[1]
+		pixels = []
+		for coords in self._dirty_coords:
+			pixels.extend(pixels_by_coords.get(coords, ()))
+		self._dirty_coords.clear()
+
+		colors = self._get_colors([self._pixel_index[0][pixel] for pixel in pixels])
+		positions = self._get_pixel_positions(self._get_rotation_setting())
+		changed = []
+		for pixel, color in itertools.izip(pixels, colors):
+			if self._pixel_colors[pixel] != color:
+				self._pixel_colors[pixel] = color
+				changed.append((positions[pixel], color))
+		if changed:
+			self.minimap_image.set_drawing_enabled()
+			self._draw_pixels(changed)
 
-		if dump_data:
-			return json.dumps( data )
+	def _draw_pixels(self, pixels):
+		"""@param pixels: iterable of ((x, y), color)"""
+		draw_point = self.minimap_image.rendertarget.addPoint
+		render_name = self._get_render_name("base")
+		fife_point = fife.Point(0, 0)
+		for (x, y), (r, g, b) in pixels:
+			fife_point.set(x, y)
+			draw_point(render_name, fife_point, r, g, b)
 
 
 	def _timed_update(self, force=False):
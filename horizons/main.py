@@ -144,6 +144,9 @@ def start(_command_line_arguments):
 	if command_line_arguments.max_ticks:
 		GAME.MAX_TICKS = command_line_arguments.max_ticks
 
+	if command_line_arguments.profile_callbacks:
+		GAME.CALLBACK_PROFILE = command_line_arguments.profile_callbacks
+
 	atlas_generator = None
 	if VERSION.IS_DEV_VERSION and horizons.globals.fife.get_uh_setting('AtlasesEnabled') \
 	                          and horizons.globals.fife.get_uh_setting('AtlasGenerationEnabled') \
@@ -22,6 +22,7 @@
 import operator
 import logging
 import itertools
+from collections import OrderedDict
 
 from horizons.timer import Timer
 from horizons.scheduler import Scheduler
@@ -170,6 +171,8 @@ class MPManager(LivingObject):
 		if tick % self.HASH_EVAL_DISTANCE == 0:
 			if not self.checkuphashmanager.are_checkup_hash_values_equal(tick, self.hash_value_diff):
 				self.log.error("MPManager: Hash values generated in tick %s are not equal" % str(tick - self.HASHDELAY))
+				# the packets only contain digests, log the current local values to compare them with the other logs
+				self.log.error("MPManager: Local checkup values in tick %s: %s", tick, self.session.world.get_checkup_hash_details())
 				# if this is reached, we are screwed. Something went wrong in the simulation,
 				# but we don't know what. Stop the game.
 				msg = _("The games have run out of sync. This indicates an unknown internal error, the game cannot continue.") + "\n" + \
@@ -231,23 +234,38 @@ class MPManager(LivingObject):
 ################################################
 
 class MPPacketmanager(object):
+	"""Stores the packets of every player until the tick they are meant for is executed.
+
+	The packets are indexed by tick and by player, so checking whether all packets for a tick
+	have arrived doesn't depend on the number of packets that are waiting. Packets for ticks
+	that have already been executed are dropped."""
 	log = logging.getLogger("mpmanager")
 	def __init__(self, mpmanager):
 		self.mpmanager = mpmanager
-		self.command_packet_list = []
+		self._packets_by_tick = {} # { tick: [packets] }
+		self._packets_by_player = {} # { player_id: OrderedDict { tick: [packets] } }
+		self._last_returned_tick = None # packets for this tick and earlier ones are dropped
 
 	def is_tick_ready(self, tick):
 		"""Check if packets from all players have arrived (necessary for tick to begin)"""
-		ready = len(self.get_packets_for_tick(tick, remove_returned_commands=False)) == self.mpmanager.get_player_count()
-		if not ready:
-			self.log.debug("tick not ready, packets: " + str(list(str(x) for x in self.get_packets_for_tick(tick, remove_returned_commands=False))))
+		packets = self._packets_by_tick.get(tick, ())
+		ready = len(packets) == self.mpmanager.get_player_count()
+		if not ready and self.log.isEnabledFor(logging.DEBUG):
+			self.log.debug("tick %s not ready, packets from players: %s", tick, [x.player_id for x in packets])
 		return ready
 
 	def get_packets_for_tick(self, tick, remove_returned_commands=True):
-		"""Returns packets that are to be executed at a certain tick"""
-		command_packets = filter(lambda x: x.tick==tick, self.command_packet_list)
-		if remove_returned_commands:
-			self.command_packet_list = filter(lambda x: x.tick!=tick, self.command_packet_list)
+		"""Returns packets that are to be executed at a certain tick, sorted by player"""
+		if not remove_returned_commands:
+			command_packets = list(self._packets_by_tick.get(tick, ()))
+		else:
+			command_packets = self._packets_by_tick.pop(tick, [])
+			for packet in command_packets:
+				self._packets_by_player[packet.player_id].pop(tick, None)
+			if self._last_returned_tick is None or tick > self._last_returned_tick:
+				self._last_returned_tick = tick
+		# the sort is stable, so several packets of one player keep their order
+		command_packets.sort(key=operator.attrgetter('player_id'))
 		return command_packets
 
 	def get_packets_from_player(self, player_id):
@@ -255,11 +273,21 @@ class MPPacketmanager(object):
 		Returns all command this player has issued, that are not yet executed
 		@param player_id: worldid of player
 		"""
-		return filter(lambda x: x.player_id==player_id, self.command_packet_list)
+		packets_by_tick = self._packets_by_player.get(player_id)
+		if not packets_by_tick:
+			return []
+		return list(itertools.chain.from_iterable(packets_by_tick.itervalues()))
 
 	def add_packet(self, command_packet):
 		"""Receive a packet"""
-		self.command_packet_list.append(command_packet)
+		tick = command_packet.tick
+		if self._last_returned_tick is not None and tick <= self._last_returned_tick:
+			self.log.warning("dropping packet from player %s for tick %s, which has already been executed",
+			                 command_packet.player_id, tick)
+			return
+		self._packets_by_tick.setdefault(tick, []).append(command_packet)
+		packets_by_tick = self._packets_by_player.setdefault(command_packet.player_id, OrderedDict())
+		packets_by_tick.setdefault(tick, []).append(command_packet)
 
 class MPCommandsManager(MPPacketmanager):
 	pass
@@ -323,6 +351,7 @@ class CommandPacket(MPPacket):
 		self.commandlist = commandlist
 
 MPPacket.allow_network(CommandPacket)
+packets.binary.register_schema(CommandPacket, ('tick', 'player_id', 'commandlist'))
 
 class CheckupHashPacket(MPPacket):
 	def __init__(self, tick, player_id, checkup_hash):
@@ -330,3 +359,4 @@ class CheckupHashPacket(MPPacket):
 		self.checkup_hash = checkup_hash
 
 MPPacket.allow_network(CheckupHashPacket)
+packets.binary.register_schema(CheckupHashPacket, ('tick', 'player_id', 'checkup_hash'))
@@ -31,7 +31,7 @@ MAX_PEERS = 1
 
 # current server/client protocol the client understands
 # increment that after incompatible protocol changes
-SERVER_PROTOCOL = 1
+SERVER_PROTOCOL = 2
 
 # time in ms the client will wait for a packet
 # on error client may wait twice that time
@@ -0,0 +1,155 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import json
+import os
+import time
+from bisect import bisect_left
+
+
+class Histogram(object):
+	"""Counts values in buckets with fixed upper bounds.
+	Values above the last bound are counted in an additional overflow bucket."""
+
+	# milliseconds, roughly logarithmic
+	DEFAULT_BOUNDS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+	def __init__(self, bounds=DEFAULT_BOUNDS):
+		self.bounds = tuple(bounds)
+		self.counts = [0] * (len(self.bounds) + 1)
+		self.count = 0
+		self.sum = 0.0
+		self.max = 0.0
+
+	def add(self, value):
+		self.counts[bisect_left(self.bounds, value)] += 1
+		self.count += 1
+		self.sum += value
+		if value > self.max:
+			self.max = value
+
+	def get_percentile(self, fraction):
+		"""@return: upper bound of the bucket that contains the given fraction of all values,
+		            max for the overflow bucket and 0 if there are no values"""
+		if not self.count:
+			return 0.0
+		needed = fraction * self.count
+		total = 0
+		for bound, count in zip(self.bounds, self.counts):
+			total += count
+			if total >= needed:
+				return bound
+		return self.max
+
+	def to_dict(self):
+		return {
+			'bounds': self.bounds,
+			'counts': self.counts,
+			'count': self.count,
+			'sum': self.sum,
+			'max': self.max,
+			'p50': self.get_percentile(0.5),
+			'p99': self.get_percentile(0.99),
+		}
+
+
+class ServerMetrics(object):
+	"""Counters of the multiplayer server for capacity planning.
+
+	Recording is limited to a few dict and list updates per packet, so that the metrics
+	can always be collected. Counters are totals since the start of the server, except
+	for the per game packet rates, which refer to the time since the last export.
+	Times are given in milliseconds.
+	"""
+
+	def __init__(self):
+		self.start_time = time.time()
+		self.packets_in = {} # { packet type: count }
+		self.packets_out = 0
+		self.bytes_in = 0
+		self.bytes_out = 0
+		self.relay_latency = Histogram()
+		self.service_time = Histogram()
+		self.idle_time = 0.0
+		self._game_packets = {} # { game uuid: relayed packets since the last export }
+		self._last_export = self.start_time
+
+	def packet_received(self, packet_type, size):
+		self.packets_in[packet_type] = self.packets_in.get(packet_type, 0) + 1
+		self.bytes_in += size
+
+	def packet_sent(self, size, peers=1):
+		self.packets_out += peers
+		self.bytes_out += size * peers
+
+	def game_data_relayed(self, game_uuid, duration):
+		"""@param duration: time from receiving the packet until it was sent to the other players"""
+		self._game_packets[game_uuid] = self._game_packets.get(game_uuid, 0) + 1
+		self.relay_latency.add(duration * 1000)
+
+	def game_removed(self, game_uuid):
+		self._game_packets.pop(game_uuid, None)
+
+	def event_serviced(self, duration):
+		"""@param duration: time it took to handle one event of the main loop"""
+		self.service_time.add(duration * 1000)
+
+	def idle(self, duration):
+		"""@param duration: time the main loop waited for events"""
+		self.idle_time += duration * 1000
+
+	def get_snapshot(self, extra=None):
+		"""Returns all metrics as dict and starts a new interval for the per game rates.
+		@param extra: dict of additional values to include"""
+		now = time.time()
+		interval = max(now - self._last_export, 1e-6)
+		snapshot = {
+			'timestamp': now,
+			'uptime': now - self.start_time,
+			'interval': interval,
+			'packets_in': dict(self.packets_in),
+			'packets_out': self.packets_out,
+			'bytes_in': self.bytes_in,
+			'bytes_out': self.bytes_out,
+			'relay_latency': self.relay_latency.to_dict(),
+			'service_time': self.service_time.to_dict(),
+			'idle_time': self.idle_time,
+			'game_packet_rates': dict((game_uuid, count / interval)
+			                          for game_uuid, count in self._game_packets.iteritems()),
+		}
+		if extra:
+			snapshot.update(extra)
+		self._game_packets = dict.fromkeys(self._game_packets, 0)
+		self._last_export = now
+		return snapshot
+
+	def export(self, filename, extra=None):
+		"""Writes a snapshot as json. The file is written to a temporary file first and then
+		renamed, so readers never see a partially written file. The rename replaces the file
+		atomically on posix; on windows, the old file is removed first, so readers might
+		briefly find no file there.
+		@raise IOError: if the file can't be written"""
+		tmpname = filename + '.tmp'
+		with open(tmpname, 'w') as fd:
+			json.dump(self.get_snapshot(extra), fd, sort_keys=True)
+		if os.name == 'nt' and os.path.exists(filename):
+			os.remove(filename) # rename doesn't overwrite files on windows
+		os.rename(tmpname, filename)
@@ -42,6 +42,8 @@ PICKLE_SAFE = {
 	'client' : {},
 	'server' : {},
 }
+# incremented on every change of PICKLE_SAFE
+PICKLE_SAFE_VERSION = 0
 
 class SafeUnpickler(object):
 	"""
@@ -65,7 +67,7 @@ class SafeUnpickler(object):
 	"""
 	@classmethod
 	def add(self, origin, klass):
-		global PICKLE_SAFE
+		global PICKLE_SAFE, PICKLE_SAFE_VERSION
 		module = klass.__module__
 		name  = klass.__name__
 		if (module == self.__module__ and name == self.__name__):
@@ -76,6 +78,7 @@ class SafeUnpickler(object):
 				PICKLE_SAFE[origin][module] = set()
 			if name not in PICKLE_SAFE[origin][module]:
 				PICKLE_SAFE[origin][module].add(name)
+				PICKLE_SAFE_VERSION += 1
 
 	@classmethod
 	def set_mode(self, client=True):
@@ -158,7 +161,10 @@ SafeUnpickler.add('common', cmd_fatalerror)
 #-------------------------------------------------------------------------------
 
 def unserialize(data, validate=False, protocol=0):
-	mypacket = SafeUnpickler.loads(data)
+	if binary.is_binary(data):
+		mypacket = binary.loads(data)
+	else:
+		mypacket = SafeUnpickler.loads(data)
 	if validate:
 		if not inspect.isfunction(mypacket.validate):
 			raise NetworkException("Attempt to override packet.validate()")
@@ -169,6 +175,7 @@ def unserialize(data, validate=False, protocol=0):
 
 #-------------------------------------------------------------------------------
 
+from horizons.network.packets import binary
 import horizons.network.packets.server
 import horizons.network.packets.client
 
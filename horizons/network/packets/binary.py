@@ -0,0 +1,360 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA	02110-1301	USA
+# ###################################################
+
+"""
+Compact binary encoding for packets that are sent very often (the game data
+that is relayed between the players every tick).
+
+Every value is written as a one byte type tag followed by struct packed data.
+Instances of whitelisted classes (see SafeUnpickler) are written as a 32 bit
+class id, which is derived from module and class name, followed by the content
+of their __dict__. Classes with a registered schema only write the values of
+their fields in the order of the schema. Strings are only written once per
+packet, repetitions are written as back references.
+
+Payloads larger than COMPRESS_THRESHOLD bytes are compressed with zlib.
+
+Only the whitelisted classes of the receiving side can be decoded, just like
+with the pickle based encoding.
+"""
+
+import struct
+import zlib
+
+import horizons.network.packets
+from horizons.network import NetworkException
+
+# every binary packet starts with this, pickle data (protocol 2) starts with '\x80\x02'
+MAGIC = 'UHB'
+FLAG_PLAIN = '\x00'
+FLAG_ZLIB = '\x01'
+COMPRESS_THRESHOLD = 1024
+# compressed packets must not expand to more than this, the server only limits the compressed size
+MAX_DECOMPRESSED_SIZE = 16 * 1024 * 1024
+
+T_NONE = 'N'
+T_TRUE = 'T'
+T_FALSE = 'F'
+T_INT8 = 'b'
+T_INT16 = 'h'
+T_INT32 = 'i'
+T_INT64 = 'q'
+T_LONG = 'L'
+T_FLOAT = 'd'
+T_STR = 's'
+T_STR_REF = 'r'
+T_UNICODE = 'u'
+T_TUPLE = 't'
+T_LIST = 'l'
+T_DICT = 'D'
+T_SET = 'S'
+T_FROZENSET = 'Z'
+T_OBJECT = 'o'
+T_SCHEMA_OBJECT = 'O'
+
+_INT8 = struct.Struct('<b')
+_INT16 = struct.Struct('<h')
+_INT32 = struct.Struct('<i')
+_INT64 = struct.Struct('<q')
+_UINT8 = struct.Struct('<B')
+_UINT32 = struct.Struct('<I')
+_FLOAT = struct.Struct('<d')
+
+_SCHEMAS = {} # { class: tuple of field names }
+_CLASS_IDS = {} # { class: id }
+_CLASSES_BY_ID = {} # { origin: (whitelist version, { id: (module, name) }, { id: class }) }
+
+
+class UnsupportedType(NetworkException):
+	"""Raised when a value can't be encoded, the pickle format has to be used instead."""
+
+
+def register_schema(klass, fields):
+	"""Instances of klass are encoded as values of fields (in this order) instead of their
+	whole __dict__. klass has to be whitelisted (see SafeUnpickler) as well.
+	@param fields: tuple of attribute names"""
+	_SCHEMAS[klass] = tuple(fields)
+
+
+def get_class_id(klass):
+	"""@return: 32 bit id of klass that is the same for every player"""
+	if klass not in _CLASS_IDS:
+		_CLASS_IDS[klass] = zlib.crc32('%s.%s' % (klass.__module__, klass.__name__)) & 0xffffffff
+	return _CLASS_IDS[klass]
+
+
+def _get_class_by_id(class_id):
+	"""Looks up a class in the whitelist of the current receiving side."""
+	origin = horizons.network.packets.PICKLE_RECIEVE_FROM
+	version = horizons.network.packets.PICKLE_SAFE_VERSION
+	if _CLASSES_BY_ID.get(origin, (None, ))[0] != version:
+		# classes have been added to the whitelist since the last lookup
+		ids = {}
+		for module, names in horizons.network.packets.PICKLE_SAFE[origin].iteritems():
+			for name in names:
+				key = zlib.crc32('%s.%s' % (module, name)) & 0xffffffff
+				if key in ids:
+					raise RuntimeError('Class id of %s.%s collides with %s.%s' % ((module, name) + ids[key]))
+				ids[key] = (module, name)
+		_CLASSES_BY_ID[origin] = (version, ids, {})
+	ids, classes = _CLASSES_BY_ID[origin][1:]
+	if class_id not in classes:
+		if class_id not in ids:
+			raise NetworkException('Attempting to decode unknown or unsafe class id %d' % class_id)
+		classes[class_id] = horizons.network.packets.SafeUnpickler.find_class(*ids[class_id])
+	return classes[class_id]
+
+
+class _Encoder(object):
+	def __init__(self):
+		self.chunks = []
+		self.strings = {} # { str: index of its first occurrence }
+
+	def write_size(self, size):
+		if size < 0xff:
+			self.chunks.append(_UINT8.pack(size))
+		else:
+			self.chunks.append('\xff' + _UINT32.pack(size))
+
+	def write(self, value):
+		chunks = self.chunks
+		value_type = type(value)
+		if value is None:
+			chunks.append(T_NONE)
+		elif value_type is bool:
+			chunks.append(T_TRUE if value else T_FALSE)
+		elif value_type is int or value_type is long:
+			if -0x80 <= value < 0x80:
+				chunks.append(T_INT8 + _INT8.pack(value))
+			elif -0x8000 <= value < 0x8000:
+				chunks.append(T_INT16 + _INT16.pack(value))
+			elif -0x80000000 <= value < 0x80000000:
+				chunks.append(T_INT32 + _INT32.pack(value))
+			elif -0x8000000000000000 <= value < 0x8000000000000000:
+				chunks.append(T_INT64 + _INT64.pack(value))
+			else:
+				chunks.append(T_LONG)
+				self.write_bytes(str(value))
+		elif value_type is str:
+			if value in self.strings:
+				chunks.append(T_STR_REF)
+				self.write_size(self.strings[value])
+			else:
+				self.strings[value] = len(self.strings)
+				chunks.append(T_STR)
+				self.write_bytes(value)
+		elif value_type is unicode:
+			chunks.append(T_UNICODE)
+			self.write_bytes(value.encode('utf-8'))
+		elif value_type is float:
+			chunks.append(T_FLOAT + _FLOAT.pack(value))
+		elif value_type is tuple:
+			chunks.append(T_TUPLE)
+			self.write_items(value)
+		elif value_type is list:
+			chunks.append(T_LIST)
+			self.write_items(value)
+		elif value_type is dict:
+			chunks.append(T_DICT)
+			self.write_size(len(value))
+			for key, item in value.iteritems():
+				self.write(key)
+				self.write(item)
+		elif value_type is set:
+			chunks.append(T_SET)
+			self.write_items(value)
+		elif value_type is frozenset:
+			chunks.append(T_FROZENSET)
+			self.write_items(value)
+		elif hasattr(value, '__dict__'):
+			self.write_object(value)
+		else:
+			raise UnsupportedType('Can not encode %s' % value_type)
+
+	def write_bytes(self, data):
+		self.write_size(len(data))
+		self.chunks.append(data)
+
+	def write_items(self, items):
+		self.write_size(len(items))
+		for item in items:
+			self.write(item)
+
+	def write_object(self, obj):
+		klass = obj.__class__
+		if not any(klass.__name__ in whitelist.get(klass.__module__, ())
+		           for whitelist in horizons.network.packets.PICKLE_SAFE.itervalues()):
+			raise UnsupportedType('Class %s is not whitelisted' % klass.__name__)
+		if klass in _SCHEMAS:
+			self.chunks.append(T_SCHEMA_OBJECT + _UINT32.pack(get_class_id(klass)))
+			for field in _SCHEMAS[klass]:
+				self.write(getattr(obj, field))
+		else:
+			self.chunks.append(T_OBJECT + _UINT32.pack(get_class_id(klass)))
+			state = obj.__getstate__() if hasattr(obj, '__getstate__') else obj.__dict__
+			self.write(state)
+
+
+class _Decoder(object):
+	def __init__(self, data):
+		self.data = data
+		self.pos = 0
+		self.strings = []
+
+	def read_struct(self, fmt):
+		value = fmt.unpack_from(self.data, self.pos)[0]
+		self.pos += fmt.size
+		return value
+
+	def read_size(self):
+		size = self.read_struct(_UINT8)
+		if size == 0xff:
+			size = self.read_struct(_UINT32)
+		return size
+
+	def read_bytes(self):
+		size = self.read_size()
+		end = self.pos + size
+		if end > len(self.data):
+			raise NetworkException('Binary packet is truncated')
+		value = self.data[self.pos:end]
+		self.pos = end
+		return value
+
+	def read(self):
+		if self.pos >= len(self.data):
+			raise NetworkException('Binary packet is truncated')
+		tag = self.data[self.pos]
+		self.pos += 1
+		if tag in _FIXED_TAGS:
+			return self.read_struct(_FIXED_TAGS[tag])
+		elif tag == T_NONE:
+			return None
+		elif tag == T_TRUE:
+			return True
+		elif tag == T_FALSE:
+			return False
+		elif tag == T_STR:
+			value = self.read_bytes()
+			self.strings.append(value)
+			return value
+		elif tag == T_STR_REF:
+			index = self.read_size()
+			if index >= len(self.strings):
+				raise NetworkException('Invalid string reference %d' % index)
+			return self.strings[index]
+		elif tag == T_UNICODE:
+			return self.read_bytes().decode('utf-8')
+		elif tag == T_LONG:
+			return long(self.read_bytes())
+		elif tag == T_TUPLE:
+			return tuple(self.read_items())
+		elif tag == T_LIST:
+			return self.read_items()
+		elif tag == T_DICT:
+			result = {}
+			for i in xrange(self.read_size()):
+				key = self.read()
+				result[key] = self.read()
+			return result
+		elif tag == T_SET:
+			return set(self.read_items())
+		elif tag == T_FROZENSET:
+			return frozenset(self.read_items())
+		elif tag == T_OBJECT or tag == T_SCHEMA_OBJECT:
+			return self.read_object(tag == T_SCHEMA_OBJECT)
+		raise NetworkException('Unknown type tag %r in binary packet' % tag)
+
+	def read_items(self):
+		return [self.read() for i in xrange(self.read_size())]
+
+	def read_object(self, has_schema):
+		klass = _get_class_by_id(self.read_struct(_UINT32))
+		obj = klass.__new__(klass)
+		if has_schema:
+			if klass not in _SCHEMAS:
+				raise NetworkException('No schema known for %s' % klass.__name__)
+			for field in _SCHEMAS[klass]:
+				obj.__dict__[field] = self.read()
+		else:
+			state = self.read()
+			if hasattr(obj, '__setstate__'):
+				obj.__setstate__(state)
+			else:
+				if not isinstance(state, dict):
+					raise NetworkException('Invalid state for %s' % klass.__name__)
+				obj.__dict__.update(state)
+		return obj
+
+_FIXED_TAGS = {
+	T_INT8: _INT8,
+	T_INT16: _INT16,
+	T_INT32: _INT32,
+	T_INT64: _INT64,
+	T_FLOAT: _FLOAT,
+}
+
+
+def dumps(obj):
+	"""Encodes obj in the binary format.
+	@raise UnsupportedType: if obj contains values that can't be encoded"""
+	encoder = _Encoder()
+	encoder.write(obj)
+	data = ''.join(encoder.chunks)
+	if len(data) > COMPRESS_THRESHOLD:
+		compressed = zlib.compress(data)
+		if len(compressed) < len(data):
+			return MAGIC + FLAG_ZLIB + compressed
+	return MAGIC + FLAG_PLAIN + data
+
+
+def is_binary(data):
+	return data.startswith(MAGIC)
+
+
+def loads(data):
+	"""Decodes data that has been encoded by dumps().
+	@raise NetworkException: on malformed data or classes that aren't whitelisted"""
+	if not is_binary(data) or len(data) < len(MAGIC) + 1:
+		raise NetworkException('Not a binary packet')
+	flag = data[len(MAGIC)]
+	data = data[len(MAGIC) + 1:]
+	if flag == FLAG_ZLIB:
+		decompressor = zlib.decompressobj()
+		try:
+			data = decompressor.decompress(data, MAX_DECOMPRESSED_SIZE)
+			if decompressor.unconsumed_tail:
+				raise NetworkException('Compressed packet is too large')
+			data += decompressor.flush()
+		except zlib.error as e:
+			raise NetworkException('Invalid compressed packet: %s' % e)
+		if len(data) > MAX_DECOMPRESSED_SIZE:
+			raise NetworkException('Compressed packet is too large')
+	elif flag != FLAG_PLAIN:
+		raise NetworkException('Unknown binary packet flag %r' % flag)
+	decoder = _Decoder(data)
+	try:
+		obj = decoder.read()
+	except struct.error:
+		raise NetworkException('Binary packet is truncated')
+	if decoder.pos != len(data):
+		raise NetworkException('Trailing data in binary packet')
+	return obj
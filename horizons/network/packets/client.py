@@ -22,7 +22,7 @@
 import uuid
 
 from horizons.network import NetworkException, SoftNetworkException
-from horizons.network.packets import packet, SafeUnpickler
+from horizons.network.packets import binary, packet, SafeUnpickler
 
 class cmd_creategame(packet):
 	clientversion = None
@@ -255,11 +255,20 @@ SafeUnpickler.add('client', cmd_preparedgame)
 #-------------------------------------------------------------------------------
 
 class game_data(packet):
+	"""Relayed by the server to the other players of a running game without decoding it.
+	Uses the binary format (protocol >= 2), unless the data contains values it can't encode."""
 	def __init__(self, data):
 		self.data = data
 
+	def serialize(self):
+		try:
+			return binary.dumps(self)
+		except binary.UnsupportedType:
+			return super(game_data, self).serialize()
+
 # origin is 'server' as clients will send AND receive them
 SafeUnpickler.add('server', game_data)
+binary.register_schema(game_data, ('sid', 'data'))
 
 #-------------------------------------------------------------------------------
 
@@ -21,12 +21,15 @@
 
 import gettext
 import logging
+import time
 import uuid
+from collections import OrderedDict
 
 from horizons import network
 from horizons.i18n import find_available_languages
 from horizons.network import packets, enet
 from horizons.network.common import Player, Game, ErrorType
+from horizons.network.metrics import ServerMetrics
 
 
 if not enet:
@@ -38,13 +41,16 @@ CONNECTION_TIMEOUT = 500
 # protocols used by uh versions:
 # 0 ... 2012.1
 # 1 ... >2012.1
-PROTOCOLS = [0, 1]
+# 2 ... binary game data packets (see packets.binary)
+PROTOCOLS = [0, 1, 2]
+# maximum number of cached gameslist responses per protocol
+GAMESLIST_CACHE_SIZE = 64
 
 logging.basicConfig(format = '[%(asctime)-15s] [%(levelname)s] %(message)s',
 		level = logging.DEBUG)
 
 class Server(object):
-	def __init__(self, hostname, port, statistic_file=None):
+	def __init__(self, hostname, port, statistic_file=None, metrics_file=None):
 		packets.SafeUnpickler.set_mode(client=False)
 		self.host     = None
 		self.hostname = hostname
@@ -54,6 +60,12 @@ class Server(object):
 			'timestamp': 0,
 			'interval':  1 * 60 * 1000,
 		}
+		self.metrics = ServerMetrics()
+		self.metrics_export = {
+			'file':     metrics_file,
+			'next':     0,
+			'interval': 10, # seconds
+		}
 		self.capabilities = {
 			'minplayers'    : 2,
 			'maxplayers'    : 8,
@@ -90,6 +102,12 @@ class Server(object):
 		}
 		self.games   = [] # list of games
 		self.players = {} # sessionid => Player() dict
+		self.games_by_uuid = {} # uuid => Game() dict
+		# indexes of the open games for onlistgames
+		self.open_games = {} # (protocol, version) => OrderedDict(uuid => Game())
+		self.open_games_by_protocol = {} # protocol => OrderedDict(uuid => Game())
+		# serialized gameslist responses, dropped on every change of a listed game
+		self.gameslist_cache = {} # protocol => { (version, mapname, maxplayers) => data }
 		self.i18n    = {} # lang => gettext dict
 		self.check_urandom()
 		self.setup_i18n()
@@ -177,8 +195,14 @@ class Server(object):
 					self.statistic['timestamp'] = self.statistic['interval']
 				else:
 					self.statistic['timestamp'] -= CONNECTION_TIMEOUT
+			if self.metrics_export['file'] is not None and time.time() >= self.metrics_export['next']:
+				self.export_metrics(self.metrics_export['file'])
+				self.metrics_export['next'] = time.time() + self.metrics_export['interval']
 
+			start = time.time()
 			event = self.host.service(CONNECTION_TIMEOUT)
+			serviced = time.time()
+			self.metrics.idle(serviced - start)
 			if event.type == enet.EVENT_TYPE_NONE:
 				continue
 			elif event.type == enet.EVENT_TYPE_CONNECT:
@@ -189,6 +213,7 @@ class Server(object):
 				self.call_callbacks("onreceive", event)
 			else:
 				logging.warning("Invalid packet (%u)" % (event.type))
+			self.metrics.event_serviced(time.time() - serviced)
 
 
 	def send(self, peer, packet, channelid=0):
@@ -204,6 +229,25 @@ class Server(object):
 		packet = enet.Packet(data, enet.PACKET_FLAG_RELIABLE)
 		peer.send(channelid, packet)
 		self.host.flush()
+		self.metrics.packet_sent(len(data))
+
+	def broadcast(self, peers, packet, channelid=0):
+		"""Sends packet to all peers, serializing it only once."""
+		if self.host is None:
+			raise network.NotConnected("Server is not running")
+
+		self.broadcastraw(peers, packet.serialize(), channelid)
+
+	def broadcastraw(self, peers, data, channelid=0):
+		"""Sends data to all peers as one enet packet with a single flush."""
+		if self.host is None:
+			raise network.NotConnected("Server is not running")
+
+		packet = enet.Packet(data, enet.PACKET_FLAG_RELIABLE)
+		for peer in peers:
+			peer.send(channelid, packet)
+		self.host.flush()
+		self.metrics.packet_sent(len(data), len(peers))
 
 
 	def disconnect(self, peer, later=True):
@@ -288,7 +332,11 @@ class Server(object):
 
 		# shortpath if game is running
 		if player.game is not None and player.game.state is Game.State.Running:
+			game = player.game
+			start = time.time()
+			self.metrics.packet_received('gamedata', len(event.packet.data))
 			self.call_callbacks('gamedata', player, event.packet.data)
+			self.metrics.game_data_relayed(game.uuid, time.time() - start)
 			return
 
 		packet = None
@@ -308,6 +356,9 @@ class Server(object):
 			logging.warning("[RECEIVE] Unknown or malformed packet from %s: %s!" % (player, e))
 			self.fatalerror(player, __("Unknown or malformed packet. Please check your game version"))
 			return
+		finally:
+			self.metrics.packet_received(packet.__class__.__name__ if packet is not None else 'invalid',
+			                             len(event.packet.data))
 
 		# session id check
 		if packet.sid != player.sid:
@@ -349,42 +400,67 @@ class Server(object):
 		game = Game(packet, player)
 		logging.debug("[CREATE] [%s] %s created %s" % (game.uuid, player, game))
 		self.games.append(game)
+		self.games_by_uuid[game.uuid] = game
+		key = (game.creator.protocol, game.creator.version)
+		self.open_games.setdefault(key, OrderedDict())[game.uuid] = game
+		self.open_games_by_protocol.setdefault(game.creator.protocol, OrderedDict())[game.uuid] = game
+		self.gamechanged(game)
 		self.send(player.peer, packets.server.data_gamestate(game))
 
 	def deletegame(self, game):
 		logging.debug("[REMOVE] [%s] %s removed" % (game.uuid, game))
+		self.gamechanged(game)
+		self.__remove_open_game(game)
+		self.metrics.game_removed(game.uuid)
 		game.clear()
 		self.games.remove(game)
+		del self.games_by_uuid[game.uuid]
+
+	def __remove_open_game(self, game):
+		key = (game.creator.protocol, game.creator.version)
+		if key in self.open_games:
+			self.open_games[key].pop(game.uuid, None)
+			if not self.open_games[key]:
+				del self.open_games[key]
+		games = self.open_games_by_protocol.get(game.creator.protocol)
+		if games is not None:
+			games.pop(game.uuid, None)
+			if not games:
+				del self.open_games_by_protocol[game.creator.protocol]
+
+	def gamechanged(self, game):
+		"""Drops the cached gameslist responses that might contain game.
+		Has to be called on every change of a game that shows up in the list."""
+		self.gameslist_cache.pop(game.creator.protocol, None)
 
 	def onlistgames(self, player, packet):
 		logging.debug("[LIST]")
-		gameslist = packets.server.data_gameslist()
-		for _game in self.games:
-			if _game.creator.protocol != player.protocol:
-				continue
-			if not _game.is_open():
-				continue
-			if _game.is_full():
-				continue
-			if packet.clientversion != -1 and packet.clientversion != _game.creator.version:
-				continue
-			if packet.mapname and packet.mapname != _game.mapname:
-				continue
-			if packet.maxplayers and packet.maxplayers != _game.maxplayers:
-				continue
-			gameslist.addgame(_game)
-		self.send(player.peer, gameslist)
+		key = (packet.clientversion, packet.mapname, packet.maxplayers)
+		cache = self.gameslist_cache.setdefault(player.protocol, {})
+		if key not in cache:
+			if len(cache) >= GAMESLIST_CACHE_SIZE:
+				cache.clear()
+			if packet.clientversion == -1:
+				games = self.open_games_by_protocol.get(player.protocol, {})
+			else:
+				games = self.open_games.get((player.protocol, packet.clientversion), {})
+			gameslist = packets.server.data_gameslist()
+			for _game in games.itervalues():
+				if _game.is_full():
+					continue
+				if packet.mapname and packet.mapname != _game.mapname:
+					continue
+				if packet.maxplayers and packet.maxplayers != _game.maxplayers:
+					continue
+				gameslist.addgame(_game)
+			cache[key] = gameslist.serialize()
+		self.sendraw(player.peer, cache[key])
 
 
 	def __find_game_from_uuid(self, packet):
-		game = None
-		for _game in self.games:
-			if packet.clientversion != _game.creator.version:
-				continue
-			if packet.uuid != _game.uuid:
-				continue
-			game = _game
-			break
+		game = self.games_by_uuid.get(packet.uuid)
+		if game is None or packet.clientversion != game.creator.version:
+			return None
 		return game
 
 
@@ -435,8 +511,8 @@ class Server(object):
 
 		logging.debug("[JOIN] [%s] %s joined %s" % (game.uuid, player, game))
 		game.add_player(player, packet)
-		for _player in game.players:
-			self.send(_player.peer, packets.server.data_gamestate(game))
+		self.gamechanged(game)
+		self.broadcast([_player.peer for _player in game.players], packets.server.data_gamestate(game))
 
 		if player.protocol == 0:
 			if game.is_full():
@@ -462,8 +538,8 @@ class Server(object):
 		if game.is_empty():
 			self.call_callbacks('deletegame', game)
 			return
-		for _player in game.players:
-			self.send(_player.peer, packets.server.data_gamestate(game))
+		self.gamechanged(game)
+		self.broadcast([_player.peer for _player in game.players], packets.server.data_gamestate(game))
 		# the creator leaving the game is a hard error too
 		if player.protocol >= 1 and player == game.creator:
 			self.call_callbacks('terminategame', game, player)
@@ -489,15 +565,15 @@ class Server(object):
 	def preparegame(self, game):
 		logging.debug("[PREPARE] [%s] Players: %s" % (game.uuid, [unicode(i) for i in game.players]))
 		game.state = Game.State.Prepare
-		for _player in game.players:
-			self.send(_player.peer, packets.server.cmd_preparegame())
+		self.__remove_open_game(game)
+		self.gamechanged(game)
+		self.broadcast([_player.peer for _player in game.players], packets.server.cmd_preparegame())
 
 
 	def startgame(self, game):
 		logging.debug("[START] [%s] Players: %s" % (game.uuid, [unicode(i) for i in game.players]))
 		game.state = Game.State.Running
-		for _player in game.players:
-			self.send(_player.peer, packets.server.cmd_startgame())
+		self.broadcast([_player.peer for _player in game.players], packets.server.cmd_startgame())
 
 
 	def onchat(self, player, packet):
@@ -510,8 +586,7 @@ class Server(object):
 		if not game.is_open():
 			return
 		logging.debug("[CHAT] [%s] %s: %s" % (game.uuid, player, packet.chatmsg))
-		for _player in game.players:
-			self.send(_player.peer, packets.server.cmd_chatmsg(player.name, packet.chatmsg))
+		self.broadcast([_player.peer for _player in game.players], packets.server.cmd_chatmsg(player.name, packet.chatmsg))
 
 
 	def onchangename(self, player, packet):
@@ -538,8 +613,9 @@ class Server(object):
 		# ACK the change
 		logging.debug("[CHANGENAME] [%s] %s -> %s" % (game.uuid, player.name, packet.playername))
 		player.name = packet.playername
-		for _player in game.players:
-			self.send(_player.peer, packets.server.data_gamestate(game))
+		if player is game.creator:
+			self.gamechanged(game)
+		self.broadcast([_player.peer for _player in game.players], packets.server.data_gamestate(game))
 
 
 	def onchangecolor(self, player, packet):
@@ -566,17 +642,13 @@ class Server(object):
 		# ACK the change
 		logging.debug("[CHANGECOLOR] [%s] Player:%s %s -> %s" % (game.uuid, player.name, player.color, packet.playercolor))
 		player.color = packet.playercolor
-		for _player in game.players:
-			self.send(_player.peer, packets.server.data_gamestate(game))
+		self.broadcast([_player.peer for _player in game.players], packets.server.data_gamestate(game))
 
 
 	def gamedata(self, player, data):
 		game = player.game
 		#logging.debug("[GAMEDATA] [%s] %s" % (game.uuid, player))
-		for _player in game.players:
-			if _player is player:
-				continue
-			self.sendraw(_player.peer, data)
+		self.broadcastraw([_player.peer for _player in game.players if _player is not player], data)
 
 
 	# this event happens after a player is done with loading
@@ -608,8 +680,7 @@ class Server(object):
 		player.toggle_ready()
 		logging.debug("[TOGGLEREADY] [%s] Player:%s %s ready" %
 				(game.uuid, player.name, "is not" if not player.ready else "is"))
-		for _player in game.players:
-			self.send(_player.peer, packets.server.data_gamestate(game))
+		self.broadcast([_player.peer for _player in game.players], packets.server.data_gamestate(game))
 
 		# start the game after the ACK
 		if game.is_ready():
@@ -637,8 +708,7 @@ class Server(object):
 			return
 
 		logging.debug("[KICK] [%s] %s got kicked" % (game.uuid, kickplayer.name))
-		for _player in game.players:
-			self.send(_player.peer, packets.server.cmd_kickplayer(kickplayer))
+		self.broadcast([_player.peer for _player in game.players], packets.server.cmd_kickplayer(kickplayer))
 		self.call_callbacks("leavegame", kickplayer)
 
 
@@ -697,3 +767,14 @@ class Server(object):
 			logging.error("[STATISTIC] Unable to open statistic file: %s" % (e))
 		return
 
+
+	def export_metrics(self, file):
+		games_playing = sum(1 for game in self.games if game.state is Game.State.Running)
+		try:
+			self.metrics.export(file, {
+				'games': len(self.games),
+				'games_playing': games_playing,
+				'players': len(self.players),
+			})
+		except (IOError, OSError) as e:
+			logging.error("[METRICS] Unable to write metrics file: %s" % (e))
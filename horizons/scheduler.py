@@ -32,11 +32,17 @@ class Scheduler(LivingObject):
 	""""Class providing timed callbacks.
 	Master of time.
 
-	TODO:
-	- Refactor to use a data structure that is suitable for iteration (ticking) as well as
-	  searching/deleting by instance, possibly also by callback.
-	  Suggestion: { tick -> { instance -> [callback] }} (basically a k-d tree)
-
+	Pending calls are stored in a two-level timing wheel: calls due within the next
+	WHEEL_SIZE ticks live in a ring of FIFO buckets indexed by tick, calls further in the
+	future are kept in an overflow dict and cascaded into the ring as soon as their tick
+	enters its horizon. Since the overflow of a tick is moved before any call can be added
+	directly to the ring bucket of that tick, the execution order stays strictly FIFO.
+
+	Every scheduled call is represented by a handle (a one-element list referencing the
+	CallbackObject) that is stored in the bucket. Cancelling a call just clears its handle,
+	the bucket skips cleared handles when it is executed. Together with the per-instance
+	index this makes adding, removing and looking up calls independent of the total number
+	of scheduled calls.
 
 	@param timer: Timer instance the schedular registers itself with.
 	"""
@@ -47,21 +53,29 @@ class Scheduler(LivingObject):
 	# the tick with this id is actually executed, and no tick with a smaller number can occur
 	FIRST_TICK_ID = 0
 
+	# number of ticks covered by the ring of buckets, calls further away go to the overflow
+	WHEEL_SIZE = 256
+
 	def __init__(self, timer):
 		"""
 		@param timer: Timer obj
 		"""
 		super(Scheduler, self).__init__()
-		self.schedule = {}
+		self._wheel = [deque() for i in xrange(self.WHEEL_SIZE)]
+		self._overflow = {} # { tick: deque of handles } for ticks beyond the wheel
+		self._pending = 0 # number of handles stored in the wheel and the overflow
 		self.additional_cur_tick_schedule = [] # jobs to be executed at the same tick they were added
-		self.calls_by_instance = {} # for get_classinst_calls
+		self.calls_by_instance = {} # { instance: { CallbackObject: None } }, for get_classinst_calls
 		self.cur_tick = self.__class__.FIRST_TICK_ID-1 # before ticking
+		self.profiler = None # optional object whose run(CallbackObject) executes the calls
 		self.timer = timer
 		self.timer.add_call(self.tick)
 
 	def end(self):
-		self.log.debug("Scheduler end; len: %s", len(self.schedule))
-		self.schedule = None
+		self.log.debug("Scheduler end; pending calls: %s", self._pending)
+		self._wheel = None
+		self._overflow = None
+		self.calls_by_instance = None
 		self.timer.remove_call(self.tick)
 		self.timer = None
 		super(Scheduler, self).end()
@@ -77,45 +91,52 @@ class Scheduler(LivingObject):
 			horizons.main.quit()
 			return
 
-		if self.cur_tick in self.schedule:
-			self.log.debug("Scheduler: tick %s, cbs: %s", self.cur_tick, len(self.schedule[self.cur_tick]))
+		# the bucket of the previous tick is free now, it takes over the calls of the tick
+		# that just entered the horizon of the wheel
+		horizon_tick = tick_id + self.WHEEL_SIZE - 1
+		if horizon_tick in self._overflow:
+			self._wheel[horizon_tick % self.WHEEL_SIZE].extend(self._overflow.pop(horizon_tick))
 
-			# use iteration method that works in case the list is altered during iteration
-			# this can happen for e.g. rem_all_classinst_calls
-			cur_schedule = self.schedule[self.cur_tick]
+		cur_schedule = self._wheel[tick_id % self.WHEEL_SIZE]
+		if cur_schedule:
+			self.log.debug("Scheduler: tick %s, cbs: %s", self.cur_tick, len(cur_schedule))
+
+			# use iteration method that works in case the deque is altered during iteration
 			while cur_schedule:
-				callback = cur_schedule.popleft()
+				handle = cur_schedule.popleft()
+				self._pending -= 1
+				callback = handle[0]
 				# TODO: some system-level unit tests fail if this list is not processed in the correct order
 				#       (i.e. if e.g. pop() was used here). This is an indication of invalid assumptions
 				#       in the program and should be fixed.
 
-				if hasattr(callback, "invalid"):
+				if callback is None: # removed by rem_object or rem_call
+					continue
+				callback._handle = None
+				if callback.invalid:
 					self.log.debug("S(t:%s): %s: INVALID", tick_id, callback)
 					continue
 				self.log.debug("S(t:%s): %s", tick_id, callback)
-				callback.callback()
+				if self.profiler is None:
+					callback.callback()
+				else:
+					self.profiler.run(callback)
 				assert callback.loops >= -1
 				if callback.loops != 0:
 					self.add_object(callback, readd=True)
 				else: # gone for good
-					if callback.class_instance in self.calls_by_instance:
+					calls = self.calls_by_instance.get(callback.class_instance)
+					if calls is not None:
 						# this can already be removed by e.g. rem_all_classinst_calls
 						if callback.finish_callback is not None:
 							callback.finish_callback()
-
-						try:
-							self.calls_by_instance[callback.class_instance].remove(callback)
-						except ValueError:
-							pass # also the callback can be deleted by e.g. rem_call
-			del self.schedule[self.cur_tick]
+						self._unindex(callback)
 
 			self.log.debug("Scheduler: finished tick %s", self.cur_tick)
 
 		# run jobs added in the loop above
 		self._run_additional_jobs()
 
-		assert (not self.schedule) or self.schedule.iterkeys().next() > self.cur_tick
-
 	def before_ticking(self):
 		"""Called after game load and before game has started.
 		Callbacks with run_in=0 are used as generic "do this as soon as the current context
@@ -127,9 +148,30 @@ class Scheduler(LivingObject):
 	def _run_additional_jobs(self):
 		for callback in self.additional_cur_tick_schedule:
 			assert callback.loops == 0 # can't loop with no delay
-			callback.callback()
+			if self.profiler is None:
+				callback.callback()
+			else:
+				self.profiler.run(callback)
 		self.additional_cur_tick_schedule = []
 
+	def _unindex(self, callback_obj):
+		"""Removes a CallbackObject from the per-instance index."""
+		calls = self.calls_by_instance.get(callback_obj.class_instance)
+		if calls is not None and callback_obj in calls:
+			del calls[callback_obj]
+			if not calls:
+				del self.calls_by_instance[callback_obj.class_instance]
+
+	def _cancel(self, callback_obj):
+		"""Removes the pending execution of a CallbackObject from the schedule.
+		@return: bool, whether there was a pending execution"""
+		handle = callback_obj._handle
+		if handle is None:
+			return False
+		handle[0] = None
+		callback_obj._handle = None
+		return True
+
 	def add_object(self, callback_obj, readd=False):
 		"""Adds a new CallbackObject instance to the callbacks list for the first time
 		@param callback_obj: CallbackObject type object, containing all necessary  information
@@ -142,14 +184,21 @@ class Scheduler(LivingObject):
 		else: # default: run in future tick
 			interval = callback_obj.loop_interval if readd else callback_obj.run_in
 			tick_key = self.cur_tick + interval
-			if not tick_key in self.schedule:
-				self.schedule[tick_key] = deque()
 			callback_obj.tick = tick_key
-			self.schedule[tick_key].append(callback_obj)
-			if not readd:  # readded calls haven't been removed here
-				if not callback_obj.class_instance in self.calls_by_instance:
-					self.calls_by_instance[callback_obj.class_instance] = []
-				self.calls_by_instance[callback_obj.class_instance].append( callback_obj )
+			handle = [callback_obj]
+			callback_obj._handle = handle
+			if interval < self.WHEEL_SIZE:
+				self._wheel[tick_key % self.WHEEL_SIZE].append(handle)
+			else:
+				if tick_key not in self._overflow:
+					self._overflow[tick_key] = deque()
+				self._overflow[tick_key].append(handle)
+			self._pending += 1
+			if not readd:  # readded calls haven't been removed from the index
+				callback_obj.invalid = False
+				if callback_obj.class_instance not in self.calls_by_instance:
+					self.calls_by_instance[callback_obj.class_instance] = {}
+				self.calls_by_instance[callback_obj.class_instance][callback_obj] = None
 
 	def add_new_object(self, callback, class_instance, run_in=1, loops=1, loop_interval=None, finish_callback=None):
 		"""Creates a new CallbackObject instance and calls the self.add_object() function.
@@ -166,31 +215,17 @@ class Scheduler(LivingObject):
 		@param callback_obj: CallbackObject to remove
 		@return: int, number of removed calls
 		"""
-		removed_objs = 0
-		if self.schedule is not None:
-			for key in self.schedule:
-				while callback_obj in self.schedule[key]:
-					self.schedule[key].remove(callback_obj)
-					self.calls_by_instance[callback_obj.class_instance].remove(callback_obj)
-					removed_objs += 1
-
-		if not self.calls_by_instance[callback_obj.class_instance]:
-			del self.calls_by_instance[callback_obj.class_instance]
-
-		return removed_objs
+		if self._wheel is None or not self._cancel(callback_obj):
+			return 0
+		self._unindex(callback_obj)
+		return 1
 
 	def rem_all_classinst_calls(self, class_instance):
 		"""Removes all callbacks from the scheduler that belong to the class instance class_inst."""
-		"""
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if callback_objects[i].class_instance is class_instance:
-					del callback_objects[i]
-		"""
 		if class_instance in self.calls_by_instance:
 			for callback_obj in self.calls_by_instance[class_instance]:
-				callback_obj.invalid = True # don't remove, finding them all takes too long
+				self._cancel(callback_obj)
+				callback_obj.invalid = True # also stops a call that is currently executed from looping
 			del self.calls_by_instance[class_instance]
 
 		# filter additional callbacks as well
@@ -206,30 +241,17 @@ class Scheduler(LivingObject):
 		"""
 		assert callable(callback)
 		removed_calls = 0
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if (callback_objects[i].class_instance is instance
-				    and callback_objects[i].callback == callback
-				    and not hasattr(callback_objects[i], "invalid")):
-					del callback_objects[i]
+		if instance in self.calls_by_instance:
+			for callback_obj in self.calls_by_instance[instance].keys():
+				# the call that is executed right now isn't scheduled and therefore not removed
+				if callback_obj.callback == callback and self._cancel(callback_obj):
+					self._unindex(callback_obj)
 					removed_calls += 1
 
-		test = 0
-		if removed_calls > 0: # there also must be calls in the calls_by_instance dict
-			for i in xrange(len(self.calls_by_instance[instance]) - 1, -1, -1):
-				obj = self.calls_by_instance[instance][i]
-				if obj.callback == callback:
-					del self.calls_by_instance[instance][i]
-					test += 1
-			assert test == removed_calls, "%s, %s" % (test, removed_calls)
-			if not self.calls_by_instance[instance]:
-				del self.calls_by_instance[instance]
-
 		for i in xrange(len(self.additional_cur_tick_schedule) - 1, -1, -1):
 			if self.additional_cur_tick_schedule[i].class_instance is instance and \
 				self.additional_cur_tick_schedule[i].callback == callback:
-					del callback_objects[i]
+					del self.additional_cur_tick_schedule[i]
 					removed_calls += 1
 
 		return removed_calls
@@ -289,6 +311,8 @@ class _CallbackObject(object):
 		self.loops = loops
 		self.loop_interval = loop_interval if loop_interval is not None else run_in
 		self.class_instance = class_instance
+		self.invalid = False # set when all calls of class_instance have been removed
+		self._handle = None # entry in the schedule of the scheduler, None if not scheduled
 
 	def __str__(self):
 		cb = str(self.callback)
@@ -34,6 +34,7 @@ import horizons.main
 from horizons.ai.aiplayer import AIPlayer
 from horizons.gui.ingamegui import IngameGui
 from horizons.command.building import Tear
+from horizons.util.callbackprofiler import CallbackProfiler
 from horizons.util.dbreader import DbReader
 from horizons.command.unit import RemoveUnit
 from horizons.scheduler import Scheduler
@@ -43,6 +44,7 @@ from horizons.world import World
 from horizons.entities import Entities
 from horizons.util.living import LivingObject, livingProperty
 from horizons.util.savegameaccessor import SavegameAccessor
+from horizons.util.savegamewriter import SaveBuffer, SavegameWriter
 from horizons.util.worldobject import WorldObject
 from horizons.util.uhdbaccessor import read_savegame_template
 from horizons.component.namedcomponent import NamedComponent
@@ -50,7 +52,7 @@ from horizons.component.selectablecomponent import SelectableComponent, Selectab
 from horizons.savegamemanager import SavegameManager
 from horizons.scenario import ScenarioEventHandler
 from horizons.component.ambientsoundcomponent import AmbientSoundComponent
-from horizons.constants import GAME_SPEED
+from horizons.constants import GAME, GAME_SPEED, PATHS
 from horizons.messaging import SettingChanged, MessageBus, SpeedChanged, LoadingProgress
 
 class Session(LivingObject):
@@ -116,12 +118,15 @@ class Session(LivingObject):
 		self.selection_groups = [set() for _ in range(10)]  # List of sets that holds the player assigned unit groups.
 
 		self._old_autosave_interval = None
+		self._savegame_writer = SavegameWriter()
 
 	def start(self):
 		"""Actually starts the game."""
 		self.timer.activate()
 		self.scenario_eventhandler.start()
 		self.reset_autosave()
+		if GAME.CALLBACK_PROFILE is not None:
+			Scheduler().profiler = CallbackProfiler()
 		SettingChanged.subscribe(self._on_setting_changed)
 
 	def reset_autosave(self):
@@ -151,6 +156,24 @@ class Session(LivingObject):
 		"""Returns a Timer instance."""
 		raise NotImplementedError
 
+	def toggle_callback_profiler(self):
+		"""Starts profiling the scheduled calls, or stops it and writes the results to a file."""
+		if Scheduler().profiler is None:
+			self.log.info("Profiling scheduled calls")
+			Scheduler().profiler = CallbackProfiler()
+		else:
+			filename = os.path.join(PATHS.LOG_DIR, time.strftime('callbacks-%Y-%m-%d-%H-%M-%S.csv'))
+			self._dump_callback_profile(filename)
+
+	def _dump_callback_profile(self, filename):
+		profiler = Scheduler().profiler
+		Scheduler().profiler = None
+		try:
+			profiler.dump(filename)
+			self.log.info("Wrote profile of scheduled calls to %s", filename)
+		except IOError as e:
+			self.log.error("Failed to write profile of scheduled calls to %s: %s", filename, e)
+
 	@classmethod
 	def _clear_caches(cls):
 		"""Clear all data caches in global namespace related to a session"""
@@ -163,6 +186,8 @@ class Session(LivingObject):
 		self.log.debug("Ending session")
 		self.is_alive = False
 
+		self._savegame_writer.end()
+
 		# Has to be done here, cause the manager uses Scheduler!
 		Scheduler().rem_all_classinst_calls(self)
 		ExtScheduler().rem_all_classinst_calls(self)
@@ -181,6 +206,12 @@ class Session(LivingObject):
 		self.timer = None
 		self.scenario_eventhandler = None
 
+		if Scheduler().profiler is not None:
+			if GAME.CALLBACK_PROFILE is not None:
+				self._dump_callback_profile(GAME.CALLBACK_PROFILE)
+			else: # started by hotkey
+				self.toggle_callback_profiler()
+
 		Scheduler().end()
 		Scheduler.destroy_instance()
 
@@ -389,11 +420,27 @@ class Session(LivingObject):
 			else:
 				self.log.error('Unable to remove unknown object %s', instance)
 
-	def _do_save(self, savegame):
+	def _do_save(self, savegame, in_background=False, finish_callback=None):
 		"""Actual save code.
-		@param savegame: absolute path"""
+		@param savegame: absolute path
+		@param in_background: only take the snapshot of the game state now and write the
+		                      savegame in a background thread.
+		@param finish_callback: used with in_background, called on the main thread with a bool,
+		                        whether the savegame has been written successfully
+		@return: bool, whether no error happened (so far, if in_background)"""
 		assert os.path.isabs(savegame)
 		self.log.debug("Session: Saving to %s", savegame)
+		if in_background:
+			self.savecounter += 1
+			try:
+				save_buffer = self._take_save_snapshot()
+			except:
+				print "Save Exception"
+				traceback.print_exc()
+				return False
+			self._savegame_writer.write(savegame, save_buffer, finish_callback)
+			return True
+
 		try:
 			if os.path.exists(savegame):
 				os.unlink(savegame)
@@ -415,23 +462,11 @@ class Session(LivingObject):
 			raise
 
 		try:
+			save_buffer = self._take_save_snapshot()
 			read_savegame_template(db)
 
 			db("BEGIN")
-			self.world.save(db)
-			#self.manager.save(db)
-			self.view.save(db)
-			self.ingame_gui.save(db)
-			self.scenario_eventhandler.save(db)
-
-			for instance in self.selected_instances:
-				db("INSERT INTO selected(`group`, id) VALUES(NULL, ?)", instance.worldid)
-			for group in xrange(len(self.selection_groups)):
-				for instance in self.selection_groups[group]:
-					db("INSERT INTO selected(`group`, id) VALUES(?, ?)", group, instance.worldid)
-
-			rng_state = json.dumps(self.random.getstate())
-			SavegameManager.write_metadata(db, self.savecounter, rng_state)
+			save_buffer.write(db)
 			# make sure everything gets written now
 			db("COMMIT")
 			db.close()
@@ -442,3 +477,23 @@ class Session(LivingObject):
 			db.close() # close db before delete
 			os.unlink(savegame) # remove invalid savegamefile
 			return False
+
+	def _take_save_snapshot(self):
+		"""Saves the game state into memory, so that it can be written to the disk later.
+		@return: SaveBuffer"""
+		db = SaveBuffer()
+		self.world.save(db)
+		#self.manager.save(db)
+		self.view.save(db)
+		self.ingame_gui.save(db)
+		self.scenario_eventhandler.save(db)
+
+		for instance in self.selected_instances:
+			db("INSERT INTO selected(`group`, id) VALUES(NULL, ?)", instance.worldid)
+		for group in xrange(len(self.selection_groups)):
+			for instance in self.selection_groups[group]:
+				db("INSERT INTO selected(`group`, id) VALUES(?, ?)", group, instance.worldid)
+
+		rng_state = json.dumps(self.random.getstate())
+		SavegameManager.write_metadata(db, self.savecounter, rng_state)
+		return db
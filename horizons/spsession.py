@@ -47,7 +47,12 @@ class SPSession(Session):
 	def autosave(self):
 		"""Called automatically in an interval"""
 		self.log.debug("Session: autosaving")
-		success = self._do_save(SavegameManager.create_autosave_filename())
+		# the savegame is written in the background to avoid stalling the game
+		self._do_save(SavegameManager.create_autosave_filename(), in_background=True,
+		              finish_callback=self._autosave_finished)
+
+	def _autosave_finished(self, success):
+		"""Called when the autosave has been written or failed"""
 		if success:
 			SavegameManager.delete_dispensable_savegames(autosaves=True)
 			self.ingame_gui.message_widget.add('AUTOSAVE')
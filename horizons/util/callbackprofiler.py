@@ -0,0 +1,140 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import csv
+import functools
+import json
+import time
+
+from horizons.world.ingametype import IngameType
+from horizons.util.python.callback import Callback
+from horizons.util.python.weakmethod import WeakMethod
+
+
+class CallbackProfiler(object):
+	"""Accounts the time spent in the calls executed by the Scheduler.
+
+	Set an instance as Scheduler().profiler to activate it, the scheduler then executes
+	every call through run(). Calls are grouped by the function that is called (e.g.
+	"MovingObject._move_tick"; Callback and WeakMethod wrappers are looked through) and the
+	class of the instance that scheduled the call (for buildings and units the class their
+	type is based on, plus the type id, e.g. "Lumberjack[8]"). When no profiler is set, the scheduler
+	doesn't pay anything but a check for None.
+	"""
+
+	FIELDS = ('callback', 'instance_class', 'module', 'calls', 'seconds', 'max_seconds')
+
+	def __init__(self):
+		self._stats = {} # { (callback name, instance class): [calls, seconds, max seconds] }
+		self._names = {} # { function: name }, names are expensive to look up
+
+	def run(self, callback_obj):
+		"""Executes callback_obj.callback() and records the time it takes."""
+		start = time.time()
+		try:
+			callback_obj.callback()
+		finally:
+			duration = time.time() - start
+			key = (self.get_callback_name(callback_obj.callback), callback_obj.class_instance.__class__)
+			stats = self._stats.get(key)
+			if stats is None:
+				self._stats[key] = [1, duration, duration]
+			else:
+				stats[0] += 1
+				stats[1] += duration
+				if duration > stats[2]:
+					stats[2] = duration
+
+	def get_callback_name(self, callback):
+		"""Returns a readable name of the function that is executed by callback, like
+		"ClassName.method" for methods, where ClassName is the class that defines the method."""
+		while True:
+			if isinstance(callback, Callback):
+				callback = callback.callback
+			elif isinstance(callback, WeakMethod):
+				callback = callback.function
+			elif isinstance(callback, functools.partial):
+				callback = callback.func
+			else:
+				break
+
+		function = getattr(callback, 'im_func', callback)
+		try:
+			return self._names[function]
+		except (KeyError, TypeError): # TypeError: unhashable callable
+			pass
+
+		name = getattr(function, '__name__', None)
+		if name is None:
+			name = function.__class__.__name__ + '.__call__'
+		elif hasattr(callback, 'im_class'):
+			# find the class that actually defines the method
+			for cls in callback.im_class.__mro__:
+				if cls.__dict__.get(name) is function:
+					name = cls.__name__ + '.' + name
+					break
+			else:
+				name = callback.im_class.__name__ + '.' + name
+		try:
+			self._names[function] = name
+		except TypeError:
+			pass
+		return name
+
+	def reset(self):
+		self._stats.clear()
+
+	def get_results(self):
+		"""@return: list of dicts with the keys in FIELDS, the most expensive calls first"""
+		results = []
+		for (name, cls), (calls, seconds, max_seconds) in self._stats.iteritems():
+			if isinstance(cls, IngameType):
+				class_name = '%s[%s]' % (cls.__bases__[0].__name__, cls.id)
+				cls = cls.__bases__[0]
+			else:
+				class_name = cls.__name__
+			results.append({
+				'callback': name,
+				'instance_class': class_name,
+				'module': cls.__module__,
+				'calls': calls,
+				'seconds': seconds,
+				'max_seconds': max_seconds,
+			})
+		results.sort(key=lambda result: (-result['seconds'], result['callback'], result['instance_class']))
+		return results
+
+	def dump_json(self, filename):
+		with open(filename, 'w') as f:
+			json.dump(self.get_results(), f, indent=1, sort_keys=True)
+
+	def dump_csv(self, filename):
+		with open(filename, 'wb') as f:
+			writer = csv.DictWriter(f, self.FIELDS)
+			writer.writeheader()
+			writer.writerows(self.get_results())
+
+	def dump(self, filename):
+		"""Writes the results to filename, as CSV if it ends with .csv, as JSON otherwise."""
+		if filename.lower().endswith('.csv'):
+			self.dump_csv(filename)
+		else:
+			self.dump_json(filename)
@@ -19,11 +19,23 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import logging
 import traceback
 
 from horizons.util.python.callback import Callback
 from horizons.util.python.weakmethodlist import WeakMethodList
 
+log = logging.getLogger("util.changelistener")
+
+def call_listener(listener, source):
+	"""Calls listener, a listener whose object is dead is ignored.
+	@param source: the object whose listener is called, used for the warning"""
+	try:
+		listener()
+	except ReferenceError as e:
+		# listener object is dead, don't crash since it doesn't need updates now anyway
+		log.warning('the dead are listening to %s: %s\n%s', source, e, ''.join(traceback.format_stack()))
+
 class ChangeListener(object):
 	"""Trivial ChangeListener.
 	The object that changes and the object that listens have to inherit from this class.
@@ -66,12 +78,7 @@ class ChangeListener(object):
 		self.__event_call_number += 1
 		for listener in listener_list:
 			if listener:
-				try:
-					listener()
-				except ReferenceError as e:
-					# listener object is dead, don't crash since it doesn't need updates now anyway
-					print 'Warning: the dead are listening to', self, ': ', e
-					traceback.print_stack()
+				call_listener(listener, self)
 
 		self.__event_call_number -= 1
 
@@ -21,38 +21,92 @@
 
 import sqlite3
 import re
+from collections import OrderedDict
 
 from horizons.util.python import decorators
 
+
+class QueryCache(object):
+	"""LRU cache for the results of queries, which keeps hit statistics per query.
+	@param max_size: maximum number of cached results"""
+
+	def __init__(self, max_size):
+		self.max_size = max_size
+		self._results = OrderedDict() # { (command, args): result }, least recently used first
+		self._statistics = {} # { command: [hits, misses] }
+
+	def __len__(self):
+		return len(self._results)
+
+	def get(self, command, args):
+		"""@return: the cached result or None"""
+		key = (command, args)
+		result = self._results.pop(key, None)
+		stats = self._statistics.get(command)
+		if stats is None:
+			stats = self._statistics[command] = [0, 0]
+		if result is None:
+			stats[1] += 1
+		else:
+			stats[0] += 1
+			self._results[key] = result # mark as recently used
+		return result
+
+	def add(self, command, args, result):
+		if len(self._results) >= self.max_size:
+			self._results.popitem(last=False)
+		self._results[(command, args)] = result
+
+	def clear(self):
+		self._results.clear()
+
+	def get_statistics(self):
+		"""@return: dict { command: {'hits': int, 'misses': int} }"""
+		return dict((command, {'hits': hits, 'misses': misses})
+		            for command, (hits, misses) in self._statistics.iteritems())
+
+
 class DbReader(object):
 	"""Class that handles connections to sqlite databases
 	@param file: str containing the database file."""
+
+	# number of prepared statements that sqlite keeps per connection for reuse
+	CACHED_STATEMENTS = 256
+	# maximum number of results kept by cached_query
+	QUERY_CACHE_SIZE = 4096
+
 	def __init__(self, dbfile):
 		self.db_path = dbfile
-		self.connection = sqlite3.connect(dbfile)
+		self.connection = sqlite3.connect(dbfile, cached_statements=self.CACHED_STATEMENTS)
 		self.connection.isolation_level = None
 		def regexp(expr, item):
 			r = re.compile(expr)
 			return r.match(item) is not None
 		self.connection.create_function("regexp", 2, regexp)
 		self.cur = self.connection.cursor()
+		self._rows = OrderedDict() # { command: [args] }, see add_row
+		self.query_cache = QueryCache(self.QUERY_CACHE_SIZE)
 
 	@decorators.make_constants()
 	def __call__(self, command, *args):
 		"""Executes a sql command.
-		@param command: str containing the raw sql command, with ? as placeholders for values (eg. SELECT ? FROM ?). command must not end with ';', it's added automatically here.
+		@param command: str containing the raw sql command, with ? as placeholders for values (eg. SELECT ? FROM ?). command must not end with ';'.
 		@param args: tuple containing the values to add into the command.
 		"""
 		assert not command.endswith(";")
-		command = '%s;' % command
+		# the command string is used as is, so that sqlite can reuse its prepared statement
 		self.cur.execute(command, args)
 		return self.cur.fetchall()
 
-	@decorators.cachedmethod
 	def cached_query(self, command, *args):
-		"""Executes a sql command and saves its result in a dict.
+		"""Executes a sql command and caches its result (see query_cache).
+		Only use this for data that doesn't change, like the game data in the main db.
 		@params, return: same as in __call__"""
-		return self(command, *args)
+		result = self.query_cache.get(command, args)
+		if result is None:
+			result = self(command, *args)
+			self.query_cache.add(command, args, result)
+		return result
 
 	def execute_many(self, command, parameters):
 		"""Executes a sql command for each sequence or mapping
@@ -61,6 +115,24 @@ class DbReader(object):
 		@param parameters: sequence or iterator"""
 		return self.cur.executemany(command, parameters)
 
+	def add_row(self, command, *args):
+		"""Queues a sql command, which is executed by the next call of flush_rows().
+		The queued rows of a command are executed with a single executemany, which is a lot
+		faster than executing them one by one. This is meant for saving, for commands whose
+		effect isn't needed before the flush, like INSERTs into tables that aren't read or
+		updated in between.
+		@params: same as in __call__"""
+		if command in self._rows:
+			self._rows[command].append(args)
+		else:
+			self._rows[command] = [args]
+
+	def flush_rows(self):
+		"""Executes the commands queued by add_row(), in the order of their first use."""
+		for command, rows in self._rows.iteritems():
+			self.execute_many(command, rows)
+		self._rows.clear()
+
 	def execute_script(self, script):
 		"""Executes a multiline script.
 		@param script: multiline str containing an sql script."""
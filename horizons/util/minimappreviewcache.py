@@ -0,0 +1,155 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import hashlib
+import logging
+import os
+
+from horizons.constants import PATHS
+from horizons.util.python.singleton import Singleton
+from horizons.util.savegameaccessor import SavegameAccessor
+
+
+class MinimapPreviewCache(object):
+	"""
+	Store minimap previews of maps and savegames on disk.
+
+	A preview is the data returned by Minimap.dump_data and is stored in a file of its own,
+	named after its key. Keys of map and savegame files are derived from the hash of the file
+	content, so the same map is only rendered once, no matter where it is found. When there
+	are more than max_entries previews, the least recently used ones are removed.
+
+	Errors while reading or writing the cache are logged and ignored, the preview is just
+	calculated again in that case.
+	"""
+	__metaclass__ = Singleton
+
+	log = logging.getLogger("util.minimappreviewcache")
+
+	# Increment this when the format of Minimap.dump_data changes.
+	version = 1
+
+	MAX_ENTRIES = 256
+	FILE_EXTENSION = '.json'
+
+	def __init__(self, directory=None, max_entries=MAX_ENTRIES):
+		"""
+		@param directory: where the previews are stored, defaults to PATHS.MINIMAP_CACHE_DIR
+		@param max_entries: maximum number of previews that are kept
+		"""
+		super(MinimapPreviewCache, self).__init__()
+		self._directory = directory if directory is not None else PATHS.MINIMAP_CACHE_DIR
+		self._max_entries = max_entries
+		self._file_hashes = {} # { filename: (modification time, file size, hash) }
+
+	def get_key(self, *args):
+		"""Returns the key of a preview that is uniquely defined by args.
+		@param args: values with a stable repr, e.g. random map parameters and the preview size"""
+		return hashlib.sha1(repr((self.version, ) + args)).hexdigest()
+
+	def get_file_key(self, filename, size):
+		"""Returns the key of the preview of a map or savegame file.
+		@param filename: path to the map or savegame
+		@param size: (width, height) of the preview
+		@return: key or None if the file doesn't exist"""
+		filehash = self._get_file_hash(filename)
+		if filehash is None:
+			return None
+		return self.get_key('file', filehash, tuple(size))
+
+	def _get_file_hash(self, filename):
+		"""Hashes the file content, which is only done again if the file has changed."""
+		try:
+			stat = os.stat(filename)
+		except OSError:
+			return None
+		if filename in self._file_hashes:
+			mtime, filesize, filehash = self._file_hashes[filename]
+			if mtime == stat.st_mtime and filesize == stat.st_size:
+				return filehash
+		filehash = SavegameAccessor.get_hash(filename)
+		if not filehash:
+			return None
+		self._file_hashes[filename] = (stat.st_mtime, stat.st_size, filehash)
+		return filehash
+
+	def _get_path(self, key):
+		return os.path.join(self._directory, key + self.FILE_EXTENSION)
+
+	def get(self, key):
+		"""Returns the stored preview data for key or None."""
+		if key is None:
+			return None
+		path = self._get_path(key)
+		if not os.path.exists(path):
+			return None
+		try:
+			with open(path, 'rb') as f:
+				data = f.read()
+			os.utime(path, None) # mark as recently used
+		except (IOError, OSError) as e:
+			self.log.warning('Failed to read minimap preview %s: %s', path, e)
+			return None
+		self.log.debug('%s.get(): found preview %s', self, key)
+		return data
+
+	def set(self, key, data):
+		"""Stores the preview data for key."""
+		if key is None:
+			return
+		path = self._get_path(key)
+		tmp_path = path + '.tmp'
+		try:
+			if not os.path.isdir(self._directory):
+				os.makedirs(self._directory)
+			with open(tmp_path, 'wb') as f:
+				f.write(data)
+			if os.path.exists(path):
+				os.remove(path) # rename doesn't overwrite files on windows
+			os.rename(tmp_path, path)
+		except (IOError, OSError) as e:
+			self.log.warning('Failed to write minimap preview %s: %s', path, e)
+			return
+		self._remove_least_recently_used()
+
+	def get_or_create(self, key, create):
+		"""Returns the stored preview data for key, creates and stores it if necessary.
+		@param create: function returning the preview data"""
+		data = self.get(key)
+		if data is None:
+			data = create()
+			self.set(key, data)
+		return data
+
+	def _remove_least_recently_used(self):
+		try:
+			entries = [os.path.join(self._directory, name) for name in os.listdir(self._directory)
+			           if name.endswith(self.FILE_EXTENSION)]
+			if len(entries) <= self._max_entries:
+				return
+			entries.sort(key=os.path.getmtime)
+			for path in entries[:len(entries) - self._max_entries]:
+				os.remove(path)
+		except OSError as e:
+			self.log.warning('Failed to clean up minimap previews in %s: %s', self._directory, e)
+
+	def __str__(self):
+		return "MinimapPreviewCache(%s)" % self._directory
@@ -0,0 +1,254 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from array import array
+from heapq import heappush, heappop
+
+from horizons.util.python import decorators
+from horizons.util.pathfinding.pathcache import PathCache
+from horizons.util.pathfinding.pathfinding import FindPath
+
+"""
+This file contains an array based variant of the pathfinding algorithm. Path nodes that are
+stored in a GridNodes instance are additionally kept in a dense array, which GridFindPath
+searches on integer encoded coordinates. It returns exactly the same paths as FindPath and
+falls back to it for path nodes it can't handle.
+"""
+
+class GridNodes(dict):
+	"""dict { (x, y): speed } that mirrors its content into a dense array of speeds.
+
+	The array covers the rectangle given on construction plus a border of one tile, so that
+	the neighbors of every node inside the rectangle can be looked up without bounds checks.
+	Coordinates (x, y) are encoded as (x - origin_x) * height + (y - origin_y), which keeps
+	the order of the encoded coordinates the same as the order of the tuples.
+
+	Nodes outside of the rectangle are supported, but disable the array based search.
+
+	Changes are also reported to path_cache, which can be used to store paths found on
+	these nodes.
+	"""
+	NOT_WALKABLE = -1.0
+
+	def __init__(self, left, top, right, bottom, nodes=None):
+		"""
+		@param left, top, right, bottom: borders of the area that can contain nodes (inclusive)
+		@param nodes: optional dict or iterable of (coords, speed) to fill in
+		"""
+		super(GridNodes, self).__init__()
+		self.left = left
+		self.top = top
+		self.right = right
+		self.bottom = bottom
+		self.origin_x = left - 1
+		self.origin_y = top - 1
+		self.height = bottom - top + 3
+		self.size = (right - left + 3) * self.height
+		self.costs = array('d', [self.NOT_WALKABLE]) * self.size
+		self.outside = 0 # number of nodes that aren't covered by the array
+		self._search_state = None
+		self.path_cache = PathCache()
+		if nodes is not None:
+			self.update(nodes)
+
+	@classmethod
+	def init_from_rect(cls, rect, nodes=None):
+		return cls(rect.left, rect.top, rect.right, rect.bottom, nodes)
+
+	def encode(self, coords):
+		"""Returns the index of coords in the array or None if coords aren't covered"""
+		x, y = coords
+		if self.left <= x <= self.right and self.top <= y <= self.bottom:
+			return (x - self.origin_x) * self.height + (y - self.origin_y)
+		return None
+
+	def decode(self, index):
+		x, y = divmod(index, self.height)
+		return (x + self.origin_x, y + self.origin_y)
+
+	def get_search_state(self):
+		"""Returns arrays that are reused by every search on this grid:
+		[generation, seen (generation stamps), parent indices, distances]"""
+		if self._search_state is None:
+			self._search_state = [0, array('l', [0]) * self.size, array('l', [-1]) * self.size,
+			                      array('d', [0.0]) * self.size]
+		return self._search_state
+
+	def __setitem__(self, coords, speed):
+		index = self.encode(coords)
+		if self.get(coords) != speed:
+			self.path_cache.node_added(index)
+		if index is None:
+			if coords not in self:
+				self.outside += 1
+		else:
+			self.costs[index] = speed
+		super(GridNodes, self).__setitem__(coords, speed)
+
+	def __delitem__(self, coords):
+		super(GridNodes, self).__delitem__(coords)
+		index = self.encode(coords)
+		if index is None:
+			self.outside -= 1
+			self.path_cache.clear()
+		else:
+			self.costs[index] = self.NOT_WALKABLE
+			self.path_cache.node_removed(index)
+
+	def update(self, *args, **kwargs):
+		for other in args + (kwargs, ):
+			items = other.iteritems() if hasattr(other, 'iteritems') else other
+			for coords, speed in items:
+				self[coords] = speed
+
+	def setdefault(self, coords, speed=None):
+		if coords not in self:
+			self[coords] = speed
+		return self[coords]
+
+	def pop(self, coords, *default):
+		if coords not in self:
+			return super(GridNodes, self).pop(coords, *default)
+		speed = self[coords]
+		del self[coords]
+		return speed
+
+	def popitem(self):
+		coords, speed = super(GridNodes, self).popitem()
+		super(GridNodes, self).__setitem__(coords, speed)
+		del self[coords]
+		return (coords, speed)
+
+	def clear(self):
+		super(GridNodes, self).clear()
+		self.path_cache.clear()
+		self.costs = array('d', [self.NOT_WALKABLE]) * self.size
+		self.outside = 0
+
+	def copy(self):
+		# copy the dict and the array directly, the empty path cache of the copy needs no updates
+		nodes = self.__class__(self.left, self.top, self.right, self.bottom)
+		super(GridNodes, nodes).update(self)
+		nodes.costs = self.costs[:]
+		nodes.outside = self.outside
+		return nodes
+
+	__copy__ = copy
+
+
+class GridFindPath(FindPath):
+	"""FindPath on the arrays of GridNodes.
+
+	The search is the same as in FindPath (including the order in which nodes with equal
+	ratings are processed), but all per-node data is kept in arrays indexed by encoded
+	coordinates that are allocated once per grid and reused by subsequent searches.
+
+	After an array based search, reached_nodes contains the encoded coordinates of every node
+	the search has reached (see PathCache), otherwise it is None.
+	"""
+	reached_nodes = None
+
+	@decorators.make_constants()
+	def execute(self):
+		"""Executes algorithm"""
+		path_nodes = self.path_nodes
+		if not isinstance(path_nodes, GridNodes) or path_nodes.outside:
+			return super(GridFindPath, self).execute()
+
+		encode = path_nodes.encode
+		destination = self.destination
+		destination_to_tuple_distance_func = destination.get_distance_function((0, 0))
+
+		source_coords = self.source.get_coordinates()
+		dest_coords = destination.get_coordinates()
+		if not self.make_target_walkable:
+			dest_coords = [coords for coords in dest_coords if coords in path_nodes]
+
+		source_indices = [encode(coords) for coords in source_coords]
+		dest_indices = set(encode(coords) for coords in dest_coords)
+		if None in source_indices or None in dest_indices:
+			# source or destination aren't covered by the grid
+			return super(GridFindPath, self).execute()
+		if not dest_indices:
+			self.reached_nodes = []
+			return None
+
+		# source and destination coords are always walkable
+		extra_nodes = dest_indices.union(source_indices)
+		blocked = set(encode(coords) for coords in self.blocked_coords)
+
+		state = path_nodes.get_search_state()
+		state[0] += 1
+		generation = state[0]
+		seen, parent, distance = state[1], state[2], state[3]
+		costs = path_nodes.costs
+		height = path_nodes.height
+		origin_x = path_nodes.origin_x
+		origin_y = path_nodes.origin_y
+
+		if self.diagonal:
+			offsets = (-height - 1, -height, -height + 1, -1, 1, height - 1, height, height + 1)
+		else:
+			offsets = (-height, height, -1, 1)
+
+		reached_nodes = self.reached_nodes = []
+		heap = []
+		for coords, index in zip(source_coords, source_indices):
+			if seen[index] != generation:
+				seen[index] = generation
+				reached_nodes.append(index)
+				parent[index] = -1
+				distance[index] = 0
+				heappush(heap, (destination_to_tuple_distance_func(destination, coords), index))
+
+		while heap:
+			cur_index = heappop(heap)[1]
+
+			if cur_index in dest_indices:
+				path = []
+				while cur_index != -1:
+					x, y = divmod(cur_index, height)
+					path.append((x + origin_x, y + origin_y))
+					cur_index = parent[cur_index]
+				path.reverse()
+				return path
+
+			cost = costs[cur_index]
+			dist_to_here = distance[cur_index] + (cost if cost >= 0 else 0)
+
+			for offset in offsets:
+				neighbor_index = cur_index + offset
+				if seen[neighbor_index] == generation:
+					continue # already reached by a path that is at least as good
+				if costs[neighbor_index] < 0 and neighbor_index not in extra_nodes:
+					continue
+				if neighbor_index in blocked:
+					continue
+
+				seen[neighbor_index] = generation
+				reached_nodes.append(neighbor_index)
+				parent[neighbor_index] = cur_index
+				distance[neighbor_index] = dist_to_here
+				x, y = divmod(neighbor_index, height)
+				total_dist_estimation = destination_to_tuple_distance_func(destination, (x + origin_x, y + origin_y)) + dist_to_here
+				heappush(heap, (total_dist_estimation, neighbor_index))
+
+		return None
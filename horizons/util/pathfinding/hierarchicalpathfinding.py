@@ -0,0 +1,347 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+from collections import deque
+from heapq import heappush, heappop
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath
+
+"""
+This file contains a hierarchical variant of the pathfinding algorithm for units that move
+diagonally over big areas, i.e. ships on the world water (HPA*).
+
+The area is divided into square clusters. Where two neighboring clusters share walkable
+border tiles, entrances are placed; their tiles form the nodes of an abstract graph. Nodes
+of the same cluster are connected by the length of the shortest path inside of the cluster,
+which is calculated when the cluster is used for the first time. Long paths are planned on
+this abstract graph and then refined segment by segment with searches that only look at a
+single cluster.
+"""
+
+class HierarchicalPathGraph(object):
+	"""Abstract graph over a dict of path nodes { (x, y): speed }.
+
+	Every part of the graph is calculated lazily and cached. Units that block tiles (like
+	ships in the ship_map) are not part of the cached graph, they only change when being
+	blocked, and are avoided when planning and refining a path. The cached parts are never
+	updated, the graph is meant for path nodes that don't change after it has been created,
+	like the world water that is set up once on loading. This also allows to tell whether
+	there can be a path at all from the connected areas of the path nodes.
+	"""
+	log = logging.getLogger("world.pathfinding")
+
+	CLUSTER_SIZE = 16
+	# border runs wider than this get an entrance at both ends instead of one in the middle
+	MAX_ENTRANCE_WIDTH = 6
+
+	NEIGHBOR_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+	def __init__(self, path_nodes):
+		"""
+		@param path_nodes: dict { (x, y): speed }, the graph keeps a reference to it
+		"""
+		self.path_nodes = path_nodes
+		self._borders = {} # { (cluster, is_east_border): [(coords_inside, coords_outside), ..] }
+		self._transitions = {} # { cluster: { node: [nodes of other clusters] } }
+		self._intra_edges = {} # { cluster: { node: [(other node, distance)] } }
+		self._components = None # { node: number of its connected area }, see are_connected
+
+	def _find_components(self):
+		"""Numbers the connected areas of the path nodes (with diagonal steps)
+		@return: dict { node: number of its area }"""
+		path_nodes = self.path_nodes
+		components = {}
+		component = 0
+		for start in path_nodes:
+			if start in components:
+				continue
+			component += 1
+			components[start] = component
+			to_check = [start]
+			while to_check:
+				x, y = to_check.pop()
+				for x_offset, y_offset in self.NEIGHBOR_OFFSETS:
+					neighbor = (x + x_offset, y + y_offset)
+					if neighbor in path_nodes and neighbor not in components:
+						components[neighbor] = component
+						to_check.append(neighbor)
+		return components
+
+	def _get_adjacent_components(self, coords):
+		"""Returns the areas coords belongs to, or that of its neighbors if it's no path node"""
+		if coords in self._components:
+			return set([self._components[coords]])
+		x, y = coords
+		return set(self._components[(x + x_offset, y + y_offset)] for x_offset, y_offset in self.NEIGHBOR_OFFSETS
+		           if (x + x_offset, y + y_offset) in self._components)
+
+	def are_connected(self, source, dest_coords):
+		"""Returns whether the path nodes connect source with one of dest_coords, not taking blocked
+		coords into account. Coords that aren't path nodes are connected through their neighbors."""
+		if self._components is None:
+			self._components = self._find_components()
+		source_components = self._get_adjacent_components(source)
+		return any(source_components & self._get_adjacent_components(coords) for coords in dest_coords)
+
+	def get_cluster(self, coords):
+		return (coords[0] // self.CLUSTER_SIZE, coords[1] // self.CLUSTER_SIZE)
+
+	def _get_border(self, cluster, is_east_border):
+		"""Returns the entrances on the east or south border of cluster as list of
+		(coords inside of cluster, coords in the neighbor cluster)"""
+		key = (cluster, is_east_border)
+		if key in self._borders:
+			return self._borders[key]
+
+		size = self.CLUSTER_SIZE
+		x0, y0 = cluster[0] * size, cluster[1] * size
+		path_nodes = self.path_nodes
+		if is_east_border:
+			pairs = [((x0 + size - 1, y), (x0 + size, y)) for y in xrange(y0, y0 + size)]
+		else:
+			pairs = [((x, y0 + size - 1), (x, y0 + size)) for x in xrange(x0, x0 + size)]
+
+		entrances = []
+		run = []
+		for pair in pairs + [None]:
+			if pair is not None and pair[0] in path_nodes and pair[1] in path_nodes:
+				run.append(pair)
+			elif run:
+				if len(run) > self.MAX_ENTRANCE_WIDTH:
+					entrances.append(run[0])
+					entrances.append(run[-1])
+				else:
+					entrances.append(run[len(run) // 2])
+				run = []
+
+		self._borders[key] = entrances
+		return entrances
+
+	def get_transitions(self, cluster):
+		"""Returns the nodes of cluster and where they lead to in the neighboring clusters
+		@return: dict { node: [nodes of other clusters] }"""
+		if cluster in self._transitions:
+			return self._transitions[cluster]
+
+		cx, cy = cluster
+		transitions = {}
+		for inside, outside in self._get_border(cluster, True) + self._get_border(cluster, False):
+			transitions.setdefault(inside, []).append(outside)
+		for outside, inside in self._get_border((cx - 1, cy), True) + self._get_border((cx, cy - 1), False):
+			transitions.setdefault(inside, []).append(outside)
+
+		self._transitions[cluster] = transitions
+		return transitions
+
+	def get_intra_edges(self, cluster):
+		"""Returns the distances between the nodes of cluster inside of cluster
+		@return: dict { node: [(other node, distance)] }"""
+		if cluster in self._intra_edges:
+			return self._intra_edges[cluster]
+
+		nodes = sorted(self.get_transitions(cluster))
+		edges = {}
+		for node in nodes:
+			distances = self._search_cluster(cluster, [node])[0]
+			edges[node] = [(other, distances[other]) for other in nodes
+			               if other != node and other in distances]
+
+		self._intra_edges[cluster] = edges
+		return edges
+
+	def _search_cluster(self, cluster, start_coords, blocked_coords=(), extra_nodes=(), goals=None):
+		"""Breadth first search inside of cluster (all steps have the same costs).
+		@param start_coords: list of coords to start from
+		@param blocked_coords: coords that can't be walked on
+		@param extra_nodes: coords that can be walked on, even if they aren't path nodes
+		@param goals: stop as soon as one of these coords is reached
+		@return: tuple (distances, previous, reached goal or None)"""
+		size = self.CLUSTER_SIZE
+		x0, y0 = cluster[0] * size, cluster[1] * size
+		x1, y1 = x0 + size, y0 + size
+		path_nodes = self.path_nodes
+
+		distances = dict.fromkeys(start_coords, 0)
+		previous = dict.fromkeys(start_coords)
+		to_check = deque(start_coords)
+		while to_check:
+			coords = to_check.popleft()
+			if goals is not None and coords in goals:
+				return (distances, previous, coords)
+			dist = distances[coords] + 1
+			x, y = coords
+			for x_offset, y_offset in self.NEIGHBOR_OFFSETS:
+				neighbor = (x + x_offset, y + y_offset)
+				if neighbor in distances or not (x0 <= neighbor[0] < x1 and y0 <= neighbor[1] < y1):
+					continue
+				if (neighbor in path_nodes or neighbor in extra_nodes) and neighbor not in blocked_coords:
+					distances[neighbor] = dist
+					previous[neighbor] = coords
+					to_check.append(neighbor)
+		return (distances, previous, None)
+
+	def _find_local_path(self, start, goals, blocked_coords, extra_nodes):
+		"""Returns the shortest path from start to one of goals inside the cluster of start,
+		excluding start, or None"""
+		previous, goal = self._search_cluster(self.get_cluster(start), [start], blocked_coords,
+		                                      extra_nodes, goals)[1:]
+		if goal is None:
+			return None
+		path = []
+		while goal != start:
+			path.append(goal)
+			goal = previous[goal]
+		path.reverse()
+		return path
+
+	def find_path(self, source, dest_coords, blocked_coords, heuristic):
+		"""Plans a path on the abstract graph and refines it.
+		@param source: source coords
+		@param dest_coords: set of walkable destination coords
+		@param blocked_coords: temporarily blocked coords
+		@param heuristic: function returning the estimated distance of coords to the destination
+		@return: list of coords from source to one of dest_coords or None if the graph
+		         doesn't yield a path (there might still be one though)"""
+		goal_distances = {} # { goal cluster: { node: distance to destination } }
+		for coords in dest_coords:
+			goal_distances.setdefault(self.get_cluster(coords), None)
+		for cluster in goal_distances:
+			cluster_dest_coords = sorted(coords for coords in dest_coords if self.get_cluster(coords) == cluster)
+			goal_distances[cluster] = self._search_cluster(cluster, cluster_dest_coords,
+			                                               blocked_coords, dest_coords)[0]
+
+		source_cluster = self.get_cluster(source)
+		source_distances = self._search_cluster(source_cluster, [source], blocked_coords, (source, ))[0]
+
+		# abstract A*, the empty tuple is the goal node and sorts before every coords tuple
+		goal = ()
+		distances = {}
+		previous = {}
+		heap = []
+		for node in self.get_transitions(source_cluster):
+			if node in source_distances and node not in blocked_coords:
+				distances[node] = source_distances[node]
+				previous[node] = source
+				heappush(heap, (source_distances[node] + heuristic(node), source_distances[node], node))
+
+		while heap:
+			dist, node = heappop(heap)[1:]
+			if node == goal:
+				break
+			if dist > distances[node]:
+				continue # outdated entry
+
+			cluster = self.get_cluster(node)
+			neighbors = [(other, 1) for other in self.get_transitions(cluster)[node]]
+			neighbors.extend(self.get_intra_edges(cluster)[node])
+			if cluster in goal_distances and node in goal_distances[cluster]:
+				neighbors.append((goal, goal_distances[cluster][node]))
+
+			for other, edge_dist in neighbors:
+				if other in blocked_coords:
+					continue
+				other_dist = dist + edge_dist
+				if other not in distances or other_dist < distances[other]:
+					distances[other] = other_dist
+					previous[other] = node
+					estimation = 0 if other == goal else heuristic(other)
+					heappush(heap, (other_dist + estimation, other_dist, other))
+		else:
+			return None
+
+		abstract_path = []
+		node = previous[goal]
+		while node != source:
+			abstract_path.append(node)
+			node = previous[node]
+		abstract_path.reverse()
+
+		# refine the abstract path
+		path = [source]
+		for node in abstract_path:
+			cur = path[-1]
+			if self.get_cluster(cur) != self.get_cluster(node):
+				path.append(node) # transition to a neighboring cluster
+				continue
+			segment = self._find_local_path(cur, (node, ), blocked_coords, (cur, ))
+			if segment is None:
+				return None
+			path.extend(segment)
+		segment = self._find_local_path(path[-1], dest_coords, blocked_coords, dest_coords)
+		if segment is None:
+			return None
+		path.extend(segment)
+		return path
+
+
+class HierarchicalFindPath(GridFindPath):
+	"""Uses a HierarchicalPathGraph for long distances and GridFindPath for everything else.
+	The paths that are found are not necessarily the shortest ones, but close to them."""
+
+	# paths to destinations that are closer than this are searched directly
+	MIN_DISTANCE = 3 * HierarchicalPathGraph.CLUSTER_SIZE
+
+	def __init__(self, graph):
+		"""
+		@param graph: HierarchicalPathGraph on the path nodes that will be passed on calls
+		"""
+		super(HierarchicalFindPath, self).__init__()
+		self.graph = graph
+
+	def execute(self):
+		"""Executes algorithm"""
+		path = None
+		if self.diagonal and self.path_nodes is self.graph.path_nodes:
+			path = self._execute_hierarchical()
+			if path is False:
+				return None
+		if path is None:
+			path = super(HierarchicalFindPath, self).execute()
+		return path
+
+	def _execute_hierarchical(self):
+		"""@return: path, None if the graph can't be used or doesn't find a path (the path might be
+		         missing from the graph or blocked) or False if there is no path at all"""
+		source_coords = self.source.get_coordinates()
+		if len(source_coords) != 1:
+			return None
+		source = source_coords[0]
+
+		destination = self.destination
+		distance_func = destination.get_distance_function((0, 0))
+		if distance_func(destination, source) < self.MIN_DISTANCE:
+			return None
+
+		dest_coords = set(coords for coords in destination.get_coordinates()
+		                  if coords not in self.blocked_coords)
+		if not self.make_target_walkable:
+			dest_coords = set(coords for coords in dest_coords if coords in self.path_nodes)
+		if not dest_coords:
+			return None
+
+		def heuristic(coords):
+			return distance_func(destination, coords)
+
+		path = self.graph.find_path(source, dest_coords, self.blocked_coords, heuristic)
+		if path is None and not self.graph.are_connected(source, dest_coords):
+			return False # the search on all path nodes can't find a path either
+		return path
@@ -0,0 +1,137 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from collections import OrderedDict
+
+from horizons.util.shapes import Circle, Point, Rect
+
+
+def get_shape_key(shape):
+	"""Returns an immutable, hashable representation of a pathfinding source or destination.
+	@param shape: Point, Rect, Circle or anything with such a position
+	@return: tuple or None if shape is not supported"""
+	if hasattr(shape, 'position'):
+		shape = shape.position
+	if isinstance(shape, Point):
+		return (Point, shape.x, shape.y)
+	elif isinstance(shape, Rect):
+		return (Rect, shape.left, shape.top, shape.right, shape.bottom)
+	elif isinstance(shape, Circle):
+		return (Circle, shape.center.x, shape.center.y, shape.radius)
+	return None
+
+
+class PathCache(object):
+	"""Cache of paths that were found on a single set of path nodes.
+
+	Every path is stored together with the nodes that the search has reached, since the
+	result of a search only depends on them. The cache has to be notified about every change
+	of the path nodes:
+	- a removed node invalidates the paths whose search has reached the node.
+	- an added node (or a changed speed) might result in better paths anywhere, therefore
+	  it invalidates every path.
+	GridNodes does this automatically, using encoded coordinates as node ids.
+
+	Keys are usually (pather type, source key, destination key), see get_shape_key.
+	"""
+
+	# maximum number of cached paths, the least recently used ones are dropped first
+	MAX_PATHS = 1024
+	# searches that have reached more nodes aren't cached, they would take up too much memory
+	MAX_NODES_PER_PATH = 4096
+
+	def __init__(self):
+		self._paths = OrderedDict() # { key: (path tuple or None, reached nodes) }
+		self._keys_by_node = {} # { node: set of keys of searches that reached node }
+		self.hits = 0
+		self.misses = 0
+		self.invalidations = 0
+
+	def __len__(self):
+		return len(self._paths)
+
+	def get(self, key):
+		"""Returns a copy of the cached path for key.
+		@return: tuple (found, path). path is a list or None if no path was found"""
+		if key not in self._paths:
+			self.misses += 1
+			return (False, None)
+		self.hits += 1
+		entry = self._paths.pop(key)
+		self._paths[key] = entry # mark as recently used
+		path = entry[0]
+		return (True, None if path is None else list(path))
+
+	def add(self, key, path, nodes):
+		"""Caches path for key
+		@param path: return value of FindPath
+		@param nodes: ids of all nodes reached by the search that found path"""
+		if len(nodes) > self.MAX_NODES_PER_PATH:
+			return
+		if key in self._paths:
+			self._remove(key)
+		elif len(self._paths) >= self.MAX_PATHS:
+			self._remove(next(iter(self._paths)))
+
+		nodes = tuple(nodes)
+		self._paths[key] = (None if path is None else tuple(path), nodes)
+		keys_by_node = self._keys_by_node
+		for node in nodes:
+			if node in keys_by_node:
+				keys_by_node[node].add(key)
+			else:
+				keys_by_node[node] = set([key])
+
+	def _remove(self, key):
+		nodes = self._paths.pop(key)[1]
+		for node in nodes:
+			keys = self._keys_by_node[node]
+			keys.discard(key)
+			if not keys:
+				del self._keys_by_node[node]
+
+	def node_removed(self, node):
+		"""Invalidates the paths whose search has reached node"""
+		keys = self._keys_by_node.get(node)
+		if keys:
+			for key in list(keys):
+				self._remove(key)
+				self.invalidations += 1
+
+	def node_added(self, node):
+		"""Invalidates every path, since a better one might exist now"""
+		self.clear()
+
+	def clear(self):
+		self.invalidations += len(self._paths)
+		self._paths.clear()
+		self._keys_by_node.clear()
+
+	def get_statistics(self):
+		"""@return: dict with hit/miss counters for profiling"""
+		requests = self.hits + self.misses
+		return {
+			'size': len(self._paths),
+			'hits': self.hits,
+			'misses': self.misses,
+			'invalidations': self.invalidations,
+			'hit_rate': float(self.hits) / requests if requests else 0.0,
+		}
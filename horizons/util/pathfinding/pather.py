@@ -26,7 +26,9 @@ from horizons.util.python import decorators
 from horizons.util.shapes import Point
 
 from horizons.util.pathfinding import PathBlockedError
-from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.pathfinding.gridpathfinding import GridFindPath, GridNodes
+from horizons.util.pathfinding.pathcache import get_shape_key
+from horizons.util.pathfinding.hierarchicalpathfinding import HierarchicalFindPath
 
 """
 In this file, you will find an interface to the pathfinding algorithm.
@@ -38,6 +40,11 @@ class AbstractPather(object):
 	"""Abstract Interface for pathfinding for use by Unit.
 	Use only subclasses!"""
 	log = logging.getLogger("world.pathfinding")
+
+	# pathfinding implementation, must be callable like FindPath
+	# GridFindPath returns the same paths as FindPath, but is faster on GridNodes
+	pathfinder = GridFindPath
+
 	def __init__(self, unit, move_diagonal, session, make_target_walkable=True):
 		"""
 		@param unit: instance of unit, to which the pather belongs
@@ -71,6 +78,10 @@ class AbstractPather(object):
 		Return value type must be supported by FindPath"""
 		return []
 
+	def _get_pathfinder(self):
+		"""Returns the callable that calculates paths, see FindPath"""
+		return self.pathfinder()
+
 	def _check_for_obstacles(self, point):
 		"""Check if the path is unexpectedly blocked by e.g. a unit
 		@param point: tuple: (x, y)
@@ -103,11 +114,7 @@ class AbstractPather(object):
 		if source is None:
 			source = self._get_position()
 
-		# call algorithm
-		# to use a different pathfinding code, just change the following line
-		path = FindPath()(source, destination, self._get_path_nodes(),
-		                  self._get_blocked_coords(), self.move_diagonal,
-		                  self.make_target_walkable)
+		path = self._find_path(source, destination)
 
 		if path is None:
 			return False
@@ -120,6 +127,34 @@ class AbstractPather(object):
 
 		return True
 
+	def _find_path(self, source, destination):
+		"""Calls the pathfinding algorithm. Paths on GridNodes are cached if no coords are
+		blocked, since the cache is only notified about changes of the nodes.
+		The pathfinder must provide reached_nodes like GridFindPath for caching.
+		@return: path as returned by FindPath"""
+		path_nodes = self._get_path_nodes()
+		blocked_coords = self._get_blocked_coords()
+
+		key = None
+		if not blocked_coords and isinstance(path_nodes, GridNodes):
+			source_key = get_shape_key(source)
+			destination_key = get_shape_key(destination)
+			if source_key is not None and destination_key is not None:
+				key = (self.__class__, source_key, destination_key)
+				found, path = path_nodes.path_cache.get(key)
+				if found:
+					return path
+
+		# call algorithm
+		# to use a different pathfinding code, just change the pathfinder attribute
+		pathfinder = self._get_pathfinder()
+		path = pathfinder(source, destination, path_nodes, blocked_coords,
+		                  self.move_diagonal, self.make_target_walkable)
+
+		if key is not None and pathfinder.reached_nodes is not None:
+			path_nodes.path_cache.add(key, path, pathfinder.reached_nodes)
+		return path
+
 	def move_on_path(self, path, source=None, destination_in_building=False):
 		"""Start moving on a precalculated path.
 		@param path: return value of FindPath()()
@@ -188,7 +223,7 @@ class AbstractPather(object):
 		# current position is calculated on loading through unit position
 		if self.path:
 			for step in xrange(len(self.path)):
-				db("INSERT INTO unit_path(`unit`, `index`, `x`, `y`) VALUES(?, ?, ?, ?)",
+				db.add_row("INSERT INTO unit_path(`unit`, `index`, `x`, `y`) VALUES(?, ?, ?, ?)",
 				    unitid, step, self.path[step][0], self.path[step][1])
 
 	def load(self, db, worldid):
@@ -220,12 +255,19 @@ class ShipPather(AbstractPather):
 	def _get_blocked_coords(self):
 		return self.session.world.ship_map
 
+	def _get_pathfinder(self):
+		# long distance paths are planned on the abstract graph of the water
+		return HierarchicalFindPath(self.session.world.water_graph)
+
 
 class FisherShipPather(ShipPather):
 	"""Can also drive through shallow water"""
 	def _get_path_nodes(self):
 		return self.session.world.water_and_coastline
 
+	def _get_pathfinder(self):
+		return HierarchicalFindPath(self.session.world.water_and_coastline_graph)
+
 	def _get_blocked_coords(self):
 		# don't let fisher be blocked by other ships (#1023)
 		return []
@@ -291,7 +333,20 @@ class StaticPather(object):
 		@param island: island to search path on
 		@param source, destination: Point or anything supported by FindPath
 		@return: list of tuples or None in case no path is found"""
-		return FindPath()(source, destination, island.path_nodes.road_nodes)
+		road_nodes = island.path_nodes.road_nodes
+		source_key = get_shape_key(source)
+		destination_key = get_shape_key(destination)
+		if source_key is None or destination_key is None:
+			return GridFindPath()(source, destination, road_nodes)
+
+		key = (cls, source_key, destination_key)
+		found, path = road_nodes.path_cache.get(key)
+		if not found:
+			pathfinder = GridFindPath()
+			path = pathfinder(source, destination, road_nodes)
+			if pathfinder.reached_nodes is not None:
+				road_nodes.path_cache.add(key, path, pathfinder.reached_nodes)
+		return path
 
 
 decorators.bind_all(AbstractPather)
@@ -21,6 +21,8 @@
 
 import logging
 
+from horizons.util.pathfinding.gridpathfinding import GridNodes
+
 class PathNodes(object):
 	"""
 	Abstract class; used to derive list of path nodes from, which is used for pathfinding.
@@ -44,7 +46,9 @@ class ConsumerBuildingPathNodes(PathNodes):
 	def __init__(self, consumerbuilding):
 		super(ConsumerBuildingPathNodes, self).__init__()
 		ground_map = consumerbuilding.island.ground_map
-		self.nodes = {}
+		position, radius = consumerbuilding.position, consumerbuilding.radius
+		self.nodes = GridNodes(position.left - radius, position.top - radius,
+		                       position.right + radius, position.bottom + radius)
 		for coords in consumerbuilding.position.get_radius_coordinates(consumerbuilding.radius, include_self=False):
 			if coords in ground_map and not 'coastline' in ground_map[coords].classes:
 				self.nodes[coords] = self.NODE_DEFAULT_SPEED
@@ -69,13 +73,13 @@ class IslandPathNodes(PathNodes):
 		# generate list of walkable tiles
 		# we keep this up to date, so that path finding can use it and we don't have
 		# to calculate it every time (rather expensive!).
-		self.nodes = {}
+		self.nodes = GridNodes.init_from_rect(island.position)
 		for coord in self.island:
 			if self.is_walkable(coord):
 				self.nodes[coord] = self.NODE_DEFAULT_SPEED
 
 		# nodes where a real road is built on.
-		self.road_nodes = {}
+		self.road_nodes = GridNodes.init_from_rect(island.position)
 
 	def register_road(self, road):
 		for i in road.position:
@@ -0,0 +1,167 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from horizons.extscheduler import ExtScheduler
+from horizons.util.dbreader import DbReader
+from horizons.util.uhdbaccessor import read_savegame_template
+
+
+class SaveBuffer(object):
+	"""Collects the statements of a save in memory instead of executing them.
+
+	It can be passed to the save() methods instead of a DbReader, since saving only writes
+	to the db. Consecutive executions of the same statement are grouped into a batch, so
+	that writing the buffer takes one executemany per batch while keeping the order of all
+	statements (saving also contains some UPDATEs that rely on it).
+	"""
+
+	def __init__(self):
+		self._batches = [] # [(command, [args, ..])]
+		self._rows = OrderedDict() # { command: [args] }, see add_row
+		self.rows = 0
+
+	def __call__(self, command, *args):
+		"""Records a sql command, see DbReader.__call__. Nothing can be read, so the result is
+		always empty."""
+		assert not command.endswith(";")
+		assert not command.lstrip().upper().startswith('SELECT'), "can't read from a SaveBuffer: %s" % command
+		self._add(command, [args])
+		return []
+
+	def execute_many(self, command, parameters):
+		"""Records a sql command for each sequence in parameters, see DbReader.execute_many."""
+		self._add(command, list(parameters))
+
+	def add_row(self, command, *args):
+		"""Records a sql command to be added by flush_rows(), see DbReader.add_row."""
+		if command in self._rows:
+			self._rows[command].append(args)
+		else:
+			self._rows[command] = [args]
+
+	def flush_rows(self):
+		for command, rows in self._rows.iteritems():
+			self._add(command, rows)
+		self._rows.clear()
+
+	def _add(self, command, rows):
+		if self._batches and self._batches[-1][0] == command:
+			self._batches[-1][1].extend(rows)
+		else:
+			self._batches.append((command, rows))
+		self.rows += len(rows)
+
+	def write(self, db):
+		"""Executes the recorded statements on db, in the order they were recorded."""
+		assert not self._rows, 'rows added with add_row() have not been flushed'
+		for command, rows in self._batches:
+			db.execute_many(command, rows)
+
+
+def write_savegame(filename, save_buffer):
+	"""Creates a savegame at filename from the statements in save_buffer.
+	The savegame is written to a temporary file first, which replaces filename when it's
+	complete, so there is never a partially written savegame at filename."""
+	tmp_filename = filename + '.part'
+	if os.path.exists(tmp_filename):
+		os.unlink(tmp_filename)
+	db = DbReader(tmp_filename)
+	try:
+		read_savegame_template(db)
+		db("BEGIN")
+		save_buffer.write(db)
+		db("COMMIT")
+		db.close()
+	except:
+		db.close()
+		os.unlink(tmp_filename)
+		raise
+	if os.path.exists(filename):
+		os.unlink(filename) # rename doesn't replace files on windows
+	os.rename(tmp_filename, filename)
+
+
+class SavegameWriter(object):
+	"""Writes savegames from SaveBuffers in a background thread, one at a time.
+
+	Taking the snapshot of the game state into the buffer has to happen on the main thread,
+	but writing it to the disk doesn't block the game then. Whether the write has finished is
+	checked on the main thread through the ExtScheduler, which then calls the finish callback.
+	"""
+	log = logging.getLogger('session')
+
+	# seconds between two checks whether the savegame has been written
+	CHECK_INTERVAL = 0.1
+
+	def __init__(self):
+		self._thread = None
+		self._finish_callback = None
+		self._success = False
+
+	def end(self):
+		"""Waits for the savegame that is being written, the finish callback isn't called anymore."""
+		self._finish_callback = None
+		self.wait()
+
+	def write(self, filename, save_buffer, finish_callback=None):
+		"""Starts writing save_buffer to filename, after the previous savegame has been written.
+		@param finish_callback: called on the main thread with a bool, whether the savegame has
+		                        been written successfully"""
+		self.wait()
+		self._finish_callback = finish_callback
+		self._success = False
+		self._thread = threading.Thread(target=self._write, args=(filename, save_buffer))
+		self._thread.start()
+		ExtScheduler().add_new_object(self._check_finished, self, run_in=self.CHECK_INTERVAL)
+
+	def _write(self, filename, save_buffer):
+		# runs in the writing thread, only self._success is shared with the main thread
+		try:
+			write_savegame(filename, save_buffer)
+			self.log.debug("Wrote savegame %s in the background", filename)
+			self._success = True
+		except Exception:
+			self.log.exception("Save Exception")
+
+	def _check_finished(self):
+		if self.is_writing():
+			ExtScheduler().add_new_object(self._check_finished, self, run_in=self.CHECK_INTERVAL)
+		else:
+			self.wait()
+
+	def is_writing(self):
+		return self._thread is not None and self._thread.is_alive()
+
+	def wait(self):
+		"""Blocks until the savegame that is being written is complete and calls its finish callback."""
+		if self._thread is None:
+			return
+		self._thread.join()
+		self._thread = None
+		ExtScheduler().rem_all_classinst_calls(self)
+		callback, self._finish_callback = self._finish_callback, None
+		if callback is not None:
+			callback(self._success)
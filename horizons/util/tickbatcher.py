@@ -0,0 +1,88 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.scheduler import Scheduler
+from horizons.util.python.callback import Callback
+
+
+class TickBatcher(object):
+	"""Batches the ticks of many objects into one scheduler call per tick.
+
+	Instead of every object scheduling its own callback, the objects that are due in a tick
+	are collected in a list and handed to _tick() in one scheduler call for that tick.
+	The objects of a tick are processed in the order they have been added.
+	Subclasses implement _tick(tick) and iterate over _pop_due(tick) in it.
+	"""
+
+	def __init__(self):
+		self._due = {} # { tick: list of handles [obj], None instead of the obj if removed }
+		self._scheduled = {} # { obj: (tick, handle) }
+
+	def end(self):
+		if self._due:
+			Scheduler().rem_all_classinst_calls(self)
+		self._due = None
+		self._scheduled = None
+
+	def add(self, obj, run_in):
+		"""Schedules obj to be processed in run_in ticks.
+		@param run_in: non-negative number of ticks"""
+		assert obj not in self._scheduled, '%s is already scheduled' % obj
+		tick = Scheduler().cur_tick + run_in
+		handle = [obj]
+		self._scheduled[obj] = (tick, handle)
+		if tick in self._due:
+			self._due[tick].append(handle)
+		else:
+			self._due[tick] = [handle]
+			Scheduler().add_new_object(Callback(self._tick, tick), self, run_in)
+
+	def remove(self, obj):
+		"""Cancels the next tick of obj.
+		@return: bool, whether there was a tick scheduled"""
+		if self._scheduled is None or obj not in self._scheduled:
+			return False
+		handle = self._scheduled.pop(obj)[1]
+		handle[0] = None
+		return True
+
+	def is_scheduled(self, obj):
+		return obj in self._scheduled
+
+	def get_remaining_ticks(self, obj):
+		"""@return: number of ticks until the next tick of obj or None"""
+		if obj not in self._scheduled:
+			return None
+		return self._scheduled[obj][0] - Scheduler().cur_tick
+
+	def _pop_due(self, tick):
+		"""Yields the objects due in tick that haven't been removed, also when they are removed
+		while the previous ones are processed. They are no longer scheduled when yielded."""
+		# objects are only added for later ticks, so the list doesn't change during the pass
+		for handle in self._due.pop(tick):
+			obj = handle[0]
+			if obj is None:
+				continue # removed
+			del self._scheduled[obj]
+			yield obj
+
+	def _tick(self, tick):
+		raise NotImplementedError
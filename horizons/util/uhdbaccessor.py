@@ -203,6 +203,12 @@ class UhDbAccessor(DbReader):
 		sql = "SELECT value FROM balance_values WHERE name='happiness_inhabitants_decrease_limit'"
 		return self.cached_query(sql)[0][0]
 
+	def get_balance_value(self, name):
+		"""Returns a value from the balance_values table
+		@param name: string, name of the value"""
+		sql = "SELECT value FROM balance_values WHERE name = ?"
+		return self.cached_query(sql, name)[0][0]
+
 	# Misc
 
 	def get_player_start_res(self):
@@ -210,7 +216,6 @@ class UhDbAccessor(DbReader):
 		start_res = self.cached_query("SELECT resource, amount FROM player_start_res")
 		return dict(start_res)
 
-	@decorators.cachedmethod
 	def get_storage_building_capacity(self, storage_type):
 		"""Returns the amount that a storage building can store of every resource.
 		@param storage_type: building class id"""
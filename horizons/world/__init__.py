@@ -35,6 +35,8 @@ from horizons.util.buildingindexer import BuildingIndexer
 from horizons.util.color import Color
 from horizons.util.python import decorators
 from horizons.util.shapes import Circle, Point, Rect
+from horizons.util.pathfinding.gridpathfinding import GridNodes
+from horizons.util.pathfinding.hierarchicalpathfinding import HierarchicalPathGraph
 from horizons.util.worldobject import WorldObject
 from horizons.constants import UNITS, BUILDINGS, RES, GROUND, GAME, MAP, PATHS
 from horizons.ai.trader import Trader
@@ -42,9 +44,13 @@ from horizons.ai.pirate import Pirate
 from horizons.ai.aiplayer import AIPlayer
 from horizons.entities import Entities
 from horizons.world.buildingowner import BuildingOwner
+from horizons.world.checkuphash import CheckupHash
 from horizons.world.diplomacy import Diplomacy
 from horizons.world.units.bullet import Bullet
+from horizons.world.units.movementmanager import MovementManager
+from horizons.world.units.unitgrid import UnitGrid
 from horizons.world.units.weapon import Weapon
+from horizons.world.tilemap import WorldTileGrid
 from horizons.command.unit import CreateUnit
 from horizons.component.healthcomponent import HealthComponent
 from horizons.component.storagecomponent import StorageComponent
@@ -64,8 +70,8 @@ class World(BuildingOwner, WorldObject):
 	   * players - a list of all the session's players - Player instances
 	   * islands - a list of all the map's islands - Island instances
 	   * grounds - a list of all the map's groundtiles
-	   * ground_map - a dictionary that binds tuples of coordinates with a reference to the tile:
-	                  { (x, y): tileref, ...}
+	   * ground_map - a dict-like object (see WorldTileGrid) that binds tuples of coordinates
+	                  of the sea with a reference to the tile: { (x, y): tileref, ...}
 	                 This is important for pathfinding and quick tile fetching.
 	   * island_map - a dictionary that binds tuples of coordinates with a reference to the island
 	   * ships - a list of all the ships ingame - horizons.world.units.ship.Ship instances
@@ -95,6 +101,14 @@ class World(BuildingOwner, WorldObject):
 		# and having at least one reference to them
 		self.ships = []
 		self.ground_units = []
+		# the same units indexed by their position, see get_ships
+		self.ship_grid = UnitGrid()
+		self.ground_unit_grid = UnitGrid()
+		# digest of the state for multiplayer desync checks, see get_checkup_hash
+		self.checkup_hash = CheckupHash()
+
+		# moves all units, see MovingObject
+		self.movement_manager = MovementManager()
 
 		self.islands = []
 
@@ -111,6 +125,8 @@ class World(BuildingOwner, WorldObject):
 
 		for ship in self.ships[:]:
 			ship.remove()
+		self.checkup_hash.end() # removes its listeners from the settlements
+		self.checkup_hash = None
 		for island in self.islands:
 			island.end()
 		for player in self.players:
@@ -120,16 +136,20 @@ class World(BuildingOwner, WorldObject):
 		self.properties = None
 		self.players = None
 		self.player = None
+		self.tile_grid = None
 		self.ground_map = None
 		self.fake_tile_map = None
 		self.full_map = None
 		self.island_map = None
 		self.water = None
+		self.water_graph = None
+		self.water_and_coastline_graph = None
 		self.ships = None
 		self.ship_map = None
+		self.ship_grid = None
 		self.fish_indexer = None
 		self.ground_units = None
-
+		self.ground_unit_grid = None
 		if self.pirate is not None:
 			self.pirate.end()
 			self.pirate = None
@@ -142,6 +162,9 @@ class World(BuildingOwner, WorldObject):
 		self.diplomacy = None
 		self.bullets = None
 
+		# units are gone now, but keep the instance for late remove() calls
+		self.movement_manager.end()
+
 	def _init(self, savegame_db, force_player_id=None, disasters_enabled=True):
 		"""
 		@param savegame_db: Dbreader with loaded savegame database
@@ -173,7 +196,8 @@ class World(BuildingOwner, WorldObject):
 
 		# use a dict because it's directly supported by the pathfinding algo
 		LoadingProgress.broadcast(self, 'world_init_water')
-		self.water = dict((tile, 1.0) for tile in self.ground_map)
+		self.water = GridNodes.init_from_rect(self.map_dimensions,
+		                                      ((tile, 1.0) for tile in self.ground_map))
 		self._init_water_bodies()
 		self.sea_number = self.water_body[(self.min_x, self.min_y)]
 		for island in self.islands:
@@ -191,6 +215,10 @@ class World(BuildingOwner, WorldObject):
 		self._init_shallow_water_bodies()
 		self.shallow_sea_number = self.shallow_water_body[(self.min_x, self.min_y)]
 
+		# abstract graphs for long distance ship paths, they are calculated lazily
+		self.water_graph = HierarchicalPathGraph(self.water)
+		self.water_and_coastline_graph = HierarchicalPathGraph(self.water_and_coastline)
+
 		# create ship position list. entries: ship_map[(x, y)] = ship
 		self.ship_map = {}
 		self.ground_unit_map = {}
@@ -291,38 +319,32 @@ class World(BuildingOwner, WorldObject):
 
 		#add water
 		self.log.debug("Filling world with water...")
-		self.ground_map = {}
 
 		# big sea water tile class
+		fake_tile_size = 10
+		fake_tile_origin = (self.min_x - MAP.BORDER, self.min_y - MAP.BORDER)
 		if not preview:
 			default_grounds = Entities.grounds[self.properties.get('default_ground', '%d-straight' % GROUND.WATER[0])]
-
-		fake_tile_class = Entities.grounds['-1-special']
-		fake_tile_size = 10
-		for x in xrange(self.min_x-MAP.BORDER, self.max_x+MAP.BORDER, fake_tile_size):
-			for y in xrange(self.min_y-MAP.BORDER, self.max_y+MAP.BORDER, fake_tile_size):
-				fake_tile_x = x - 1
-				fake_tile_y = y + fake_tile_size - 1
-				if not preview:
+			for x in xrange(fake_tile_origin[0], self.max_x + MAP.BORDER, fake_tile_size):
+				for y in xrange(fake_tile_origin[1], self.max_y + MAP.BORDER, fake_tile_size):
 					# we don't need no references, we don't need no mem control
-					default_grounds(self.session, fake_tile_x, fake_tile_y)
-				for x_offset in xrange(fake_tile_size):
-					if self.min_x <= x + x_offset < self.max_x:
-						for y_offset in xrange(fake_tile_size):
-							if self.min_y <= y + y_offset < self.max_y:
-								self.ground_map[(x+x_offset, y+y_offset)] = fake_tile_class(self.session, fake_tile_x, fake_tile_y)
-		self.fake_tile_map = copy.copy(self.ground_map)
-
-		# remove parts that are occupied by islands, create the island map and the full map
+					default_grounds(self.session, x - 1, y + fake_tile_size - 1)
+
+		# the fake tiles of the sea are only created when they are accessed
+		self.tile_grid = WorldTileGrid(self.session, self.min_x, self.min_y, self.max_x - self.min_x,
+		                               self.max_y - self.min_y, Entities.grounds['-1-special'],
+		                               fake_tile_origin, fake_tile_size)
+		self.fake_tile_map = self.tile_grid.fake_tile_map
+		self.ground_map = self.tile_grid.ground_map
+		self.full_map = self.tile_grid.full_map
+
+		# cover the sea with the islands and create the island map
 		self.island_map = {}
-		self.full_map = copy.copy(self.ground_map)
 		for island in self.islands:
 			for coords in island.ground_map:
 				if coords in self.ground_map:
-					self.full_map[coords] = island.ground_map[coords]
-					del self.ground_map[coords]
 					self.island_map[coords] = island
-
+			self.tile_grid.add_island(island.ground_map)
 
 	def _load_players(self, savegame_db, force_player_id):
 		human_players = []
@@ -602,16 +624,14 @@ class World(BuildingOwner, WorldObject):
 		@return: List of ships.
 		"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			return [ship for ship in self.ships if circle.contains(ship.position)]
+			return self.ship_grid.get_units_in_radius(position, radius)
 		else:
 			return self.ships
 
 	def get_ground_units(self, position=None, radius=None):
 		"""@see get_ships"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			return [unit for unit in self.ground_units if circle.contains(unit.position)]
+			return self.ground_unit_grid.get_units_in_radius(position, radius)
 		else:
 			return self.ground_units
 
@@ -674,14 +694,22 @@ class World(BuildingOwner, WorldObject):
 		self.diplomacy.save(db)
 		Weapon.save_attacks(db)
 		self.disaster_manager.save(db)
+		# write the rows that the objects have queued with db.add_row
+		db.flush_rows()
 
 	def get_checkup_hash(self):
-		"""Returns a collection of important game state values. Used to check if two mp games have diverged.
-		Not designed to be reliable."""
+		"""Returns a compact digest of important game state values. Used to check if two mp games have diverged.
+		Not designed to be reliable. The values themselves are returned by get_checkup_hash_details."""
 		# NOTE: don't include float values, they are represented differently in python 2.6 and 2.7
 		# and will differ at some insignificant place. Also make sure to handle them correctly in the game logic.
+		data = self.checkup_hash.get_value(self)
+		data['rngvalue'] = self.session.random.random()
+		return data
+
+	def get_checkup_hash_details(self):
+		"""Returns the game state values that get_checkup_hash is made of.
+		This is expensive, it is only meant to be logged after the games have diverged."""
 		data = {
-			'rngvalue': self.session.random.random(),
 			'settlements': [],
 			'ships': [],
 		}
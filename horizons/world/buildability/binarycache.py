@@ -19,7 +19,8 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
-from horizons.world.buildability.terraincache import TerrainBuildabilityCache
+from horizons.world.buildability.bitmap import CoordsBitmap
+from horizons.world.buildability.terraincache import BitmapTerrainBuildabilityCache, TerrainBuildabilityCache
 
 class LazyBinaryBuildabilityCacheElement(object):
 	"""
@@ -180,3 +181,58 @@ class BinaryBuildabilityCache(object):
 
 		self._reduce_set(self.cache[(3, 3)], removed_r3x2, 0, 1)
 		self._reset_lazy_sets()
+
+class BitmapBuildabilityCache(object):
+	"""
+	A BinaryBuildabilityCache that stores the area and every cache as a CoordsBitmap.
+
+	It answers the same queries. When the area changes, the rows of every cache that can
+	contain the changed coordinates are eroded again from the rows of the area, so the
+	cost of an update depends on the number of changed rows and not on the number of
+	changed coordinates. The bitmaps cover the rectangle of terrain_cache.land_or_coast.
+	"""
+
+	def __init__(self, terrain_cache):
+		self.terrain_cache = terrain_cache
+		if isinstance(terrain_cache, BitmapTerrainBuildabilityCache):
+			land_or_coast = terrain_cache.land_or_coast_bitmap # the same rectangle as the terrain caches
+		else:
+			land_or_coast = CoordsBitmap.init_from_coords(terrain_cache.land_or_coast)
+		self.coords_set = land_or_coast.copy_empty()
+
+		self.cache = {} # {(width, height): CoordsBitmap, ...}
+		self.cache[(1, 1)] = self.coords_set
+		for size in TerrainBuildabilityCache.sizes:
+			if size != (1, 1):
+				self.cache[size] = self.coords_set.copy_empty()
+				if size[0] != size[1]:
+					self.cache[(size[1], size[0])] = self.coords_set.copy_empty()
+
+	def _update_caches(self, changed_coords_list):
+		top = self.coords_set.top
+		first_row = min(coords[1] for coords in changed_coords_list) - top
+		last_row = max(coords[1] for coords in changed_coords_list) - top
+		for (width, height), bitmap in self.cache.iteritems():
+			if (width, height) == (1, 1):
+				continue
+			# rectangles starting up to height - 1 rows above a changed row contain it
+			start = max(first_row - height + 1, 0)
+			bitmap.replace_rows(start, self.coords_set.get_eroded_rows(width, height, start, last_row))
+
+	def add_area(self, new_coords_list):
+		"""Add a list of new coordinates to the area."""
+		for coords in new_coords_list:
+			assert coords not in self.coords_set
+			assert coords in self.terrain_cache.land_or_coast
+			self.coords_set.add(coords)
+		if new_coords_list:
+			self._update_caches(new_coords_list)
+
+	def remove_area(self, removed_coords_list):
+		"""Remove a list of existing coordinates from the area."""
+		for coords in removed_coords_list:
+			assert coords in self.coords_set
+			assert coords in self.terrain_cache.land_or_coast
+			self.coords_set.discard(coords)
+		if removed_coords_list:
+			self._update_caches(removed_coords_list)
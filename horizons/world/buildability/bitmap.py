@@ -0,0 +1,199 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from itertools import izip
+
+class CoordsBitmap(object):
+	"""
+	A set of coordinates inside a fixed rectangle that is stored as a dense bitmap.
+
+	Every row of the rectangle is an integer whose bit (x - left) is set if and only if
+	(x, y) is in the set. That takes a small fraction of the memory of a set of tuples,
+	and bitmaps of the same rectangle can be combined row by row with the binary operators
+	of the integers instead of coordinate by coordinate (see erode()).
+
+	Instances support the set operations that are used on the buildability caches:
+	membership tests, iteration, len(), add(), discard(), update(), intersection(),
+	union() and difference(). The last three return a CoordsBitmap if all arguments are
+	bitmaps of the same rectangle and a set otherwise.
+
+	Mixing a bitmap with other collections would have to look at the coordinates one by one
+	in Python, which is a lot slower than the set operations. Such operations use a set of the
+	coordinates instead (see as_set()), which is kept until the bitmap changes.
+	"""
+
+	def __init__(self, left, top, width, height, rows=None):
+		self.left = left
+		self.top = top
+		self.width = width
+		self.height = height
+		self.rows = [0] * height if rows is None else rows # [row bits, ...]
+		self._coords_set = None # set of the coordinates, see as_set()
+
+	@classmethod
+	def init_from_coords(cls, coords_iter):
+		"""Returns a bitmap of the smallest rectangle that contains all the coordinates."""
+		coords_list = list(coords_iter)
+		if not coords_list:
+			return cls(0, 0, 0, 0)
+		left = min(x for (x, _) in coords_list)
+		top = min(y for (_, y) in coords_list)
+		width = max(x for (x, _) in coords_list) - left + 1
+		height = max(y for (_, y) in coords_list) - top + 1
+		bitmap = cls(left, top, width, height)
+		rows = bitmap.rows
+		for (x, y) in coords_list:
+			rows[y - top] |= 1 << (x - left)
+		return bitmap
+
+	def copy(self):
+		return self.__class__(self.left, self.top, self.width, self.height, list(self.rows))
+
+	def copy_empty(self):
+		"""Returns an empty bitmap of the same rectangle."""
+		return self.__class__(self.left, self.top, self.width, self.height)
+
+	def is_aligned(self, other):
+		"""Returns whether other is a bitmap of the same rectangle."""
+		return isinstance(other, CoordsBitmap) and self.left == other.left and self.top == other.top \
+			and self.width == other.width and self.height == other.height
+
+	def as_set(self):
+		"""Returns a set of the coordinates, for fast membership tests and set operations with
+		other collections. It is created on the first call and must not be changed."""
+		if self._coords_set is None:
+			self._coords_set = set(self)
+		return self._coords_set
+
+	def __contains__(self, coords):
+		if self._coords_set is not None:
+			return coords in self._coords_set
+		x = coords[0] - self.left
+		y = coords[1] - self.top
+		# the bits beyond the width are never set
+		return 0 <= y < self.height and x >= 0 and bool(self.rows[y] >> x & 1)
+
+	def __iter__(self):
+		left = self.left
+		y = self.top
+		for row in self.rows:
+			while row:
+				lowest_bit = row & -row
+				yield (left + lowest_bit.bit_length() - 1, y)
+				row ^= lowest_bit
+			y += 1
+
+	def __len__(self):
+		return sum(bin(row).count('1') for row in self.rows)
+
+	def __nonzero__(self):
+		return any(self.rows)
+
+	def __eq__(self, other):
+		if self.is_aligned(other):
+			return self.rows == other.rows
+		if isinstance(other, (set, frozenset, CoordsBitmap)):
+			return set(self) == set(other)
+		return NotImplemented
+
+	def __ne__(self, other):
+		result = self.__eq__(other)
+		return result if result is NotImplemented else not result
+
+	__hash__ = None
+
+	def __repr__(self):
+		return '<CoordsBitmap %dx%d at (%d, %d) with %d coords>' % \
+			(self.width, self.height, self.left, self.top, len(self))
+
+	def add(self, coords):
+		x = coords[0] - self.left
+		y = coords[1] - self.top
+		assert 0 <= x < self.width and 0 <= y < self.height, '%s is outside of %r' % (coords, self)
+		self.rows[y] |= 1 << x
+		self._coords_set = None
+
+	def discard(self, coords):
+		x = coords[0] - self.left
+		y = coords[1] - self.top
+		if 0 <= x < self.width and 0 <= y < self.height:
+			self.rows[y] &= ~(1 << x)
+			self._coords_set = None
+
+	def update(self, coords_iter):
+		for coords in coords_iter:
+			self.add(coords)
+
+	def replace_rows(self, first_row, rows):
+		"""Replaces the rows starting at first_row with rows."""
+		self.rows[first_row:first_row + len(rows)] = rows
+		self._coords_set = None
+
+	def _combine(self, others, operation):
+		rows = self.rows
+		for other in others:
+			rows = [operation(a, b) for a, b in izip(rows, other.rows)]
+		return self.__class__(self.left, self.top, self.width, self.height, list(rows))
+
+	def intersection(self, *others):
+		if all(self.is_aligned(other) for other in others):
+			return self._combine(others, lambda a, b: a & b)
+		return self.as_set().intersection(*others)
+
+	def union(self, *others):
+		if all(self.is_aligned(other) for other in others):
+			return self._combine(others, lambda a, b: a | b)
+		return self.as_set().union(*others)
+
+	def difference(self, *others):
+		if all(self.is_aligned(other) for other in others):
+			return self._combine(others, lambda a, b: a & ~b)
+		return self.as_set().difference(*others)
+
+	def get_eroded_rows(self, width, height, first_row=0, last_row=None):
+		"""
+		Returns the rows of the bitmap of the origins of width x height rectangles that are
+		entirely inside this bitmap.
+
+		The rows first_row to last_row (inclusive, clamped to the rectangle) are returned as
+		a list. A row of the result only depends on the rows it starts at and the
+		height - 1 rows below it, which allows updating parts of an eroded bitmap.
+		"""
+		first_row = max(first_row, 0)
+		last_row = self.height - 1 if last_row is None else min(last_row, self.height - 1)
+		if last_row < first_row:
+			return []
+
+		# rectangles that reach below the bitmap are combined with empty rows
+		rows = self.rows[first_row:last_row + height] + [0] * (height - 1)
+		num_rows = last_row - first_row + 1
+		vertical = rows[:num_rows]
+		for dy in xrange(1, height):
+			vertical = [a & b for a, b in izip(vertical, rows[dy:])]
+		result = vertical
+		for dx in xrange(1, width):
+			result = [a & (b >> dx) for a, b in izip(result, vertical)]
+		return result
+
+	def erode(self, width, height):
+		"""Returns the bitmap of the origins of width x height rectangles that are entirely inside this one."""
+		return self.__class__(self.left, self.top, self.width, self.height, self.get_eroded_rows(width, height))
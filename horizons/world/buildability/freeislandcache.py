@@ -19,7 +19,7 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
-from horizons.world.buildability.binarycache import BinaryBuildabilityCache
+from horizons.world.buildability.binarycache import BitmapBuildabilityCache
 
 class FreeIslandBuildabilityCache(object):
 	"""
@@ -36,8 +36,8 @@ class FreeIslandBuildabilityCache(object):
 	"""
 
 	def __init__(self, island):
-		self._binary_cache = BinaryBuildabilityCache(island.terrain_cache)
-		self.cache = self._binary_cache.cache # {(width, height): set((x, y), ...), ...}
+		self._binary_cache = BitmapBuildabilityCache(island.terrain_cache)
+		self.cache = self._binary_cache.cache # {(width, height): CoordsBitmap, ...}
 		self.island = island
 		self._init()
 
@@ -20,6 +20,7 @@
 # ###################################################
 
 from horizons.util.shapes.rect import Rect
+from horizons.world.buildability.bitmap import CoordsBitmap
 
 class TerrainRequirement:
 	LAND = 1 # buildings that must be entirely on flat land
@@ -210,3 +211,61 @@ class TerrainBuildabilityCache(object):
 		for cache_layer in other_cache_layers:
 			result = result.intersection(cache_layer.cache[size])
 		return result
+
+class BitmapTerrainBuildabilityCache(TerrainBuildabilityCache):
+	"""
+	A TerrainBuildabilityCache that stores every cache as a CoordsBitmap of the island.
+
+	The caches of the bigger sizes are created by eroding the bitmaps of the flat land
+	and the coast instead of by looking at every tile, and the row and square dicts of
+	the set based version aren't kept. The content of the caches is the same.
+
+	land_or_coast is a set like in the base class, since it is mostly used for membership
+	tests of single coordinates. Its bitmap is land_or_coast_bitmap.
+	"""
+
+	def _init_land_and_coast(self):
+		ground_map = self._island.ground_map
+		land = CoordsBitmap.init_from_coords(ground_map.iterkeys()).copy_empty()
+		coast = land.copy_empty()
+		left = land.left
+		top = land.top
+		land_rows = land.rows
+		coast_rows = coast.rows
+
+		for (x, y), tile in ground_map.iteritems():
+			if 'constructible' in tile.classes:
+				land_rows[y - top] |= 1 << (x - left)
+			elif 'coastline' in tile.classes:
+				coast_rows[y - top] |= 1 << (x - left)
+
+		self._land = land
+		self._coast = coast
+		self.land_or_coast_bitmap = land.union(coast)
+		self.land_or_coast = self.land_or_coast_bitmap.as_set()
+
+	def create_cache(self):
+		self._init_land_and_coast()
+
+		land = {}
+		land[(1, 1)] = self._land
+		for size in self.sizes:
+			if size != (1, 1):
+				land[size] = self._land.erode(*size)
+				if size[0] != size[1]:
+					land[(size[1], size[0])] = self._land.erode(size[1], size[0])
+
+		# coastal buildings must have some flat land and some coast under them
+		land_and_coast = {}
+		for size in [(2, 2), (3, 3)]:
+			land_and_coast[size] = self.land_or_coast_bitmap.erode(*size).difference(land[size], self._coast.erode(*size))
+
+		self.cache = {}
+		self.cache[TerrainRequirement.LAND] = land
+		self.cache[TerrainRequirement.LAND_AND_COAST] = land_and_coast
+
+	def create_sea_cache(self):
+		super(BitmapTerrainBuildabilityCache, self).create_sea_cache()
+		near_sea = self.land_or_coast_bitmap.copy_empty()
+		near_sea.update(self.cache[TerrainRequirement.LAND_AND_COAST_NEAR_SEA][(3, 3)])
+		self.cache[TerrainRequirement.LAND_AND_COAST_NEAR_SEA][(3, 3)] = near_sea
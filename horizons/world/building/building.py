@@ -124,7 +124,7 @@ class BasicBuilding(ComponentHolder, ConcreteObject):
 
 	def save(self, db):
 		super(BasicBuilding, self).save(db)
-		db("INSERT INTO building (rowid, type, x, y, rotation, location, level) \
+		db.add_row("INSERT INTO building (rowid, type, x, y, rotation, location, level) \
 		   VALUES (?, ?, ?, ?, ?, ?, ?)",
 		                                self.worldid, self.__class__.id, self.position.origin.x,
 		                                self.position.origin.y, self.rotation,
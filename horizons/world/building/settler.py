@@ -89,7 +89,7 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 		super(Settler, self).save(db)
 		db("INSERT INTO settler(rowid, inhabitants, last_tax_payed) VALUES (?, ?, ?)",
 		   self.worldid, self.inhabitants, self.last_tax_payed)
-		remaining_ticks = Scheduler().get_remaining_ticks(self, self._tick)
+		remaining_ticks = self.settlement.settler_ticker.get_remaining_ticks(self)
 		db("INSERT INTO remaining_ticks_of_month(rowid, ticks) VALUES (?, ?)",
 		   self.worldid, remaining_ticks)
 
@@ -148,6 +148,7 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 		SettlerInhabitantsChanged.broadcast(self, -self.inhabitants)
 
 		UpgradePermissionsChanged.unsubscribe(self._on_change_upgrade_permissions, sender=self.settlement)
+		self.settlement.settler_ticker.remove(self)
 		super(Settler, self).remove()
 
 	@property
@@ -211,20 +212,20 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 			# not touched before the relase (2012.1)
 			self.update_action_set_level(self.level)
 
+	def get_tick_interval(self):
+		"""Returns the number of ticks between two calls of the regular ("monthly") tick"""
+		return self.session.timer.get_ticks(GAME.INGAME_TICK_INTERVAL)
+
 	def run(self, remaining_ticks=None):
-		"""Start regular tick calls"""
-		interval = self.session.timer.get_ticks(GAME.INGAME_TICK_INTERVAL)
-		run_in = remaining_ticks if remaining_ticks is not None else interval
-		Scheduler().add_new_object(self._tick, self, run_in=run_in, loops=-1, loop_interval=interval)
-
-	def _tick(self):
-		"""Here we collect the functions, that are called regularly (every "month")."""
-		self.pay_tax()
-		self.inhabitant_check()
-		self.level_check()
-
-	def pay_tax(self):
-		"""Pays the tax for this settler"""
+		"""Start regular tick calls.
+		The ticks of all settlers of a settlement are processed by its SettlerTicker."""
+		run_in = remaining_ticks if remaining_ticks is not None else self.get_tick_interval()
+		self.settlement.settler_ticker.add(self, run_in)
+
+	def collect_tax(self):
+		"""Collects the tax of this settler and updates its happiness.
+		The SettlerTicker adds the taxes of all settlers of a pass to the gold of the owner.
+		@return: int, the taxes that have to be added"""
 		# the money comes from nowhere, settlers seem to have an infinite amount of money.
 		# see http://wiki.unknown-horizons.org/w/Settler_taxing
 
@@ -233,8 +234,6 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 		inhabitants_tax_modifier = float(self.inhabitants) / self.inhabitants_max
 		taxes = self.tax_base * self.settlement.tax_settings[self.level] *  happiness_tax_modifier * inhabitants_tax_modifier
 		real_taxes = int(round(taxes * self.owner.difficulty.tax_multiplier))
-
-		self.settlement.owner.get_component(StorageComponent).inventory.alter(RES.GOLD, real_taxes)
 		self.last_tax_payed = real_taxes
 
 		# decrease happiness http://wiki.unknown-horizons.org/w/Settler_taxing#Formulae
@@ -250,6 +249,7 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 		self._changed()
 		self.log.debug("%s: pays %s taxes, -happy: %s new happiness: %s", self, real_taxes,
 									 happiness_decrease, self.happiness)
+		return real_taxes
 
 	def inhabitant_check(self):
 		"""Checks whether or not the population of this settler should increase or decrease"""
@@ -391,13 +391,10 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 		except AttributeError: # an attribute hasn't been set up
 			return super(Settler, self).__str__()
 
-	#@decorators.cachedmethod TODO: replace this with a version that doesn't leak
 	def __get_data(self, key):
 		"""Returns constant settler-related data from the db.
-		The values are cached by python, so the underlying data must not change."""
-		return int(
-		  self.session.db("SELECT value FROM balance_values WHERE name = ?", key)[0][0]
-		  )
+		The values are cached by the db, so the underlying data must not change."""
+		return int(self.session.db.get_balance_value(key))
 
 
 
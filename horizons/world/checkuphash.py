@@ -0,0 +1,136 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import zlib
+
+from horizons.component.storagecomponent import StorageComponent
+from horizons.util.python.callback import Callback
+
+
+class RollingDigest(object):
+	"""Order independent digest of a collection of entries.
+
+	The digest is the sum of the checksums of the entries, so adding or removing an entry
+	doesn't depend on the size of the collection. Entries are tuples of ints and strings,
+	their checksums are the same on every platform.
+	"""
+	MASK = 0xffffffffffffffff
+
+	def __init__(self):
+		self.value = 0
+
+	@staticmethod
+	def get_checksum(entry):
+		return zlib.crc32(repr(entry)) & 0xffffffff
+
+	def add(self, entry):
+		self.value = (self.value + self.get_checksum(entry)) & self.MASK
+
+	def remove(self, entry):
+		self.value = (self.value - self.get_checksum(entry)) & self.MASK
+
+
+class CheckupHash(object):
+	"""Keeps a compact digest of the game state that multiplayer games compare to detect desyncs.
+
+	The ship part is updated when ships are added, removed or moved. The inventory of a
+	settlement is only checksummed again after it has changed. get_value() returns a dict
+	with a fixed number of ints, no matter how big the game is, see World.get_checkup_hash.
+	The listeners on the settlements are removed with the settlement or in end().
+	"""
+
+	def __init__(self):
+		self._ships = RollingDigest()
+		self._ship_entries = {} # { ship: entry that is part of self._ships }
+		self._inventory_checksums = {} # { settlement worldid: checksum or None if outdated }
+		self._settlement_listeners = {} # { settlement worldid: (settlement, change listener, remove listener) }
+
+	def end(self):
+		for worldid in self._settlement_listeners.keys():
+			self._remove_settlement_listeners(worldid)
+		self._ship_entries = None
+		self._inventory_checksums = None
+		self._settlement_listeners = None
+
+	@staticmethod
+	def _get_ship_entry(ship):
+		return (ship.worldid, ship.owner.worldid, ship.position.x, ship.position.y)
+
+	def ship_added(self, ship):
+		entry = self._get_ship_entry(ship)
+		self._ship_entries[ship] = entry
+		self._ships.add(entry)
+
+	def ship_removed(self, ship):
+		self._ships.remove(self._ship_entries.pop(ship))
+
+	def ship_moved(self, ship):
+		entry = self._get_ship_entry(ship)
+		if entry != self._ship_entries[ship]:
+			self._ships.remove(self._ship_entries[ship])
+			self._ships.add(entry)
+			self._ship_entries[ship] = entry
+
+	def _inventory_changed(self, settlement_id):
+		self._inventory_checksums[settlement_id] = None
+
+	def _settlement_removed(self, settlement_id):
+		self._remove_settlement_listeners(settlement_id)
+		del self._inventory_checksums[settlement_id]
+
+	def _remove_settlement_listeners(self, settlement_id):
+		settlement, change_listener, remove_listener = self._settlement_listeners.pop(settlement_id)
+		settlement.get_component(StorageComponent).inventory.discard_change_listener(change_listener)
+		settlement.discard_remove_listener(remove_listener)
+
+	def _get_inventory_checksum(self, settlement):
+		worldid = settlement.worldid
+		inventory = settlement.get_component(StorageComponent).inventory
+		if worldid not in self._inventory_checksums:
+			# first use, get notified about every further change
+			change_listener = Callback(self._inventory_changed, worldid)
+			remove_listener = Callback(self._settlement_removed, worldid)
+			inventory.add_change_listener(change_listener)
+			settlement.add_remove_listener(remove_listener)
+			self._settlement_listeners[worldid] = (settlement, change_listener, remove_listener)
+			self._inventory_checksums[worldid] = None
+
+		checksum = self._inventory_checksums[worldid]
+		if checksum is None:
+			# resources that are stored with an amount of 0 don't matter
+			checksum = RollingDigest.get_checksum(sorted(item for item in inventory.itercontents() if item[1]))
+			self._inventory_checksums[worldid] = checksum
+		return checksum
+
+	def get_value(self, world):
+		"""Returns the digest of the current state of world
+		@return: dict { part name: int }"""
+		settlements = RollingDigest()
+		for settlement in world.settlements:
+			# str() like in World.get_checkup_hash_details, running costs can be floats
+			settlements.add((settlement.worldid, settlement.owner.worldid, str(settlement.inhabitants),
+			                 str(settlement.cumulative_running_costs), str(settlement.cumulative_taxes),
+			                 self._get_inventory_checksum(settlement)))
+		return {
+			'settlements': settlements.value,
+			'ships': self._ships.value,
+			'ship_count': len(self._ship_entries),
+		}
@@ -36,7 +36,7 @@ from horizons.constants import BUILDINGS, RES, UNITS
 from horizons.scenario import CONDITIONS
 from horizons.world.buildingowner import BuildingOwner
 from horizons.world.buildability.freeislandcache import FreeIslandBuildabilityCache
-from horizons.world.buildability.terraincache import TerrainBuildabilityCache, TerrainRequirement
+from horizons.world.buildability.terraincache import BitmapTerrainBuildabilityCache, TerrainRequirement
 from horizons.gui.widgets.minimap import Minimap
 from horizons.world.ground import MapPreviewTile
 
@@ -98,7 +98,7 @@ class Island(BuildingOwner, WorldObject):
 			self.settlements.append(settlement)
 
 		if not preview:
-			self.terrain_cache = TerrainBuildabilityCache(self)
+			self.terrain_cache = BitmapTerrainBuildabilityCache(self)
 			flat_land_set = self.terrain_cache.cache[TerrainRequirement.LAND][(1, 1)]
 			self.available_flat_land = len(flat_land_set)
 			available_coords_set = set(self.terrain_cache.land_or_coast)
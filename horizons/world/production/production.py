@@ -27,6 +27,7 @@ from collections import defaultdict, deque
 from horizons.util.changelistener import metaChangeListenerDecorator, ChangeListener
 from horizons.constants import PRODUCTION
 from horizons.world.production.productionline import ProductionLine
+from horizons.world.production.statehistory import StateHistoryWindow
 
 from horizons.scheduler import Scheduler
 
@@ -51,6 +52,7 @@ class Production(ChangeListener):
 	# the special resource gold is only stored in the player's inventory.
 	# If productions want to use it, they will observer every change of it, which results in
 	# a lot calls. Therefore, this is not done by default but only for few subclasses that actually need it.
+	# Waiting productions only listen for changes of the res they are waiting for (see _add_listeners).
 	uses_gold = False
 
 	keep_original_prod_line = False
@@ -70,6 +72,8 @@ class Production(ChangeListener):
 		# this has grown to be a bit weird compared to other init/loads
 		# __init__ is always called before load, therefore load just overwrites some of the values here
 		self._state_history = deque()
+		self._state_window = StateHistoryWindow(PRODUCTION.STATISTICAL_WINDOW)
+		self._state_history_clean_size = 0
 		self.prod_id = prod_id
 		self.prod_data = prod_data
 		self.__start_finished = start_finished
@@ -111,7 +115,7 @@ class Production(ChangeListener):
 		# use a number > 0 for ticks
 		if remaining_ticks < 1:
 			remaining_ticks = 1
-		db('INSERT INTO production(rowid, state, prod_line_id, remaining_ticks, \
+		db.add_row('INSERT INTO production(rowid, state, prod_line_id, remaining_ticks, \
 		      _pause_old_state, creation_tick, owner) VALUES(?, ?, ?, ?, ?, ?, ?)',
 		         None, self._state.index, self._prod_line.id, remaining_ticks,
 		         None if self._pause_old_state is None else self._pause_old_state.index,
@@ -121,7 +125,7 @@ class Production(ChangeListener):
 		for tick, state in self._state_history:
 				# pre-translate the tick number for the loading process
 			translated_tick = tick - current_tick + 1
-			db("INSERT INTO production_state_history(production, tick, state, object_id) VALUES(?, ?, ?, ?)",
+			db.add_row("INSERT INTO production_state_history(production, tick, state, object_id) VALUES(?, ?, ?, ?)",
 				 self.prod_id, translated_tick, state, owner_id)
 
 	def load(self, db, worldid):
@@ -144,6 +148,7 @@ class Production(ChangeListener):
 			self._add_listeners()
 
 		self._state_history = db.get_production_state_history(worldid, self.prod_id)
+		self._state_window = StateHistoryWindow(PRODUCTION.STATISTICAL_WINDOW, self._state_history)
 
 	def remove(self):
 		self._remove_listeners()
@@ -253,6 +258,16 @@ class Production(ChangeListener):
 		"""
 		Returns the part of time 0 <= x <= 1 the production has been in a state during the last history_length ticks.
 		"""
+		if not ignore_pause:
+			# the window is fixed in this case, the accumulated times can be used
+			current_tick = Scheduler().cur_tick
+			result = self._state_window.get_times(current_tick, self._get_first_relevant_tick(False))
+			total_length = sum(result.itervalues())
+			if total_length:
+				for key in result:
+					result[key] /= float(total_length)
+			return result
+
 		self._clean_state_history()
 		result = defaultdict(int)
 		current_tick = Scheduler().cur_tick
@@ -329,6 +344,7 @@ class Production(ChangeListener):
 		first_relevant_tick = self._get_first_relevant_tick(True)
 		while len(self._state_history) > 1 and self._state_history[1][0] < first_relevant_tick:
 			self._state_history.popleft()
+		self._state_history_clean_size = 2 * len(self._state_history) + 8
 
 	def _changed(self):
 		super(Production, self)._changed()
@@ -342,24 +358,29 @@ class Production(ChangeListener):
 			self._state_history.pop() # make sure no two events are on the same tick
 		if not self._state_history or self._state_history[-1][1] != state:
 			self._state_history.append((current_tick, state))
+		self._state_window.add(current_tick, state)
 
-		self._clean_state_history()
+		# cleaning has to look at the whole history, only do it when it has grown a lot
+		if len(self._state_history) > self._state_history_clean_size:
+			self._clean_state_history()
 
 	def _check_inventory(self):
-		"""Called when assigned building's inventory changed in some way"""
+		"""Called when assigned building's inventory changed in a way that might change the state"""
+		# stop listening for res, the listeners depend on the result
+		self._remove_listeners()
 		check_space = self._check_for_space_for_produced_res()
 		if not check_space:
 			# can't produce, no space in our inventory
 			self._state = PRODUCTION.STATES.inventory_full
+			self._add_inventory_listeners()
 			self._changed()
 		elif self._check_available_res():
 			# we have space in our inventory and needed res are available
-			# stop listening for res
-			self._remove_listeners()
 			self._start_production()
 		else:
 			# we have space in our inventory, but needed res are missing
 			self._state = PRODUCTION.STATES.waiting_for_res
+			self._add_inventory_listeners()
 			self._changed()
 
 	def _start_production(self):
@@ -390,20 +411,62 @@ class Production(ChangeListener):
 
 	def _add_listeners(self, check_now=False):
 		"""Listen for changes in the inventory from now on."""
-		# don't set call_listener_now to True here, adding/removing changelisteners wouldn't be atomic any more
+		if check_now:
+			self._check_inventory() # adds the listeners that fit the result
+		else:
+			self._add_inventory_listeners()
+
+	def _add_inventory_listeners(self):
+		"""Listens for the changes of the inventory that can change the result of _check_inventory.
+		Instead of checking after every change of the inventory, resource listeners are added
+		for conditions that currently aren't met:
+		- inventory_full: there is space for the first produced res that doesn't fit.
+		- waiting_for_res: there is no space for one of the produced res any more or one of
+		  the conditions of _get_missing_res_conditions is met.
+		"""
+		missing_space = self._get_missing_space_conditions()
+		if missing_space:
+			if self._state == PRODUCTION.STATES.inventory_full:
+				inventory, res, amount = missing_space[0]
+				inventory.add_resource_listener(res, self._check_inventory, free_space=amount)
+				return
+		else:
+			missing_res = self._get_missing_res_conditions()
+			if missing_res and self._state == PRODUCTION.STATES.waiting_for_res:
+				for res, amount in self._prod_line.produced_res.iteritems():
+					self.inventory.add_resource_listener(res, self._check_inventory, free_space_below=amount)
+				for inventory, res, amount in missing_res:
+					inventory.add_resource_listener(res, self._check_inventory, amount=amount)
+				return
+
+		# the state doesn't match the inventory (e.g. after loading), check after every change
 		self.inventory.add_change_listener(self._check_inventory)
 		if self.__class__.uses_gold:
 			self.owner_inventory.add_change_listener(self._check_inventory)
 
-		if check_now: # only check now after adding everything
-			self._check_inventory()
-
 	def _remove_listeners(self):
 		# depending on state, a check_inventory listener might be active
+		self.inventory.discard_resource_listener(self._check_inventory)
 		self.inventory.discard_change_listener(self._check_inventory)
 		if self.__class__.uses_gold:
+			self.owner_inventory.discard_resource_listener(self._check_inventory)
 			self.owner_inventory.discard_change_listener(self._check_inventory)
 
+	def _get_missing_space_conditions(self):
+		"""Returns what is missing for _check_for_space_for_produced_res.
+		@return: list of (inventory, res, free space that is needed) for the res that don't fit"""
+		return [(self.inventory, res, amount) for res, amount in self._prod_line.produced_res.iteritems()
+		        if self.inventory.get_free_space_for(res) < amount]
+
+	def _get_missing_res_conditions(self):
+		"""Returns conditions of which at least one has to be met before _check_available_res
+		can succeed. Has to be kept consistent with _check_available_res.
+		@return: list of (inventory, res, amount that is needed), empty if the res are available"""
+		for res, amount in self._prod_line.consumed_res.iteritems():
+			if self.inventory[res] < (-amount): # consumed res have negative sign
+				return [(self.inventory, res, -amount)]
+		return []
+
 	def _give_produced_res(self):
 		"""Put produces goods to the inventory"""
 		for res, amount in self._prod_line.produced_res.iteritems():
@@ -0,0 +1,102 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from collections import defaultdict, deque
+
+
+class StateHistoryWindow(object):
+	"""Keeps track of how long something has been in each state during the latest ticks.
+
+	The states are recorded as runs (start tick, state), every run lasts until the next one
+	starts. Additionally, the number of ticks spent in each state is summed up for all closed
+	runs from a lower tick on. The lower tick only moves forward, the part of the runs that
+	falls out of the window is subtracted again whenever a state is added or queried, so
+	neither has to look at the whole history and only the runs of the window are kept.
+	"""
+
+	def __init__(self, length, history=()):
+		"""
+		@param length: number of ticks of the window, older runs are dropped
+		@param history: iterable of (tick, state), ordered by tick
+		"""
+		self.length = length
+		self._runs = deque() # (start tick, state)
+		self._totals = defaultdict(int) # { state: ticks spent in state in [_lower, _closed_until) }
+		self._lower = None
+		self._closed_until = None
+		for tick, state in history:
+			self.add(tick, state)
+
+	def __len__(self):
+		return len(self._runs)
+
+	def add(self, tick, state):
+		"""Records that the state changed to state at tick.
+		A change at the same tick as the previous one replaces the previous one.
+		@param tick: must be greater or equal than every tick added before"""
+		runs = self._runs
+		if not runs:
+			runs.append((tick, state))
+			self._lower = self._closed_until = tick
+			return
+
+		# close the current run
+		self._totals[runs[-1][1]] += tick - self._closed_until
+		self._closed_until = tick
+
+		if runs[-1][0] == tick:
+			runs.pop() # the run has no length, make sure no two runs start on the same tick
+		if not runs or runs[-1][1] != state:
+			runs.append((tick, state))
+
+		self._drop_before(tick - self.length)
+
+	def _drop_before(self, first_tick):
+		"""Drops the part of the closed runs before first_tick"""
+		runs = self._runs
+		target = min(first_tick, self._closed_until)
+		totals = self._totals
+		while self._lower < target:
+			run_end = runs[1][0] if len(runs) > 1 else self._closed_until
+			cut = min(run_end, target)
+			totals[runs[0][1]] -= cut - self._lower
+			self._lower = cut
+			if cut == run_end and len(runs) > 1:
+				runs.popleft()
+
+	def get_times(self, current_tick, first_tick):
+		"""Returns the number of ticks spent in each state in [first_tick, current_tick).
+		@param first_tick: must be greater or equal than first_tick of the previous calls and
+		                   current_tick - length
+		@return: defaultdict { state: ticks }"""
+		result = defaultdict(int)
+		runs = self._runs
+		if not runs:
+			return result
+
+		self._drop_before(first_tick)
+		for state, ticks in self._totals.iteritems():
+			if ticks:
+				result[state] = ticks
+		open_ticks = current_tick - max(self._closed_until, first_tick)
+		if open_ticks > 0:
+			result[runs[-1][1]] += open_ticks
+		return result
@@ -57,6 +57,20 @@ class UnitProduction(ChangingProduction):
 				return True
 		return False
 
+	def _get_missing_res_conditions(self):
+		# any res that is still needed is enough to continue
+		if self._check_available_res():
+			return []
+		conditions = []
+		for res, amount in self._prod_line.consumed_res.iteritems():
+			if amount == 0:
+				continue # already fully provided
+			if res == RES.GOLD:
+				conditions.append((self.owner_inventory, res, 1))
+			else:
+				conditions.append((self.inventory, res, 1))
+		return conditions
+
 	def _remove_res_to_expend(self, return_without_gold=False):
 		"""Takes as many res as there are and returns sum of amount of res taken.
 		@param return_without_gold: return not an integer but a tuple, where the second value is without gold"""
@@ -88,10 +102,8 @@ class UnitProduction(ChangingProduction):
 		# check if there were res
 		if removed_res == 0:
 			# watch inventory for new res
-			self.inventory.add_change_listener(self._check_inventory)
-			if self.__class__.uses_gold:
-				self.owner_inventory.add_change_listener(self._check_inventory)
 			self._state = PRODUCTION.STATES.waiting_for_res
+			self._add_listeners()
 			self._changed()
 			return
 
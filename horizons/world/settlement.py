@@ -34,6 +34,7 @@ from horizons.component.storagecomponent import StorageComponent
 from horizons.world.buildability.settlementcache import SettlementBuildabilityCache
 from horizons.world.production.producer import Producer, UnitProducer
 from horizons.world.resourcehandler import ResourceHandler
+from horizons.world.settlerticker import SettlerTicker
 from horizons.scheduler import Scheduler
 
 class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
@@ -69,6 +70,7 @@ class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
 		self.warehouse = None # this is set later in the same tick by the warehouse itself or load() here
 		self.upgrade_permissions = upgrade_permissions
 		self.tax_settings = tax_settings
+		self.settler_ticker = SettlerTicker(self)
 		Scheduler().add_new_object(self.__init_inventory_checker, self)
 
 	def init_buildability_cache(self, terrain_cache):
@@ -253,5 +255,7 @@ class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
 		self.produced_res = None
 		self.buildings_by_id = None
 		self.warehouse = None
+		self.settler_ticker.end()
+		self.settler_ticker = None
 		if hasattr(self, '__inventory_checker'):
 			self.__inventory_checker.remove()
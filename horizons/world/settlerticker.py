@@ -0,0 +1,61 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+
+from horizons.constants import RES
+from horizons.component.storagecomponent import StorageComponent
+from horizons.util.tickbatcher import TickBatcher
+
+
+class SettlerTicker(TickBatcher):
+	"""Calls the monthly tick of the settlers of a settlement.
+
+	Instead of every settler scheduling its own looping tick, the settlers that are due in a
+	tick are processed in one scheduler call for that tick. Every settler keeps its own phase,
+	so the outcome for each settler is the same as with individual ticks. The taxes of all
+	settlers of a pass are added to the gold of the owner with a single alter.
+	"""
+	log = logging.getLogger("world.settlement")
+
+	def __init__(self, settlement):
+		super(SettlerTicker, self).__init__()
+		self.settlement = settlement
+
+	def end(self):
+		super(SettlerTicker, self).end()
+		self.settlement = None
+
+	def _tick(self, tick):
+		taxes = 0
+		interval = None
+		for settler in self._pop_due(tick):
+			if interval is None:
+				interval = settler.get_tick_interval()
+			# schedule the next tick first, the settler might be removed by its checks
+			self.add(settler, interval)
+			taxes += settler.collect_tax()
+			settler.inhabitant_check()
+			settler.level_check()
+
+		if taxes:
+			self.settlement.owner.get_component(StorageComponent).inventory.alter(RES.GOLD, taxes)
+			self.log.debug("%s: collected %s taxes", self.settlement, taxes)
@@ -37,13 +37,37 @@ Combinations:
 - PositiveTotalStorage: use case: ship inventory
 - PositiveSizedSlotStorage: every res has the same limit, only positive values (warehouse, collectors)
 - PositiveSizedSpecializedStorage: Like SizedSpecializedStorage, plus only positive values.
+
+Besides normal change listeners, storages support resource listeners, which are only called
+after changes of a certain resource and only if a condition on its amount or free space is met.
 """
 
 import sys
 import copy
 from collections import defaultdict
 
-from horizons.util.changelistener import ChangeListener
+from horizons.util.changelistener import ChangeListener, call_listener
+from horizons.util.python.weakmethod import WeakMethod
+
+class _ResourceListener(object):
+	"""Condition of a resource listener, see GenericStorage.add_resource_listener"""
+	__slots__ = ('res', 'callback', 'amount', 'free_space', 'free_space_below', 'active')
+
+	def __init__(self, res, callback, amount, free_space, free_space_below):
+		self.res = res
+		self.callback = callback
+		self.amount = amount
+		self.free_space = free_space
+		self.free_space_below = free_space_below
+		self.active = True
+
+	def is_met(self, storage):
+		if self.amount is not None:
+			return storage[self.res] >= self.amount
+		elif self.free_space is not None:
+			return storage.get_free_space_for(self.res) >= self.free_space
+		else:
+			return storage.get_free_space_for(self.res) < self.free_space_below
 
 class GenericStorage(ChangeListener):
 	"""The GenericStorage represents a storage for buildings/units/players/etc. for storing
@@ -51,13 +75,18 @@ class GenericStorage(ChangeListener):
 	derive storages with special function from it. Normally there should be no need to
 	use the GenericStorage. Rather use a specialized version that is suitable for the job.
 	"""
+	# whether changing the amount of a res can change the free space for other res
+	free_space_depends_on_other_res = False
+
 	def __init__(self):
 		super(GenericStorage, self).__init__()
 		self._storage = defaultdict(int)
+		self._resource_listeners = {} # { res: list of _ResourceListener }
+		self._resource_listeners_by_callback = {} # { WeakMethod: list of _ResourceListener }
 
 	def save(self, db, ownerid):
 		for slot in self._storage.iteritems():
-			db("INSERT INTO storage (object, resource, amount) VALUES (?, ?, ?) ",
+			db.add_row("INSERT INTO storage (object, resource, amount) VALUES (?, ?, ?) ",
 				ownerid, slot[0], slot[1])
 
 	def load(self, db, ownerid):
@@ -74,14 +103,14 @@ class GenericStorage(ChangeListener):
 		@return: int - amount that did not fit or was not available, depending on context.
 		"""
 		self._storage[res] += amount # defaultdict
-		self._changed()
+		self._changed(res)
 		return 0
 
 	def reset(self, res):
 		"""Resets a resource slot to zero, removing all its contents."""
 		if res in self._storage:
 			self._storage[res] = 0
-			self._changed()
+			self._changed(res)
 
 	def reset_all(self):
 		"""Removes every resource from this inventory"""
@@ -121,6 +150,60 @@ class GenericStorage(ChangeListener):
 	def __str__(self):
 		return "%s(%s)" % (self.__class__, self._storage if hasattr(self, "_storage") else None)
 
+	## Resource listeners
+	def add_resource_listener(self, res, listener, amount=None, free_space=None, free_space_below=None):
+		"""Calls listener after every change of res while a condition is met.
+		Exactly one condition has to be given:
+		@param amount: the stored amount of res is at least amount
+		@param free_space: get_free_space_for(res) is at least free_space
+		@param free_space_below: get_free_space_for(res) is less than free_space_below
+		NOTE: Like change listeners, resource listeners aren't saved."""
+		assert callable(listener)
+		assert [amount, free_space, free_space_below].count(None) == 2
+		callback = WeakMethod(listener)
+		entry = _ResourceListener(res, callback, amount, free_space, free_space_below)
+		self._resource_listeners.setdefault(res, []).append(entry)
+		self._resource_listeners_by_callback.setdefault(callback, []).append((res, entry))
+
+	def has_resource_listener(self, listener):
+		return WeakMethod(listener) in self._resource_listeners_by_callback
+
+	def discard_resource_listener(self, listener):
+		"""Removes every resource listener that calls listener"""
+		entries = self._resource_listeners_by_callback.pop(WeakMethod(listener), None)
+		if entries is None:
+			return
+		for res, entry in entries:
+			entry.active = False
+			listeners = self._resource_listeners[res]
+			listeners.remove(entry)
+			if not listeners:
+				del self._resource_listeners[res]
+
+	def _changed(self, res=None):
+		"""Calls every change listener and the resource listeners of res.
+		@param res: the res whose amount or limit has changed, None if it might be any res"""
+		super(GenericStorage, self)._changed()
+		if self._resource_listeners:
+			self._check_resource_listeners(res)
+
+	def _check_resource_listeners(self, res):
+		"""Calls the resource listeners of res whose condition is met"""
+		if res is None:
+			entries = [entry for r in sorted(self._resource_listeners) for entry in self._resource_listeners[r]]
+		elif self.free_space_depends_on_other_res:
+			# the amount of the other res hasn't changed, but their free space might have
+			entries = [entry for r in sorted(self._resource_listeners) for entry in self._resource_listeners[r]
+			           if r == res or entry.amount is None]
+		else:
+			entries = list(self._resource_listeners.get(res, ()))
+
+		# listeners may add or remove resource listeners, only those of the list are called
+		for entry in entries:
+			if entry.active and entry.is_met(self):
+				call_listener(entry.callback, self)
+
+
 class SpecializedStorage(GenericStorage):
 	"""Storage where only certain resources can be stored. If you want to store a resource here,
 	you have to call add_resource_slot() before calling alter()."""
@@ -173,6 +256,7 @@ class SizedSpecializedStorage(SpecializedStorage):
 		super(SizedSpecializedStorage, self).add_resource_slot(res)
 		assert size >= 0
 		self.__slot_limits[res] = size
+		self._check_resource_listeners(res) # the free space has changed as well
 
 	def save(self, db, ownerid):
 		super(SizedSpecializedStorage, self).save(db, ownerid)
@@ -191,7 +275,7 @@ class GlobalLimitStorage(GenericStorage):
 
 	def save(self, db, ownerid):
 		super(GlobalLimitStorage, self).save(db, ownerid)
-		db("INSERT INTO storage_global_limit(object, value) VALUES(?, ?)", ownerid, self.limit)
+		db.add_row("INSERT INTO storage_global_limit(object, value) VALUES(?, ?)", ownerid, self.limit)
 
 	def load(self, db, ownerid):
 		self.limit = db.get_storage_global_limit(ownerid)
@@ -222,6 +306,8 @@ class TotalStorage(GlobalLimitStorage):
 
 	NOTE: Negative values will increase storage size, so consider using PositiveTotalStorage.
 	"""
+	free_space_depends_on_other_res = True
+
 	def __init__(self, limit):
 		super(TotalStorage, self).__init__(limit)
 
@@ -267,6 +353,7 @@ class PositiveTotalNumSlotsStorage(PositiveStorage, TotalStorage):
 		if self[res] == 0:
 			# remove empty slots, cause else they will get displayed in the ship inventory
 			del self._storage[res]
+			self._check_resource_listeners(res) # the slot is free for other res now
 		return ret
 
 	def get_free_space_for(self, res):
@@ -296,6 +383,8 @@ class PositiveSizedNumSlotStorage(PositiveSizedSlotStorage):
 	"""A storage consisting of a number of slots, all slots have the same size 'limit'.
 	Used by ships for example. With a limit of 50 and a slot num of 4, you
 	could have a max of 50 from each resource and only slotnum resources."""
+	free_space_depends_on_other_res = True
+
 	def __init__(self, limit, slotnum):
 		super(PositiveSizedNumSlotStorage, self).__init__(limit)
 		self.slotnum = slotnum
@@ -306,6 +395,8 @@ class PositiveSizedNumSlotStorage(PositiveSizedSlotStorage):
 		if not res in self._storage and len(self._storage) >= self.slotnum:
 			return amount
 		result = super(PositiveSizedNumSlotStorage, self).alter(res, amount)
+		if res not in self._storage:
+			self._check_resource_listeners(res) # the slot is free for other res now
 		return result
 
 	def get_free_space_for(self, res):
@@ -0,0 +1,215 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from collections import Mapping, MutableMapping
+
+
+class WorldTileGrid(object):
+	"""Compact storage of the tiles of the world.
+
+	Most of a map is sea, which consists of fake tiles (see WaterDummy). Instead of creating
+	a fake tile for every coordinate on load, the grid only stores which coordinates of the
+	map are covered by islands (one byte per coordinate) and creates the fake tile of a
+	coordinate when it is accessed for the first time. It is kept from then on, since
+	objects like fish are stored in tiles.
+
+	The grid is accessed through three dict-like views, which replace the dicts that have
+	been built on load before:
+	- fake_tile_map: { (x, y): fake tile } for every coordinate of the map
+	- ground_map: the part of fake_tile_map that is not covered by islands
+	- full_map: { (x, y): tile }, the island tiles where there are islands and the fake tiles
+	  everywhere else. Tiles can be replaced, added and removed (e.g. by the editor).
+
+	Coordinates (x, y) of the map are encoded as (x - left) * height + (y - top).
+	"""
+
+	def __init__(self, session, left, top, width, height, fake_tile_class, fake_tile_origin, fake_tile_size):
+		"""
+		@param left, top, width, height: area of the map
+		@param fake_tile_class: class of the tiles of the sea
+		@param fake_tile_origin: (x, y) of the first block of fake tiles
+		@param fake_tile_size: side length of the square blocks the fake tiles belong to
+		"""
+		self.session = session
+		self.left = left
+		self.top = top
+		self.width = width
+		self.height = height
+		self._fake_tile_class = fake_tile_class
+		self._fake_tile_origin = fake_tile_origin
+		self._fake_tile_size = fake_tile_size
+		self._fake_tiles = {} # { (x, y): fake tile }, filled on first access
+		self._covered = bytearray(width * height) # 1 where an island covers the sea
+		self._covered_count = 0
+		self._tiles = {} # { (x, y): tile that replaces the fake tile or None if removed }
+
+		self.fake_tile_map = FakeTileMap(self)
+		self.ground_map = SeaTileMap(self)
+		self.full_map = FullTileMap(self)
+
+	def encode(self, coords):
+		"""Returns the index of coords or -1 if coords are outside of the map"""
+		x = coords[0] - self.left
+		y = coords[1] - self.top
+		if 0 <= x < self.width and 0 <= y < self.height:
+			return x * self.height + y
+		return -1
+
+	def iter_coords(self):
+		"""Iterates over all coordinates of the map"""
+		for x in xrange(self.left, self.left + self.width):
+			for y in xrange(self.top, self.top + self.height):
+				yield (x, y)
+
+	def get_fake_tile(self, coords):
+		"""Returns the fake tile at coords, which have to be inside of the map"""
+		tile = self._fake_tiles.get(coords)
+		if tile is None:
+			size = self._fake_tile_size
+			origin_x, origin_y = self._fake_tile_origin
+			block_x = coords[0] - (coords[0] - origin_x) % size
+			block_y = coords[1] - (coords[1] - origin_y) % size
+			tile = self._fake_tile_class(self.session, block_x - 1, block_y + size - 1)
+			self._fake_tiles[coords] = tile
+		return tile
+
+	def add_island(self, ground_map):
+		"""Covers the sea with the tiles of an island. Tiles outside of the map and tiles where
+		the sea is already covered are ignored.
+		@param ground_map: dict { (x, y): tile } of the island"""
+		covered = self._covered
+		tiles = self._tiles
+		for coords, tile in ground_map.iteritems():
+			index = self.encode(coords)
+			if index >= 0 and not covered[index]:
+				covered[index] = 1
+				self._covered_count += 1
+				tiles[coords] = tile
+
+
+class FakeTileMap(Mapping):
+	"""{ (x, y): fake tile } for every coordinate of a WorldTileGrid"""
+
+	def __init__(self, grid):
+		self._grid = grid
+
+	def __contains__(self, coords):
+		return self._grid.encode(coords) >= 0
+
+	def __getitem__(self, coords):
+		if self._grid.encode(coords) < 0:
+			raise KeyError(coords)
+		return self._grid.get_fake_tile(coords)
+
+	def get(self, coords, default=None):
+		if self._grid.encode(coords) < 0:
+			return default
+		return self._grid.get_fake_tile(coords)
+
+	def __iter__(self):
+		return self._grid.iter_coords()
+
+	def __len__(self):
+		return self._grid.width * self._grid.height
+
+
+class SeaTileMap(FakeTileMap):
+	"""{ (x, y): fake tile } for every coordinate of a WorldTileGrid that isn't covered by an island"""
+
+	def __contains__(self, coords):
+		index = self._grid.encode(coords)
+		return index >= 0 and not self._grid._covered[index]
+
+	def __getitem__(self, coords):
+		if coords not in self:
+			raise KeyError(coords)
+		return self._grid.get_fake_tile(coords)
+
+	def get(self, coords, default=None):
+		if coords not in self:
+			return default
+		return self._grid.get_fake_tile(coords)
+
+	def __iter__(self):
+		covered = self._grid._covered
+		for index, coords in enumerate(self._grid.iter_coords()):
+			if not covered[index]:
+				yield coords
+
+	def __len__(self):
+		return self._grid.width * self._grid.height - self._grid._covered_count
+
+
+class FullTileMap(MutableMapping):
+	"""{ (x, y): tile } for every coordinate of a WorldTileGrid, the tiles of islands replace
+	the fake tiles. Tiles can also be set for coordinates outside of the map."""
+
+	_NOT_REPLACED = object()
+
+	def __init__(self, grid):
+		self._grid = grid
+
+	def __contains__(self, coords):
+		tile = self._grid._tiles.get(coords, self._NOT_REPLACED)
+		if tile is self._NOT_REPLACED:
+			return self._grid.encode(coords) >= 0
+		return tile is not None
+
+	def __getitem__(self, coords):
+		tile = self.get(coords)
+		if tile is None:
+			raise KeyError(coords)
+		return tile
+
+	def get(self, coords, default=None):
+		tile = self._grid._tiles.get(coords, self._NOT_REPLACED)
+		if tile is self._NOT_REPLACED:
+			if self._grid.encode(coords) < 0:
+				return default
+			return self._grid.get_fake_tile(coords)
+		return default if tile is None else tile
+
+	def __setitem__(self, coords, tile):
+		assert tile is not None
+		self._grid._tiles[coords] = tile
+
+	def __delitem__(self, coords):
+		if coords not in self:
+			raise KeyError(coords)
+		if self._grid.encode(coords) < 0:
+			del self._grid._tiles[coords]
+		else:
+			self._grid._tiles[coords] = None # the fake tile is gone as well
+
+	def __iter__(self):
+		tiles = self._grid._tiles
+		for coords in self._grid.iter_coords():
+			if tiles.get(coords, self._NOT_REPLACED) is not None:
+				yield coords
+		for coords in tiles:
+			if self._grid.encode(coords) < 0:
+				yield coords
+
+	def __len__(self):
+		tiles = self._grid._tiles
+		removed = sum(1 for tile in tiles.itervalues() if tile is None)
+		outside = sum(1 for coords in tiles if self._grid.encode(coords) < 0)
+		return self._grid.width * self._grid.height - removed + outside
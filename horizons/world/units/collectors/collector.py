@@ -143,7 +143,7 @@ class Collector(Unit):
 			# this is not in 3rd normal form since the object is saved multiple times but
 			# it preserves compatibility with old savegames this way.
 			for entry in self.job.reslist:
-				db("INSERT INTO collector_job(collector, object, resource, amount) VALUES(?, ?, ?, ?)",
+				db.add_row("INSERT INTO collector_job(collector, object, resource, amount) VALUES(?, ?, ?, ?)",
 				   self.worldid, obj_id, entry.res, entry.amount)
 
 	def load(self, db, worldid):
@@ -0,0 +1,37 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+
+from horizons.util.tickbatcher import TickBatcher
+
+
+class MovementManager(TickBatcher):
+	"""Advances the moving units of the world.
+
+	Instead of every unit scheduling its own move tick for every step, the units that are
+	due in a tick are moved in one scheduler call for that tick.
+	"""
+	log = logging.getLogger("world.units")
+
+	def _tick(self, tick):
+		for unit in self._pop_due(tick):
+			unit._move_tick()
@@ -148,7 +148,7 @@ class MovingObject(ComponentHolder, ConcreteObject):
 			# start moving in 1 tick
 			# this assures that a movement takes at least 1 tick, which is sometimes subtly
 			# assumed e.g. in the collector code
-			Scheduler().add_new_object(self._move_tick, self)
+			self.session.world.movement_manager.add(self, 1)
 
 	def _movement_finished(self):
 		self.log.debug("%s: movement finished. calling callbacks %s", self, self.move_callbacks)
@@ -158,7 +158,7 @@ class MovingObject(ComponentHolder, ConcreteObject):
 
 	@decorators.make_constants()
 	def _move_tick(self, resume=False):
-		"""Called by the scheduler, moves the unit one step for this tick.
+		"""Called by the MovementManager, moves the unit one step for this tick.
 		"""
 		assert self._next_target is not None
 
@@ -197,8 +197,7 @@ class MovingObject(ComponentHolder, ConcreteObject):
 					# technically, the ship doesn't move, but it is in the process of moving,
 					# as it will continue soon in general. Needed in border cases for add_move_callback
 					self.__is_moving = True
-					Scheduler().add_new_object(self._move_tick, self,
-					                           GAME_SPEED.TICKS_PER_SECOND * 2)
+					self.session.world.movement_manager.add(self, GAME_SPEED.TICKS_PER_SECOND * 2)
 				self.log.debug("Unit %s: path is blocked, no way around", self)
 				return
 
@@ -232,7 +231,7 @@ class MovingObject(ComponentHolder, ConcreteObject):
 		self._instance.follow(action, self._route, speed)
 
 		#self.log.debug("%s registering move tick in %s ticks", self, move_time[int(diagonal)])
-		Scheduler().add_new_object(self._move_tick, self, move_time[int(diagonal)])
+		self.session.world.movement_manager.add(self, move_time[int(diagonal)])
 
 		# check if a conditional callback becomes true
 		for cond in self._conditional_callbacks.keys(): # iterate of copy of keys to be able to delete
@@ -280,6 +279,10 @@ class MovingObject(ComponentHolder, ConcreteObject):
 	def get_move_target(self):
 		return self.path.get_move_target()
 
+	def remove(self):
+		self.session.world.movement_manager.remove(self)
+		super(MovingObject, self).remove()
+
 	def save(self, db):
 		super(MovingObject, self).save(db)
 		# NOTE: _move_action is currently not yet saved and neither is blocked_callback.
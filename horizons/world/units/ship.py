@@ -68,6 +68,8 @@ class Ship(Unit):
 	def __init(self):
 		# register ship in world
 		self.session.world.ships.append(self)
+		self.session.world.ship_grid.add(self)
+		self.session.world.checkup_hash.ship_added(self)
 		if self.in_ship_map:
 			self.session.world.ship_map[self.position.to_tuple()] = weakref.ref(self)
 
@@ -76,6 +78,8 @@ class Ship(Unit):
 
 	def remove(self):
 		self.session.world.ships.remove(self)
+		self.session.world.ship_grid.remove(self)
+		self.session.world.checkup_hash.ship_removed(self)
 		if self.session.view.has_change_listener(self.draw_health):
 			self.session.view.remove_change_listener(self.draw_health)
 		if self.in_ship_map:
@@ -119,6 +123,8 @@ class Ship(Unit):
 			# save current and next position for ship, since it will be between them
 			self.session.world.ship_map[self.position.to_tuple()] = weakref.ref(self)
 			self.session.world.ship_map[self._next_target.to_tuple()] = weakref.ref(self)
+		self.session.world.ship_grid.update(self)
+		self.session.world.checkup_hash.ship_moved(self)
 
 	def _movement_finished(self):
 		if self.in_ship_map:
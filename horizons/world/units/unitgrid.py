@@ -0,0 +1,128 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.util.shapes import Circle
+
+
+class UnitGrid(object):
+	"""Uniform grid that indexes units by their position for radius and rect queries.
+
+	The units are kept in square cells of CELL_SIZE tiles, so a query only has to look at the
+	units of the cells that overlap with the queried area. The position of a unit has to be
+	reported with update() whenever it changes.
+
+	Queries return the units in the order they have been added. That is the order of the
+	lists that have been scanned before (e.g. world.ships), which keeps results that depend
+	on the order the same in every game instance.
+	"""
+
+	CELL_SIZE = 16
+
+	def __init__(self):
+		self._cells = {} # { (cell x, cell y): set of units }
+		self._units = {} # { unit: (cell, order) }
+		self._next_order = 0
+
+	def __len__(self):
+		return len(self._units)
+
+	def __contains__(self, unit):
+		return unit in self._units
+
+	def _get_cell(self, position):
+		return (int(position.x) // self.CELL_SIZE, int(position.y) // self.CELL_SIZE)
+
+	def add(self, unit):
+		assert unit not in self._units, '%s is already in the grid' % unit
+		cell = self._get_cell(unit.position)
+		self._units[unit] = (cell, self._next_order)
+		self._next_order += 1
+		if cell in self._cells:
+			self._cells[cell].add(unit)
+		else:
+			self._cells[cell] = set([unit])
+
+	def remove(self, unit):
+		cell = self._units.pop(unit)[0]
+		units = self._cells[cell]
+		units.discard(unit)
+		if not units:
+			del self._cells[cell]
+
+	def update(self, unit):
+		"""Moves unit to the cell of its current position, if it is in the grid"""
+		entry = self._units.get(unit)
+		if entry is None:
+			return
+		cell = self._get_cell(unit.position)
+		if cell == entry[0]:
+			return
+		units = self._cells[entry[0]]
+		units.discard(unit)
+		if not units:
+			del self._cells[entry[0]]
+		self._units[unit] = (cell, entry[1])
+		if cell in self._cells:
+			self._cells[cell].add(unit)
+		else:
+			self._cells[cell] = set([unit])
+
+	def _get_candidates(self, left, top, right, bottom):
+		"""Returns the units of the cells that overlap with the given area."""
+		size = self.CELL_SIZE
+		min_x, max_x = int(left) // size, int(right) // size
+		min_y, max_y = int(top) // size, int(bottom) // size
+		if (max_x - min_x + 1) * (max_y - min_y + 1) > len(self._cells):
+			# big area, looking at the cells that exist is faster
+			return [unit for (x, y), units in self._cells.iteritems()
+			        if min_x <= x <= max_x and min_y <= y <= max_y for unit in units]
+		candidates = []
+		cells = self._cells
+		for x in xrange(min_x, max_x + 1):
+			for y in xrange(min_y, max_y + 1):
+				if (x, y) in cells:
+					candidates.extend(cells[(x, y)])
+		return candidates
+
+	def _sorted(self, units):
+		units.sort(key=lambda unit: self._units[unit][1])
+		return units
+
+	def get_units(self):
+		"""Returns all units of the grid"""
+		return self._sorted(self._units.keys())
+
+	def get_units_in_radius(self, center, radius):
+		"""Returns the units whose position is in the circle around center.
+		@param center: Point
+		@param radius: int
+		@return: list of units"""
+		circle = Circle(center, radius)
+		candidates = self._get_candidates(center.x - radius, center.y - radius,
+		                                  center.x + radius, center.y + radius)
+		return self._sorted([unit for unit in candidates if circle.contains(unit.position)])
+
+	def get_units_in_rect(self, rect):
+		"""Returns the units whose position is in rect.
+		@param rect: Rect
+		@return: list of units"""
+		candidates = self._get_candidates(rect.left, rect.top, rect.right, rect.bottom)
+		return self._sorted([unit for unit in candidates if rect.contains(unit.position)])
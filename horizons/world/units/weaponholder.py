@@ -483,8 +483,9 @@ class MovingWeaponHolder(WeaponHolder):
 		Delays movement for a number of ticks.
 		Used when shooting in specialized unit code.
 		"""
-		if Scheduler().rem_call(self, self._move_tick):
-			Scheduler().add_new_object(Callback(self._move_tick, resume=False), self, ticks)
+		movement_manager = self.session.world.movement_manager
+		if movement_manager.remove(self):
+			movement_manager.add(self, ticks)
 
 	def _move_and_attack(self, destination, not_possible_action=None, in_range_callback=None):
 		"""
@@ -529,7 +530,7 @@ class MovingWeaponHolder(WeaponHolder):
 				# finish the move before removing the move tick
 				self._movement_finished()
 				# do not execute the next move tick
-				Scheduler().rem_call(self, self._move_tick)
+				self.session.world.movement_manager.remove(self)
 
 			distance = self.position.distance(self._target.position.center)
 			dest = self._target.position.center
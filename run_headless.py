@@ -0,0 +1,276 @@
+#!/usr/bin/env python2
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Runs a game without any graphics and as fast as possible.
+
+The simulation is advanced tick by tick, independent of the wall clock and without FIFE,
+which makes this usable for benchmarks and soak tests on machines without a display.
+Afterwards, the number of ticks per second, the time spent in the callbacks of the
+different subsystems and the peak memory usage are reported.
+
+Examples:
+  ./run_headless.py --random-map=42 --ai-players=3 --ticks=20000
+  ./run_headless.py --map=development --human-ai-hybrid --ai-players=1
+  ./run_headless.py --load=path/to/savegame.sqlite --ticks=5000
+"""
+
+import gettext
+import json
+import optparse
+import os.path
+import sys
+import time
+
+try:
+	import resource
+except ImportError:
+	resource = None # not available on windows
+
+from horizons.ext.dummy import Dummy
+
+
+def mock_fife():
+	"""Catches all imports of fife and provides a dummy module (see run_tests.py)."""
+	class Importer(object):
+
+		def find_module(self, fullname, path=None):
+			if fullname.startswith('fife'):
+				return self
+			return None
+
+		def load_module(self, name):
+			return sys.modules.setdefault(name, Dummy())
+
+	sys.meta_path = [Importer()]
+
+
+def setup_horizons():
+	# this needs to run at first to avoid that other code gets a reference to
+	# the real fife module
+	mock_fife()
+
+	import horizons.globals
+	import fife
+	horizons.globals.fife = fife.fife
+
+	from run_uh import create_user_dirs
+	create_user_dirs()
+
+	import horizons.main
+	horizons.globals.db = horizons.main._create_main_db()
+
+
+def get_peak_memory():
+	"""@return: peak resident memory of this process in KiB or None if unknown"""
+	if resource is None:
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform == 'darwin':
+		peak //= 1024 # bytes instead of KiB
+	return peak
+
+
+def get_subsystem(module):
+	"""Returns the subsystem of a module, which is its package below horizons, e.g.
+	"world.units" for horizons.world.units.ship and "ai" for horizons.ai.pirate."""
+	parts = module.split('.')
+	if parts[0] == 'horizons':
+		parts = parts[1:]
+	if len(parts) > 1:
+		parts = parts[:-1]
+	return '.'.join(parts)
+
+
+def get_ai_work_statistics(session):
+	"""Returns the work of the AI players by kind of work since the game started.
+	@return: dict { player name: AIWorkScheduler.get_statistics() }"""
+	return dict((player.name, player.work_scheduler.get_statistics())
+	            for player in session.world.players if getattr(player, 'work_scheduler', None) is not None)
+
+
+def start_session(options):
+	"""Loads the game selected by options in a session without any graphics.
+	@return: Session instance"""
+	import horizons.session
+	from horizons.constants import AI
+	from horizons.extscheduler import ExtScheduler
+	from horizons.savegamemanager import SavegameManager
+	from horizons.spsession import SPSession
+	from horizons.util.color import Color
+	from horizons.util.difficultysettings import DifficultySettings
+	from horizons.util.random_map import generate_map_from_seed
+	from horizons.util.startgameoptions import StartGameOptions
+
+	class HeadlessSession(SPSession):
+		def reset_autosave(self):
+			pass # saving would distort the results
+
+	if options.load is not None:
+		game_options = StartGameOptions.create_load_game(options.load, None)
+	else:
+		if options.random_map is not None:
+			game_identifier = generate_map_from_seed(options.random_map)
+		else:
+			game_identifier = SavegameManager.get_filename_from_map_name(options.map)
+			if game_identifier is None:
+				raise ValueError("map %s doesn't exist" % options.map)
+		players = [{'id': 1, 'name': 'Player', 'color': Color[1], 'local': True,
+		            'ai': options.human_ai, 'difficulty': DifficultySettings.DEFAULT_LEVEL}]
+		for i in xrange(options.ai_players):
+			players.append({'id': i + 2, 'name': 'AI' + str(i + 1), 'color': Color[i + 2],
+			                'local': False, 'ai': True, 'difficulty': DifficultySettings.EASY_LEVEL})
+		game_options = StartGameOptions.create_ai_test(game_identifier, players)
+		game_options.trader_enabled = not options.no_trader
+		game_options.pirate_enabled = not options.no_pirate
+	AI.HUMAN_AI = options.human_ai
+
+	ExtScheduler.create_instance(Dummy)
+	view_class = horizons.session.View
+	horizons.session.View = Dummy
+	try:
+		session = HeadlessSession(horizons.globals.db, options.seed, ingame_gui_class=Dummy)
+	finally:
+		horizons.session.View = view_class
+	session.load(game_options)
+	return session
+
+
+def run(session, ticks, report_interval=None, profile_file=None):
+	"""Runs the scheduler of session for the given number of ticks as fast as possible.
+	@param report_interval: print the progress every report_interval ticks
+	@param profile_file: write the time spent in every type of scheduled call to this file
+	@return: dict with the results"""
+	from horizons.scheduler import Scheduler
+	from horizons.util.callbackprofiler import CallbackProfiler
+
+	scheduler = Scheduler()
+	profiler = CallbackProfiler()
+	scheduler.profiler = profiler
+	first_tick = scheduler.cur_tick + 1
+	start = time.time()
+	last_report = start
+	for tick in xrange(first_tick, first_tick + ticks):
+		scheduler.tick(tick)
+		if report_interval and (tick - first_tick + 1) % report_interval == 0:
+			now = time.time()
+			print 'tick %d: %.1f ticks/s' % (tick, report_interval / (now - last_report))
+			last_report = now
+	duration = time.time() - start
+	scheduler.profiler = None
+	if profile_file is not None:
+		profiler.dump(profile_file)
+
+	subsystems = {}
+	for result in profiler.get_results():
+		subsystem = subsystems.setdefault(get_subsystem(result['module']), {'seconds': 0.0, 'calls': 0})
+		subsystem['seconds'] += result['seconds']
+		subsystem['calls'] += result['calls']
+
+	return {
+		'ticks': ticks,
+		'seconds': duration,
+		'ticks_per_second': ticks / duration if duration else None,
+		'subsystems': subsystems,
+		'scheduler_seconds': duration - sum(subsystem['seconds'] for subsystem in subsystems.itervalues()),
+		'peak_memory_kib': get_peak_memory(),
+		'query_cache': session.db.query_cache.get_statistics(),
+		'ai_work': get_ai_work_statistics(session),
+	}
+
+
+def print_results(results):
+	print
+	print 'ticks:            %d' % results['ticks']
+	print 'time:             %.2fs' % results['seconds']
+	if results['ticks_per_second'] is not None:
+		print 'ticks per second: %.1f' % results['ticks_per_second']
+	if results['peak_memory_kib'] is not None:
+		print 'peak memory:      %.1f MiB' % (results['peak_memory_kib'] / 1024.0)
+	print
+	print '%-30s %10s %6s %10s' % ('subsystem', 'seconds', '%', 'calls')
+	total = results['seconds'] or 1
+	subsystems = sorted(results['subsystems'].iteritems(), key=lambda item: -item[1]['seconds'])
+	subsystems.append(('(scheduler and rest)', {'seconds': results['scheduler_seconds'], 'calls': 0}))
+	for subsystem, data in subsystems:
+		print '%-30s %10.3f %6.1f %10d' % (subsystem, data['seconds'], 100.0 * data['seconds'] / total, data['calls'])
+
+
+def get_option_parser():
+	parser = optparse.OptionParser(usage="%prog [options]")
+	parser.add_option("--map", dest="map", metavar="<map>", default="development",
+	                  help="Starts <map>. Defaults to the development map.")
+	parser.add_option("--random-map", dest="random_map", metavar="<seed>",
+	                  help="Starts a random map generated from <seed> instead.")
+	parser.add_option("--load", dest="load", metavar="<savegame>",
+	                  help="Loads the savegame at <savegame> instead.")
+	parser.add_option("--ai-players", dest="ai_players", metavar="<ai_players>", type="int", default=0,
+	                  help="Uses <ai_players> AI players besides the player (defaults to 0).")
+	parser.add_option("--human-ai-hybrid", dest="human_ai", action="store_true", default=False,
+	                  help="Makes the player controlled by the AI.")
+	parser.add_option("--no-trader", dest="no_trader", action="store_true", default=False,
+	                  help="Disables the trader.")
+	parser.add_option("--no-pirate", dest="no_pirate", action="store_true", default=False,
+	                  help="Disables the pirate.")
+	parser.add_option("--ticks", dest="ticks", metavar="<ticks>", type="int", default=10000,
+	                  help="Runs the game for <ticks> ticks (defaults to 10000).")
+	parser.add_option("--seed", dest="seed", metavar="<seed>", type="int",
+	                  help="Uses <seed> for the random number generator of the game.")
+	parser.add_option("--report-interval", dest="report_interval", metavar="<ticks>", type="int",
+	                  help="Prints the progress every <ticks> ticks.")
+	parser.add_option("--json", dest="json", metavar="<file>",
+	                  help="Writes the results as JSON to <file>.")
+	parser.add_option("--profile-callbacks", dest="profile_callbacks", metavar="<file>",
+	                  help="Writes the time spent in every type of scheduled call to <file> (.csv or .json).")
+	return parser
+
+
+def main():
+	parser = get_option_parser()
+	(options, args) = parser.parse_args()
+	if args:
+		parser.error("unexpected arguments: %s" % ' '.join(args))
+	if options.load is not None and not os.path.exists(options.load):
+		parser.error("savegame %s doesn't exist" % options.load)
+
+	gettext.install('', unicode=True) # no translations here
+	setup_horizons()
+
+	load_start = time.time()
+	try:
+		session = start_session(options)
+	except ValueError, e:
+		parser.error(str(e))
+	load_time = time.time() - load_start
+
+	results = run(session, options.ticks, options.report_interval, options.profile_callbacks)
+	results['load_seconds'] = load_time
+	session.end()
+
+	print 'loading time:     %.2fs' % load_time
+	print_results(results)
+	if options.json is not None:
+		with open(options.json, 'w') as f:
+			json.dump(results, f, indent=1, sort_keys=True)
+
+
+if __name__ == '__main__':
+	main()
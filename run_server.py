@@ -64,7 +64,7 @@ def usage(fd=sys.stdout):
 	fd.write("Usage: %s" % (sys.argv[0]))
 	if os.name == "posix":
 		fd.write(" [-d]")
-	fd.write(" -h host [-p port] [-s statistic_file]")
+	fd.write(" -h host [-p port] [-s statistic_file] [-m metrics_file]")
 	if os.name == "posix":
 		fd.write(" [-l logfile] [-P pidfile] ")
 	fd.write("\n")
@@ -72,12 +72,13 @@ def usage(fd=sys.stdout):
 host = None
 port = 2002
 statfile = None
+metricsfile = None
 daemonize = False
 logfile = None
 pidfile = None
 
 try:
-	options = 'h:p:s:'
+	options = 'h:p:s:m:'
 	if os.name == "posix":
 		options += 'dl:P:'
 	opts, args = getopt.getopt(sys.argv[1:], options)
@@ -94,6 +95,8 @@ try:
 			port = int(value)
 		if key == '-s':
 			statfile = value
+		if key == '-m':
+			metricsfile = value
 		if os.name == "posix":
 			if key == '-d':
 				daemonize = True
@@ -127,7 +130,7 @@ if pidfile:
 	file(pidfile, 'w').write(str(pid))
 
 try:
-	server = Server(host, port, statfile)
+	server = Server(host, port, statfile, metricsfile)
 	server.run()
 except network.NetworkException as e:
 	sys.stderr.write("Error: %s\n" % e)
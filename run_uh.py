@@ -147,6 +147,8 @@ def get_option_parser():
 	             help="Writes log to <filename> instead of to the uh-userdir")
 	dev_group.add_option("--profile", dest="profile", action="store_true",
 	             default=False, help="Enable profiling (for developing only).")
+	dev_group.add_option("--profile-callbacks", dest="profile_callbacks", metavar="<file>",
+	             help="Profiles the calls of the scheduler and writes the results to <file> (.csv or .json) when the game ends.")
 	dev_group.add_option("--max-ticks", dest="max_ticks", metavar="<max_ticks>", type="int",
 	             help="Run the game for <max_ticks> ticks.")
 	dev_group.add_option("--no-freeze-protection", dest="freeze_protection", action="store_false",
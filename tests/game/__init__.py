@@ -36,6 +36,7 @@ from horizons.spsession import SPSession
 from horizons.util.dbreader import DbReader
 from horizons.util.difficultysettings import DifficultySettings
 from horizons.util.savegameaccessor import SavegameAccessor
+from horizons.util.savegamewriter import SaveBuffer
 from horizons.util.startgameoptions import StartGameOptions
 from horizons.util.color import Color
 
@@ -60,7 +61,8 @@ def setup_package():
 @contextlib.contextmanager
 def _dbreader_convert_dummy_objects():
 	"""
-	Wrapper around DbReader.__call__ to convert Dummy objects to valid values.
+	Wrapper around the methods of DbReader and SaveBuffer that take sql arguments to
+	convert Dummy objects to valid values.
 
 	This is needed because some classes attempt to store Dummy objects in the
 	database, e.g. ConcreteObject with self._instance.getActionRuntime().
@@ -79,10 +81,13 @@ def _dbreader_convert_dummy_objects():
 			return func(self, command, *args)
 		return wrapper
 
-	original = DbReader.__call__
-	DbReader.__call__ = deco(DbReader.__call__)
+	originals = [(cls, name, getattr(cls, name)) for cls in (DbReader, SaveBuffer)
+	             for name in ('__call__', 'add_row')]
+	for cls, name, original in originals:
+		setattr(cls, name, deco(original))
 	yield
-	DbReader.__call__ = original
+	for cls, name, original in originals:
+		setattr(cls, name, original)
 
 
 class SPTestSession(SPSession):
@@ -93,9 +98,9 @@ class SPTestSession(SPSession):
 		super(SPTestSession, self).__init__(horizons.globals.db, rng_seed, ingame_gui_class=Dummy)
 		self.reset_autosave = mock.Mock()
 
-	def save(self, *args, **kwargs):
+	def _take_save_snapshot(self, *args, **kwargs):
 		"""
-		Wrapper around original save function to fix some things.
+		Wrapper around original snapshot function (used by all kinds of saving) to fix some things.
 		"""
 		# SavegameManager._write_screenshot tries to create a screenshot and breaks when
 		# accessing fife properties
@@ -103,7 +108,7 @@ class SPTestSession(SPSession):
 			# We need to covert Dummy() objects to a sensible value that can be stored
 			# in the database
 			with _dbreader_convert_dummy_objects():
-				return super(SPTestSession, self).save(*args, **kwargs)
+				return super(SPTestSession, self)._take_save_snapshot(*args, **kwargs)
 
 	def load(self, savegame, players, is_ai_test, is_map):
 		# keep a reference on the savegame, so we can cleanup in `end`
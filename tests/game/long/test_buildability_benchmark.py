@@ -0,0 +1,113 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import sys
+import time
+from functools import partial
+
+from horizons.util.random_map import generate_random_map
+from horizons.world.buildability.binarycache import BinaryBuildabilityCache, BitmapBuildabilityCache
+from horizons.world.buildability.terraincache import (BitmapTerrainBuildabilityCache,
+                                                      TerrainBuildabilityCache)
+
+from tests.game import game_test
+
+
+def get_cache_memory(cache):
+	"""Returns the approximate number of bytes of the coordinate collections in cache."""
+	def get_size(collection):
+		if hasattr(collection, 'rows'):
+			return sys.getsizeof(collection.rows) + sum(sys.getsizeof(row) for row in collection.rows)
+		return sys.getsizeof(collection) + sum(sys.getsizeof(coords) for coords in collection)
+
+	size = 0
+	for sizes in cache.cache.itervalues():
+		for collection in sizes.itervalues():
+			size += get_size(collection)
+	return size
+
+def build_terrain_caches(islands, cache_class):
+	start = time.time()
+	caches = [cache_class(island) for island in islands]
+	return caches, time.time() - start
+
+def intersect_and_look_up(terrain_cache, area_cache):
+	"""Intersects the terrain caches with a set based area cache and looks up the coordinates of
+	the area in land_or_coast like the AI and the settlements do.
+	@return: seconds"""
+	start = time.time()
+	for terrain_type, sizes in terrain_cache.cache.iteritems():
+		for size in sizes:
+			terrain_cache.get_buildability_intersection(terrain_type, size, area_cache)
+	land_or_coast = terrain_cache.land_or_coast
+	for coords in area_cache.coords_set:
+		coords in land_or_coast
+	return time.time() - start
+
+def fill_and_shrink(terrain_cache, cache_class):
+	"""Adds the whole island to a new cache and removes it again in chunks like settlements do.
+	@return: seconds"""
+	start = time.time()
+	cache = cache_class(terrain_cache)
+	coords_list = sorted(terrain_cache.land_or_coast)
+	cache.add_area(coords_list)
+	for i in xrange(0, len(coords_list), 50):
+		cache.remove_area(coords_list[i:i + 50])
+	return time.time() - start
+
+@game_test(mapgen=partial(generate_random_map, 7, 250, 50, 150, 120, 20), timeout=20*60)
+def test_buildability_benchmark(session, _):
+	"""
+	Compare the set based buildability caches with the bitmap based ones on the islands of a
+	big map.
+	"""
+	islands = session.world.islands
+
+	set_caches, set_time = build_terrain_caches(islands, TerrainBuildabilityCache)
+	bitmap_caches, bitmap_time = build_terrain_caches(islands, BitmapTerrainBuildabilityCache)
+	print 'terrain caches of %d islands: sets %.3fs %dkB, bitmaps %.3fs %dkB' % (len(islands),
+		set_time, sum(get_cache_memory(cache) for cache in set_caches) // 1024,
+		bitmap_time, sum(get_cache_memory(cache) for cache in bitmap_caches) // 1024)
+
+	for set_cache, bitmap_cache in zip(set_caches, bitmap_caches):
+		for terrain_type, sizes in set_cache.cache.iteritems():
+			for size, coords_set in sizes.iteritems():
+				assert coords_set == bitmap_cache.cache[terrain_type][size]
+
+	set_time = 0.0
+	bitmap_time = 0.0
+	bitmap_again_time = 0.0
+	for set_cache, bitmap_cache in zip(set_caches, bitmap_caches):
+		# a set based area cache like the ones of the settlements
+		area_cache = BinaryBuildabilityCache(set_cache)
+		area_cache.add_area([coords for (i, coords) in enumerate(sorted(set_cache.land_or_coast)) if i % 3])
+		set_time += intersect_and_look_up(set_cache, area_cache)
+		bitmap_time += intersect_and_look_up(bitmap_cache, area_cache)
+		# the set views of the bitmaps exist now, like after the first query in a game
+		bitmap_again_time += intersect_and_look_up(bitmap_cache, area_cache)
+	print 'intersections with sets and lookups: sets %.3fs, bitmaps %.3fs (%.3fs again)' % (set_time,
+		bitmap_time, bitmap_again_time)
+
+	set_time = sum(fill_and_shrink(cache, BinaryBuildabilityCache) for cache in bitmap_caches)
+	bitmap_time = sum(fill_and_shrink(cache, BitmapBuildabilityCache) for cache in bitmap_caches)
+	print 'filling and shrinking area caches: sets %.3fs, bitmaps %.3fs' % (set_time, bitmap_time)
+
+test_buildability_benchmark.long = True
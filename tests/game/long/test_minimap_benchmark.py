@@ -0,0 +1,65 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import time
+from functools import partial
+
+from horizons.gui.widgets.minimap import Minimap
+from horizons.util.random_map import generate_random_map
+
+from tests.game import game_test
+from tests.game.test_minimap import create_minimap, dump_data_per_pixel
+
+
+@game_test(mapgen=partial(generate_random_map, 7, 250, 50, 150, 120, 20), timeout=20*60)
+def test_minimap_benchmark(session, _):
+	"""
+	Compare the minimap calculation with looking up every pixel on its own (which is what the
+	minimap used to do) and measure updates of single tiles.
+	"""
+	for size in ((120, 120), (250, 250)):
+		minimap = create_minimap(session.world, *size)
+
+		start = time.time()
+		dump_data_per_pixel(minimap)
+		per_pixel_time = time.time() - start
+
+		start = time.time()
+		minimap.dump_data()
+		first_time = time.time() - start
+		start = time.time()
+		minimap.dump_data()
+		second_time = time.time() - start
+
+		print '%dx%d minimap: per pixel %.3fs, indexed %.3fs (%.3fs with index)' % (size + (per_pixel_time,
+			first_time, second_time))
+
+		# all tiles of the biggest island change within one frame
+		minimap.draw()
+		island = max(session.world.islands, key=lambda island: len(island.ground_map))
+		start = time.time()
+		for coords in island.ground_map:
+			Minimap.update(coords)
+		minimap._draw_dirty_pixels()
+		print '  update of %d tiles: %.3fs' % (len(island.ground_map), time.time() - start)
+		minimap.end()
+
+test_minimap_benchmark.long = True
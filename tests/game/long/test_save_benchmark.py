@@ -0,0 +1,93 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import tempfile
+import time
+from functools import partial
+
+import mock
+
+from horizons.util.dbreader import DbReader
+from horizons.util.random_map import generate_map_from_seed
+from horizons.util.savegamewriter import SaveBuffer, write_savegame
+from horizons.util.uhdbaccessor import read_savegame_template
+
+from tests.game import game_test, _dbreader_convert_dummy_objects
+
+
+def save_row_by_row(world, filename):
+	"""Saves the world the way it was done before DbReader.add_row: one statement per row
+	@return: seconds the game is blocked"""
+	start = time.time()
+	db = DbReader(filename)
+	read_savegame_template(db)
+	db("BEGIN")
+	with _dbreader_convert_dummy_objects():
+		with mock.patch.object(DbReader, 'add_row', DbReader.__call__):
+			world.save(db)
+	db("COMMIT")
+	db.close()
+	return time.time() - start
+
+def save_batched(world, filename):
+	"""Saves the world into a SaveBuffer and writes it with executemany
+	@return: seconds the game is blocked (when writing in the background like autosaves)"""
+	start = time.time()
+	save_buffer = SaveBuffer()
+	with _dbreader_convert_dummy_objects():
+		world.save(save_buffer)
+	snapshot_time = time.time() - start
+	write_savegame(filename, save_buffer)
+	return snapshot_time
+
+def count_rows(filename):
+	db = DbReader(filename)
+	tables = [row[0] for row in db("SELECT name FROM sqlite_master WHERE type = 'table'")]
+	rows = sum(db("SELECT COUNT(*) FROM %s" % table)[0][0] for table in tables)
+	db.close()
+	return rows
+
+@game_test(mapgen=partial(generate_map_from_seed, 2), human_player=False, ai_players=3, timeout=20*60)
+def test_save_benchmark(session, _):
+	"""
+	Let 3 AI players build up a big game, then compare the time it takes to save the world
+	row by row and with batched statements.
+	"""
+	session.run(seconds=30*60)
+
+	results = {}
+	for name, save in (('row by row', save_row_by_row), ('batched', save_batched)):
+		fd, filename = tempfile.mkstemp()
+		os.close(fd)
+		os.unlink(filename)
+		start = time.time()
+		blocked = save(session.world, filename)
+		results[name] = (time.time() - start, blocked, count_rows(filename))
+		os.unlink(filename)
+
+	for name, (seconds, blocked, rows) in sorted(results.iteritems()):
+		print '%s: %.3fs (%.3fs blocking) for %d rows' % (name, seconds, blocked, rows)
+	assert results['row by row'][2] == results['batched'][2]
+
+# this disables the test in general and only makes it being run when
+# called like this: run_tests.py -a long
+test_save_benchmark.long = True
@@ -0,0 +1,72 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.component.storagecomponent import StorageComponent
+from horizons.constants import RES
+from horizons.world.checkuphash import CheckupHash
+
+from tests.game import game_test
+
+
+def get_fresh_value(world):
+	checkup_hash = CheckupHash()
+	for ship in world.ships:
+		checkup_hash.ship_added(ship)
+	value = checkup_hash.get_value(world)
+	checkup_hash.end()
+	return value
+
+@game_test(use_fixture='traderoute')
+def test_checkup_hash_is_up_to_date(s):
+	"""
+	The incrementally updated checkup hash has to be the same as one that is created from
+	scratch, while ships move and inventories change.
+	"""
+	world = s.world
+	previous_values = []
+	for i in xrange(20):
+		s.run(seconds=2)
+		value = world.checkup_hash.get_value(world)
+		assert value == get_fresh_value(world)
+		previous_values.append(value)
+	# ships moved and goods were traded
+	assert len(set(value['ships'] for value in previous_values)) > 1
+	assert len(set(value['settlements'] for value in previous_values)) > 1
+
+	# every inventory change is noticed
+	inventory = world.player.settlements[0].get_component(StorageComponent).inventory
+	value = world.checkup_hash.get_value(world)['settlements']
+	inventory.alter(RES.GOLD, 1)
+	assert world.checkup_hash.get_value(world)['settlements'] != value
+	inventory.alter(RES.GOLD, -1)
+	assert world.checkup_hash.get_value(world)['settlements'] == value
+
+@game_test(use_fixture='traderoute')
+def test_checkup_hash_removes_its_listeners(s):
+	world = s.world
+	settlement = world.player.settlements[0]
+	inventory = settlement.get_component(StorageComponent).inventory
+	checkup_hash = CheckupHash()
+	checkup_hash.get_value(world)
+	listener = checkup_hash._settlement_listeners[settlement.worldid][1]
+	assert inventory.has_change_listener(listener)
+	checkup_hash.end()
+	assert not inventory.has_change_listener(listener)
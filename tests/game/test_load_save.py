@@ -23,7 +23,7 @@ import os
 import bz2
 import tempfile
 
-from horizons.command.building import Build
+from horizons.command.building import Build, Tear
 from horizons.command.production import ToggleActive
 from horizons.command.unit import CreateUnit
 from horizons.constants import BUILDINGS, PRODUCTION, UNITS, RES, GAME
@@ -220,6 +220,28 @@ def test_settler_save_load():
 	session.end()
 
 
+@game_test(manual_session=True)
+def test_background_save():
+	"""The game continues while the savegame is written, the savegame contains the state of
+	the moment the save was started."""
+	session, player = new_session()
+	settlement, island = settle(session)
+	lj = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+	worldid = lj.worldid
+
+	fd, filename = tempfile.mkstemp()
+	os.close(fd)
+	assert session._do_save(filename, in_background=True)
+	# changes after the snapshot don't end up in the savegame
+	Tear(lj)(player)
+	session.run(seconds=1)
+	session.end(keep_map=True)
+	assert not os.path.exists(filename + '.part')
+
+	session = load_session(filename)
+	assert WorldObject.get_object_by_id(worldid).id == BUILDINGS.LUMBERJACK
+	session.end()
+
 @game_test(manual_session=True)
 def test_savegame_upgrade():
 	"""Loads an old savegame and keeps it running for a while"""
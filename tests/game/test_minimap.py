@@ -0,0 +1,93 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import json
+
+import mock
+
+from horizons.ext.dummy import Dummy
+from horizons.gui.widgets.minimap import Minimap
+from horizons.util.shapes import Rect
+
+from tests.game import game_test
+from tests.game.utils import settle
+
+
+def create_minimap(world, width=120, height=120):
+	return Minimap(Rect.init_from_topleft_and_size(0, 0, width, height), session=None, view=None,
+	               world=world, targetrenderer=Dummy, imagemanager=Dummy, renderer=Dummy,
+	               cam_border=False, use_rotation=False, preview=True)
+
+def dump_data_per_pixel(minimap):
+	"""Calculates the data of Minimap.dump_data by looking up every pixel on its own."""
+	world = minimap.world
+	pixel_per_coord_x, pixel_per_coord_y = minimap._world_to_minimap_ratio
+	data = []
+	for x in xrange(minimap.location.width):
+		for y in xrange(minimap.location.height):
+			coords = (int(x * pixel_per_coord_x) + world.min_x + int(pixel_per_coord_x / 2),
+			          int(y * pixel_per_coord_y) + world.min_y + int(pixel_per_coord_y / 2))
+			tile = world.full_map.get(coords)
+			if tile is None or (tile.settlement is None and tile.id <= 0):
+				color = Minimap.COLORS["water"]
+			elif tile.settlement is None:
+				color = Minimap.COLORS["island"]
+			else:
+				color = tile.settlement.owner.color.to_tuple()
+			data.append([x, y] + list(color))
+	return data
+
+
+@game_test()
+def test_dump_data(s, p):
+	settle(s)
+	for size in ((120, 120), (50, 80), (300, 200)):
+		minimap = create_minimap(s.world, *size)
+		assert json.loads(minimap.dump_data()) == dump_data_per_pixel(minimap)
+
+
+@game_test()
+def test_dirty_pixels(s, p):
+	"""
+	Settling changes the color of the covered pixels, only those have to be drawn again.
+	"""
+	minimap = create_minimap(s.world)
+	minimap.draw()
+	minimap.minimap_image.rendertarget = mock.Mock()
+
+	settle(s)
+	assert minimap._dirty_coords
+	minimap._draw_dirty_pixels()
+	assert not minimap._dirty_coords
+
+	settlement_color = p.color.to_tuple()
+	changed = sum(1 for pixel in json.loads(minimap.dump_data()) if tuple(pixel[2:]) == settlement_color)
+	assert changed > 0
+	assert minimap.minimap_image.rendertarget.addPoint.call_count == changed
+	assert minimap._pixel_colors == [tuple(pixel[2:]) for pixel in dump_data_per_pixel(minimap)]
+	minimap.end()
+
+
+@game_test()
+def test_create_preview_data(s, p):
+	settle(s)
+	data = Minimap.create_preview_data(s.world, (50, 80))
+	assert json.loads(data) == dump_data_per_pixel(create_minimap(s.world, 50, 80))
@@ -0,0 +1,52 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+from unittest import TestCase
+from mock import Mock
+
+from horizons.ai.aiplayer.building import RankedEvaluators
+
+class TestRankedEvaluators(TestCase):
+
+	def make_evaluators(self, values):
+		evaluators = []
+		for value in values:
+			evaluator = Mock()
+			evaluator.value = value
+			evaluators.append(evaluator)
+		return evaluators
+
+	def test_same_order_as_sorting(self):
+		evaluators = self.make_evaluators([3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5])
+		expected = sorted(evaluators, key=lambda evaluator: evaluator.value, reverse=True)
+		self.assertEqual(expected, list(RankedEvaluators(evaluators)))
+
+	def test_partial_iteration(self):
+		evaluators = self.make_evaluators([2, 7, 1, 8])
+		ranked = RankedEvaluators(evaluators)
+		for evaluator in ranked:
+			break
+		self.assertEqual(8, evaluator.value)
+		self.assertEqual(4, len(ranked))
+		# iterating again starts over
+		self.assertEqual([8, 7, 2, 1], [evaluator.value for evaluator in ranked])
+
+	def test_empty(self):
+		self.assertEqual([], list(RankedEvaluators([])))
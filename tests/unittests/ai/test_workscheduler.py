@@ -0,0 +1,76 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+from unittest import TestCase
+from mock import Mock
+
+from horizons.ai.aiplayer.workscheduler import AIWorkScheduler
+from horizons.scheduler import Scheduler
+
+class TestAIWorkScheduler(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		self.work_scheduler = AIWorkScheduler(5)
+		Scheduler().before_ticking()
+		self.done = []
+
+	def tearDown(self):
+		self.work_scheduler.end()
+		Scheduler.destroy_instance()
+
+	def make_work(self, name, costs):
+		for i, cost in enumerate(costs):
+			self.done.append((name, i))
+			yield (name, cost)
+
+	def test_work_is_split_by_budget(self):
+		self.work_scheduler.add(self.make_work('a', [2, 2, 2, 2]))
+		self.work_scheduler.add(self.make_work('b', [1]))
+		self.work_scheduler.run()
+		self.assertEqual([('a', 0), ('a', 1), ('a', 2)], self.done)
+		self.assertTrue(self.work_scheduler.busy)
+
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual([('a', 0), ('a', 1), ('a', 2), ('a', 3), ('b', 0)], self.done)
+		self.assertFalse(self.work_scheduler.busy)
+		self.assertEqual(0, len(Scheduler().get_classinst_calls(self.work_scheduler)))
+
+	def test_expensive_steps(self):
+		self.work_scheduler.add(self.make_work('a', [5, 5, 5]))
+		self.work_scheduler.run()
+		self.assertEqual(1, len(self.done))
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual(2, len(self.done))
+		Scheduler().tick(Scheduler.FIRST_TICK_ID + 1)
+		self.assertEqual(3, len(self.done))
+		Scheduler().tick(Scheduler.FIRST_TICK_ID + 2)
+		self.assertFalse(self.work_scheduler.busy)
+		self.assertEqual(0, len(Scheduler().get_classinst_calls(self.work_scheduler)))
+
+	def test_statistics(self):
+		self.work_scheduler.add(self.make_work('a', [2, 3]))
+		self.work_scheduler.add(self.make_work('b', [1]))
+		self.work_scheduler.run()
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		statistics = self.work_scheduler.get_statistics()
+		self.assertEqual(2, statistics['a']['steps'])
+		self.assertEqual(5, statistics['a']['units'])
+		self.assertEqual(1, statistics['b']['units'])
@@ -0,0 +1,136 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import cPickle
+import time
+import zlib
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.command.building import Build
+from horizons.command.unit import Act
+from horizons.manager import CheckupHashPacket, CommandPacket
+from horizons.network import NetworkException
+from horizons.network import packets
+from horizons.network.packets import binary
+from horizons.network.packets.client import game_data
+
+
+def create_game_data(commandlist):
+	packet = game_data(CommandPacket(1234, 3, commandlist))
+	packet.sid = '0123456789abcdef0123456789abcdef'
+	return packet
+
+def create_commands(count):
+	commands = []
+	for i in xrange(count):
+		commands.append(Build(i % 40, 10 + i, 20, Mock(worldid=100000 + i), tearset=set([i, i + 1])))
+		commands.append(Act(Mock(worldid=2000 + i), 30 + i, 40))
+	return commands
+
+
+class TestBinaryPackets(TestCase):
+
+	def setUp(self):
+		packets.SafeUnpickler.set_mode(client=True)
+
+	def test_values(self):
+		values = [None, True, False, 0, -1, 127, -129, 40000, -2 ** 31, 2 ** 40, 2 ** 70, -2 ** 70,
+		          0.5, 'abc', '', u'\xe4\xf6\xfc', (1, 'a'), [1, [2, 3]], {'a': 1, 2: 'b'},
+		          set([1, 2]), frozenset(['x']), ['same', 'same', ('same', )]]
+		for value in values:
+			result = binary.loads(binary.dumps(value))
+			self.assertEqual(value, result)
+			self.assertEqual(type(value), type(result))
+
+	def test_command_packet(self):
+		packet = create_game_data(create_commands(3))
+		result = packets.unserialize(packet.serialize())
+		self.assertTrue(isinstance(result, game_data))
+		self.assertEqual(packet.sid, result.sid)
+		self.assertEqual((1234, 3), (result.data.tick, result.data.player_id))
+		self.assertEqual(len(packet.data.commandlist), len(result.data.commandlist))
+		for command, decoded in zip(packet.data.commandlist, result.data.commandlist):
+			self.assertEqual(command.__class__, decoded.__class__)
+			self.assertEqual(command.__dict__, decoded.__dict__)
+
+	def test_checkup_hash_packet(self):
+		checkup_hash = {'settlements': 2 ** 63 + 5, 'ships': 17, 'ship_count': 3, 'rngvalue': 0.25}
+		packet = game_data(CheckupHashPacket(50, 1, checkup_hash))
+		packet.sid = 'abc'
+		result = packets.unserialize(packet.serialize())
+		self.assertEqual(checkup_hash, result.data.checkup_hash)
+
+	def test_compression(self):
+		data = binary.dumps(create_game_data(create_commands(50)))
+		self.assertEqual(binary.FLAG_ZLIB, data[len(binary.MAGIC)])
+		self.assertEqual(50 * 2, len(binary.loads(data).data.commandlist))
+
+	def test_unsafe_classes(self):
+		class Unsafe(object):
+			pass
+		self.assertRaises(binary.UnsupportedType, binary.dumps, Unsafe())
+
+		# commands may only be received from the server
+		data = binary.dumps(create_game_data([]))
+		packets.SafeUnpickler.set_mode(client=False)
+		self.assertRaises(NetworkException, binary.loads, data)
+
+	def test_malformed(self):
+		data = binary.dumps(create_game_data(create_commands(1)))
+		self.assertRaises(NetworkException, binary.loads, data[:-3])
+		self.assertRaises(NetworkException, binary.loads, data + 'N')
+		self.assertRaises(NetworkException, binary.loads, binary.MAGIC + '\x00?')
+
+	def test_decompression_limit(self):
+		data = binary.MAGIC + binary.FLAG_ZLIB + zlib.compress('N' * (binary.MAX_DECOMPRESSED_SIZE + 1))
+		self.assertRaises(NetworkException, binary.loads, data)
+
+	def test_pickle_fallback(self):
+		packet = game_data(CommandPacket(1, 1, [object()]))
+		packet.sid = 'abc'
+		self.assertFalse(binary.is_binary(packet.serialize()))
+
+
+def test_benchmark():
+	"""Compares size and speed of the binary format with pickle for typical game data."""
+	packets.SafeUnpickler.set_mode(client=True)
+	for count in (0, 2, 50):
+		packet = create_game_data(create_commands(count))
+		pickled = cPickle.dumps(packet, packets.PICKLE_PROTOCOL)
+		encoded = packet.serialize()
+		for name, dumps, loads, data in (
+				('pickle', lambda: cPickle.dumps(packet, packets.PICKLE_PROTOCOL), packets.SafeUnpickler.loads, pickled),
+				('binary', packet.serialize, binary.loads, encoded)):
+			runs = 2000 if count < 50 else 100
+			start = time.time()
+			for i in xrange(runs):
+				dumps()
+			dumps_time = time.time() - start
+			start = time.time()
+			for i in xrange(runs):
+				loads(data)
+			loads_time = time.time() - start
+			print '%d commands, %s: %d bytes, %.0f dumps/s, %.0f loads/s' % (count * 2, name, len(data),
+			      runs / dumps_time, runs / loads_time)
+
+test_benchmark.long = True
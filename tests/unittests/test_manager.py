@@ -0,0 +1,91 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from unittest import TestCase
+from mock import Mock
+
+from horizons.manager import CheckupHashPacket, CommandPacket, MPCheckupHashManager, MPCommandsManager
+
+class TestMPCommandsManager(TestCase):
+
+	def setUp(self):
+		self.mpmanager = Mock()
+		self.mpmanager.get_player_count.return_value = 3
+		self.mpmanager.HASH_EVAL_DISTANCE = 2
+		self.manager = MPCommandsManager(self.mpmanager)
+
+	def test_tick_ready(self):
+		for player_id in (3, 1):
+			self.manager.add_packet(CommandPacket(10, player_id, []))
+		self.manager.add_packet(CommandPacket(11, 2, []))
+		self.assertFalse(self.manager.is_tick_ready(10))
+		self.manager.add_packet(CommandPacket(10, 2, []))
+		self.assertTrue(self.manager.is_tick_ready(10))
+		self.assertFalse(self.manager.is_tick_ready(11))
+
+	def test_packets_for_tick_are_sorted_by_player(self):
+		for player_id in (3, 1, 2):
+			self.manager.add_packet(CommandPacket(10, player_id, []))
+		packets = self.manager.get_packets_for_tick(10, remove_returned_commands=False)
+		self.assertEqual([1, 2, 3], [packet.player_id for packet in packets])
+		self.assertTrue(self.manager.is_tick_ready(10))
+
+		packets = self.manager.get_packets_for_tick(10)
+		self.assertEqual([1, 2, 3], [packet.player_id for packet in packets])
+		self.assertEqual([], self.manager.get_packets_for_tick(10))
+		self.assertFalse(self.manager.is_tick_ready(10))
+
+	def test_packets_from_player(self):
+		packets = [CommandPacket(tick, 1, []) for tick in (10, 11, 12)]
+		for packet in packets:
+			self.manager.add_packet(packet)
+		self.manager.add_packet(CommandPacket(10, 2, []))
+		self.assertEqual(packets, self.manager.get_packets_from_player(1))
+
+		self.manager.get_packets_for_tick(10)
+		self.assertEqual(packets[1:], self.manager.get_packets_from_player(1))
+		self.assertEqual([], self.manager.get_packets_from_player(2))
+		self.assertEqual([], self.manager.get_packets_from_player(5))
+
+	def test_late_packets_are_dropped(self):
+		self.manager.add_packet(CommandPacket(10, 1, []))
+		self.manager.get_packets_for_tick(10)
+		self.manager.add_packet(CommandPacket(9, 2, []))
+		self.manager.add_packet(CommandPacket(10, 2, []))
+		self.assertEqual([], self.manager.get_packets_from_player(2))
+		self.assertEqual([], self.manager.get_packets_for_tick(10, remove_returned_commands=False))
+
+
+class TestMPCheckupHashManager(TestCase):
+
+	def setUp(self):
+		self.mpmanager = Mock()
+		self.mpmanager.get_player_count.return_value = 2
+		self.mpmanager.HASH_EVAL_DISTANCE = 2
+		self.manager = MPCheckupHashManager(self.mpmanager)
+
+	def test_hash_values(self):
+		self.assertTrue(self.manager.is_tick_ready(11))
+		self.assertFalse(self.manager.is_tick_ready(12))
+		self.manager.add_packet(CheckupHashPacket(12, 1, {'a': 1}))
+		self.manager.add_packet(CheckupHashPacket(12, 2, {'a': 2}))
+		self.assertTrue(self.manager.is_tick_ready(12))
+		self.assertFalse(self.manager.are_checkup_hash_values_equal(12))
@@ -216,3 +216,74 @@ class TestScheduler(TestCase):
 		self.assertEqual(2, self.scheduler.get_remaining_ticks(instance, self.callback))
 		self.scheduler.tick(Scheduler.FIRST_TICK_ID+2)
 		self.assertEqual(1, self.scheduler.get_remaining_ticks(instance, self.callback))
+
+	def test_callback_beyond_wheel_horizon(self):
+		self.scheduler.before_ticking()
+		run_in = Scheduler.WHEEL_SIZE * 2 + 3
+		self.scheduler.add_new_object(self.callback, None, run_in=run_in)
+		for i in xrange(Scheduler.FIRST_TICK_ID, run_in - 1):
+			self.scheduler.tick(i)
+		self.assertFalse(self.callback.called)
+
+		self.scheduler.tick(run_in - 1)
+		self.callback.assert_called_once_with()
+
+	def test_execution_order_across_wheel_horizon(self):
+		self.scheduler.before_ticking()
+		order = []
+		run_in = Scheduler.WHEEL_SIZE + 5
+		# added while the target tick is beyond the wheel
+		self.scheduler.add_new_object(lambda: order.append(1), None, run_in=run_in)
+		for i in xrange(Scheduler.FIRST_TICK_ID, 10):
+			self.scheduler.tick(i)
+		# added while the target tick is within the wheel
+		self.scheduler.add_new_object(lambda: order.append(2), None, run_in=run_in - 10)
+		for i in xrange(10, run_in):
+			self.scheduler.tick(i)
+		self.assertEqual([1, 2], order)
+
+	def test_remove_object_returns_number_of_removed_calls(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		self.scheduler.add_new_object(self.callback, instance, run_in=Scheduler.WHEEL_SIZE + 1)
+		callback_obj = self.scheduler.get_classinst_calls(instance).keys()[0]
+		self.assertEqual(1, self.scheduler.rem_object(callback_obj))
+		self.assertEqual(0, self.scheduler.rem_object(callback_obj))
+		self.assertEqual({}, self.scheduler.get_classinst_calls(instance))
+
+	def test_remove_and_readd_object(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		self.scheduler.add_new_object(self.callback, instance, run_in=1)
+		callback_obj = self.scheduler.get_classinst_calls(instance).keys()[0]
+		self.scheduler.rem_object(callback_obj)
+		callback_obj.run_in = 2
+		self.scheduler.add_object(callback_obj)
+
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.assertFalse(self.callback.called)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.callback.assert_called_once_with()
+
+	def test_remove_periodic_call(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		self.scheduler.add_new_object(self.callback, instance, run_in=1, loops=-1)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.callback.reset_mock()
+
+		self.assertEqual(1, self.scheduler.rem_call(instance, self.callback))
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.assertFalse(self.callback.called)
+		self.assertEqual({}, self.scheduler.get_classinst_calls(instance))
+
+	def test_profiler_runs_calls(self):
+		profiler = Mock()
+		profiler.run.side_effect = lambda callback_obj: callback_obj.callback()
+		self.scheduler.profiler = profiler
+		self.scheduler.add_new_object(self.callback, None, run_in=0)
+		self.scheduler.add_new_object(self.callback, None, run_in=1)
+		self.scheduler.before_ticking()
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual(2, self.callback.call_count)
+		self.assertEqual(2, profiler.run.call_count)
@@ -0,0 +1,100 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from horizons.network.metrics import Histogram, ServerMetrics
+
+
+class TestHistogram(TestCase):
+
+	def test_buckets(self):
+		histogram = Histogram((1, 10, 100))
+		for value in (0.5, 1, 5, 50, 500, 1000):
+			histogram.add(value)
+		self.assertEqual([2, 1, 1, 2], histogram.counts)
+		self.assertEqual(6, histogram.count)
+		self.assertEqual(1000, histogram.max)
+
+	def test_percentile(self):
+		histogram = Histogram((1, 10, 100))
+		self.assertEqual(0.0, histogram.get_percentile(0.5))
+		for value in [0.5] * 98 + [50, 500]:
+			histogram.add(value)
+		self.assertEqual(1, histogram.get_percentile(0.5))
+		self.assertEqual(100, histogram.get_percentile(0.99))
+		self.assertEqual(500, histogram.get_percentile(1.0))
+
+
+class TestServerMetrics(TestCase):
+
+	def test_snapshot(self):
+		metrics = ServerMetrics()
+		metrics.packet_received('cmd_listgames', 100)
+		metrics.packet_received('gamedata', 50)
+		metrics.packet_received('gamedata', 50)
+		metrics.packet_sent(50, 3)
+		metrics.game_data_relayed('abc', 0.001)
+		metrics.event_serviced(0.002)
+
+		snapshot = metrics.get_snapshot({'players': 4})
+		self.assertEqual({'cmd_listgames': 1, 'gamedata': 2}, snapshot['packets_in'])
+		self.assertEqual((200, 3, 150), (snapshot['bytes_in'], snapshot['packets_out'], snapshot['bytes_out']))
+		self.assertEqual(1, snapshot['relay_latency']['count'])
+		self.assertEqual(1, snapshot['service_time']['count'])
+		self.assertTrue(snapshot['game_packet_rates']['abc'] > 0)
+		self.assertEqual(4, snapshot['players'])
+
+		# rates start again for every snapshot
+		self.assertEqual(0, metrics.get_snapshot()['game_packet_rates']['abc'])
+		metrics.game_removed('abc')
+		self.assertEqual({}, metrics.get_snapshot()['game_packet_rates'])
+
+	def test_export(self):
+		directory = tempfile.mkdtemp()
+		try:
+			filename = os.path.join(directory, 'metrics.json')
+			metrics = ServerMetrics()
+			metrics.packet_received('cmd_ok', 10)
+			metrics.export(filename)
+			with open(filename) as fd:
+				self.assertEqual({'cmd_ok': 1}, json.load(fd)['packets_in'])
+			self.assertEqual(['metrics.json'], os.listdir(directory))
+		finally:
+			shutil.rmtree(directory)
+
+	def test_export_twice(self):
+		directory = tempfile.mkdtemp()
+		try:
+			filename = os.path.join(directory, 'metrics.json')
+			metrics = ServerMetrics()
+			metrics.export(filename)
+			metrics.packet_received('cmd_ok', 10)
+			metrics.export(filename)
+			with open(filename) as fd:
+				self.assertEqual({'cmd_ok': 1}, json.load(fd)['packets_in'])
+			self.assertEqual(['metrics.json'], os.listdir(directory))
+		finally:
+			shutil.rmtree(directory)
@@ -0,0 +1,94 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.scheduler import Scheduler
+from horizons.util.callbackprofiler import CallbackProfiler
+from horizons.util.python.callback import Callback
+from horizons.util.python.weakmethod import WeakMethod
+
+
+class Base(object):
+	def tick(self):
+		pass
+
+class Derived(Base):
+	def run(self):
+		pass
+
+
+class TestCallbackProfiler(TestCase):
+
+	def setUp(self):
+		self.profiler = CallbackProfiler()
+
+	def test_callback_names(self):
+		obj = Derived()
+		get_name = self.profiler.get_callback_name
+		self.assertEqual('Base.tick', get_name(obj.tick))
+		self.assertEqual('Derived.run', get_name(obj.run))
+		self.assertEqual('Base.tick', get_name(Callback(obj.tick)))
+		self.assertEqual('Derived.run', get_name(Callback(WeakMethod(obj.run))))
+		self.assertEqual('Mock.__call__', get_name(Mock()))
+
+	def test_accounting(self):
+		obj = Derived()
+		timer = Mock()
+		Scheduler.create_instance(timer)
+		try:
+			Scheduler().profiler = self.profiler
+			Scheduler().add_new_object(obj.tick, obj, run_in=1, loops=3)
+			Scheduler().add_new_object(Callback(obj.run), obj, run_in=2)
+			Scheduler().before_ticking()
+			for tick in xrange(Scheduler.FIRST_TICK_ID, Scheduler.FIRST_TICK_ID + 5):
+				Scheduler().tick(tick)
+		finally:
+			Scheduler.destroy_instance()
+
+		results = dict((result['callback'], result) for result in self.profiler.get_results())
+		self.assertEqual(set(['Base.tick', 'Derived.run']), set(results))
+		self.assertEqual(3, results['Base.tick']['calls'])
+		self.assertEqual(1, results['Derived.run']['calls'])
+		self.assertEqual('Derived', results['Base.tick']['instance_class'])
+		self.assertEqual(__name__, results['Base.tick']['module'])
+
+	def test_dump(self):
+		self.profiler.run(Mock(callback=Derived().run, class_instance=Derived()))
+		fd, filename = tempfile.mkstemp(suffix='.csv')
+		os.close(fd)
+		try:
+			self.profiler.dump(filename)
+			with open(filename) as f:
+				lines = f.read().splitlines()
+			self.assertEqual(','.join(CallbackProfiler.FIELDS), lines[0])
+			self.assertTrue(lines[1].startswith('Derived.run,Derived,'))
+
+			self.profiler.dump_json(filename)
+			with open(filename) as f:
+				self.assertEqual(1, json.load(f)[0]['calls'])
+		finally:
+			os.remove(filename)
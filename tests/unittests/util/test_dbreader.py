@@ -0,0 +1,73 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from unittest import TestCase
+
+from horizons.util.dbreader import DbReader, QueryCache
+
+
+class TestQueryCache(TestCase):
+
+	def test_lru(self):
+		cache = QueryCache(2)
+		cache.add('a', (), [1])
+		cache.add('b', (), [2])
+		self.assertEqual([1], cache.get('a', ()))
+		cache.add('c', (), [3]) # drops b, a has been used more recently
+		self.assertEqual(2, len(cache))
+		self.assertEqual(None, cache.get('b', ()))
+		self.assertEqual([1], cache.get('a', ()))
+		self.assertEqual([3], cache.get('c', ()))
+
+	def test_statistics(self):
+		cache = QueryCache(10)
+		cache.get('a', (1, ))
+		cache.add('a', (1, ), [])
+		cache.get('a', (1, ))
+		cache.get('a', (1, ))
+		cache.get('a', (2, ))
+		self.assertEqual({'a': {'hits': 2, 'misses': 2}}, cache.get_statistics())
+
+
+class TestDbReader(TestCase):
+
+	def setUp(self):
+		self.db = DbReader(':memory:')
+		self.db("CREATE TABLE test(id INTEGER, value TEXT)")
+		self.db.execute_many("INSERT INTO test(id, value) VALUES(?, ?)", [(1, 'a'), (2, 'b')])
+
+	def tearDown(self):
+		self.db.close()
+
+	def test_cached_query(self):
+		sql = "SELECT value FROM test WHERE id = ?"
+		self.assertEqual([(u'a', )], self.db.cached_query(sql, 1))
+		self.db("UPDATE test SET value = 'c' WHERE id = 1")
+		# cached result, the data is supposed to be constant
+		self.assertEqual([(u'a', )], self.db.cached_query(sql, 1))
+		self.assertEqual([(u'b', )], self.db.cached_query(sql, 2))
+		self.assertEqual({sql: {'hits': 1, 'misses': 2}}, self.db.query_cache.get_statistics())
+
+	def test_empty_results_are_cached(self):
+		sql = "SELECT value FROM test WHERE id = ?"
+		self.assertEqual([], self.db.cached_query(sql, 3))
+		self.assertEqual([], self.db.cached_query(sql, 3))
+		self.assertEqual({sql: {'hits': 1, 'misses': 1}}, self.db.query_cache.get_statistics())
@@ -0,0 +1,95 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import copy
+import random
+from unittest import TestCase
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath, GridNodes
+from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.shapes import Circle, Point, Rect
+
+
+class TestGridNodes(TestCase):
+
+	def test_mirrors_dict(self):
+		nodes = GridNodes(0, 0, 4, 4, {(1, 1): 1.0})
+		nodes[(2, 3)] = 1.0
+		self.assertEqual(1.0, nodes.costs[nodes.encode((2, 3))])
+		del nodes[(1, 1)]
+		self.assertEqual(GridNodes.NOT_WALKABLE, nodes.costs[nodes.encode((1, 1))])
+		self.assertEqual({(2, 3): 1.0}, dict(nodes))
+
+	def test_outside_nodes(self):
+		nodes = GridNodes(0, 0, 4, 4)
+		nodes[(5, 5)] = 1.0
+		self.assertEqual(1, nodes.outside)
+		nodes.pop((5, 5))
+		self.assertEqual(0, nodes.outside)
+
+	def test_copy_is_independent(self):
+		nodes = GridNodes(0, 0, 4, 4, {(1, 1): 1.0})
+		nodes_copy = copy.copy(nodes)
+		nodes_copy[(2, 2)] = 1.0
+		self.assertFalse((2, 2) in nodes)
+		self.assertEqual(GridNodes.NOT_WALKABLE, nodes.costs[nodes.encode((2, 2))])
+		self.assertEqual(1.0, nodes_copy.costs[nodes_copy.encode((1, 1))])
+		self.assertEqual({(1, 1): 1.0, (2, 2): 1.0}, dict(nodes_copy))
+
+
+class TestGridFindPath(TestCase):
+
+	def _compare(self, nodes, source, destination, blocked=None, diagonal=False, make_target_walkable=True):
+		expected = FindPath()(source, destination, dict(nodes), blocked, diagonal, make_target_walkable)
+		result = GridFindPath()(source, destination, nodes, blocked, diagonal, make_target_walkable)
+		self.assertEqual(expected, result)
+		return result
+
+	def test_simple_path(self):
+		nodes = GridNodes(0, 0, 9, 9, [((x, y), 1.0) for x in xrange(10) for y in xrange(10)])
+		path = self._compare(nodes, Point(0, 0), Point(9, 9))
+		self.assertEqual((0, 0), path[0])
+		self.assertEqual((9, 9), path[-1])
+
+	def test_no_path(self):
+		nodes = GridNodes(0, 0, 9, 9, [((x, y), 1.0) for x in xrange(10) for y in xrange(10) if x != 5])
+		self.assertEqual(None, self._compare(nodes, Point(0, 0), Point(9, 9), diagonal=True))
+
+	def test_random_maps_same_as_findpath(self):
+		rand = random.Random(42)
+		for i in xrange(30):
+			nodes = GridNodes(0, 0, 29, 29)
+			for x in xrange(30):
+				for y in xrange(30):
+					if rand.random() < 0.75:
+						nodes[(x, y)] = 1.0
+			blocked = dict((coords, None) for coords in rand.sample(nodes.keys(), 20))
+			source = Point(rand.randint(0, 29), rand.randint(0, 29))
+			for destination in (Point(rand.randint(0, 29), rand.randint(0, 29)),
+			                    Rect.init_from_topleft_and_size(rand.randint(0, 26), rand.randint(0, 26), 2, 2),
+			                    Circle(Point(rand.randint(3, 26), rand.randint(3, 26)), 2)):
+				for diagonal in (True, False):
+					self._compare(nodes, source, destination, blocked, diagonal)
+					self._compare(nodes, source, destination, blocked, diagonal, make_target_walkable=False)
+
+	def test_source_outside_of_grid(self):
+		nodes = GridNodes(0, 0, 9, 9, [((x, y), 1.0) for x in xrange(10) for y in xrange(10)])
+		self._compare(nodes, Point(-3, 0), Point(9, 9), diagonal=True)
@@ -0,0 +1,86 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+# ###################################################
+
+import random
+from unittest import TestCase
+
+import mock
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath, GridNodes
+from horizons.util.pathfinding.hierarchicalpathfinding import HierarchicalFindPath, HierarchicalPathGraph
+from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.shapes import Point, Rect
+
+
+class TestHierarchicalFindPath(TestCase):
+
+	def setUp(self):
+		rand = random.Random(7)
+		self.nodes = GridNodes(0, 0, 119, 119)
+		for x in xrange(120):
+			for y in xrange(120):
+				# some islands in the water
+				if not ((20 <= x < 40 and 10 <= y < 90) or (60 <= x < 100 and 50 <= y < 70)) \
+				   and rand.random() < 0.95:
+					self.nodes[(x, y)] = 1.0
+		self.graph = HierarchicalPathGraph(self.nodes)
+
+	def _check_path(self, path, source, destination, blocked=()):
+		self.assertEqual(source.to_tuple(), path[0])
+		self.assertTrue(destination.contains(Point(*path[-1])))
+		for prev, cur in zip(path, path[1:]):
+			self.assertTrue(max(abs(prev[0] - cur[0]), abs(prev[1] - cur[1])) == 1)
+			self.assertTrue(cur in self.nodes)
+			self.assertFalse(cur in blocked)
+
+	def test_long_path(self):
+		source, destination = Point(2, 50), Point(115, 60)
+		path = HierarchicalFindPath(self.graph)(source, destination, self.nodes, {}, True, False)
+		self._check_path(path, source, destination)
+		shortest = FindPath()(source, destination, self.nodes, {}, True, False)
+		self.assertTrue(len(path) <= 1.25 * len(shortest))
+
+	def test_blocked_coords_are_avoided(self):
+		source, destination = Point(2, 2), Rect.init_from_topleft_and_size(110, 110, 3, 3)
+		path = HierarchicalFindPath(self.graph)(source, destination, self.nodes, {}, True, False)
+		blocked = dict.fromkeys(path[5:-5:3])
+		path = HierarchicalFindPath(self.graph)(source, destination, self.nodes, blocked, True, False)
+		self._check_path(path, source, destination, blocked)
+
+	def test_short_path_same_as_findpath(self):
+		source, destination = Point(2, 2), Point(12, 14)
+		path = HierarchicalFindPath(self.graph)(source, destination, self.nodes, {}, True, False)
+		self.assertEqual(FindPath()(source, destination, self.nodes, {}, True, False), path)
+
+	def test_unreachable_destination(self):
+		del self.nodes[(110, 110)] # nothing of the graph has been calculated yet
+		source, destination = Point(2, 2), Point(110, 110)
+		self.assertEqual(None, HierarchicalFindPath(self.graph)(source, destination, self.nodes, {}, True, False))
+
+	def test_unreachable_destination_is_searched_once(self):
+		for coords in Rect.init_from_topleft_and_size(108, 108, 4, 4).tuple_iter():
+			self.nodes.pop(coords, None)
+		self.nodes[(110, 110)] = 1.0 # a lake without access to the water
+		source, destination = Point(2, 2), Point(110, 110)
+		with mock.patch.object(GridFindPath, 'execute') as grid_execute:
+			self.assertEqual(None, HierarchicalFindPath(self.graph)(source, destination, self.nodes, {}, True, False))
+		self.assertFalse(grid_execute.called)
@@ -0,0 +1,90 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.util.minimappreviewcache import MinimapPreviewCache
+
+
+class TestMinimapPreviewCache(TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.mkdtemp()
+		self.cache_dir = os.path.join(self.dir, 'cache')
+		self.cache = MinimapPreviewCache(self.cache_dir, max_entries=3)
+		self.map_file = os.path.join(self.dir, 'test.sqlite')
+		with open(self.map_file, 'w') as f:
+			f.write('map content')
+
+	def tearDown(self):
+		MinimapPreviewCache.destroy_instance()
+		shutil.rmtree(self.dir)
+
+	def test_get_or_create(self):
+		key = self.cache.get_file_key(self.map_file, (100, 80))
+		create = Mock(return_value='[[0, 0, 1, 2, 3]]')
+		self.assertEqual('[[0, 0, 1, 2, 3]]', self.cache.get_or_create(key, create))
+		self.assertEqual('[[0, 0, 1, 2, 3]]', self.cache.get_or_create(key, create))
+		self.assertEqual(1, create.call_count)
+
+		# the previews are stored on disk
+		MinimapPreviewCache.destroy_instance()
+		cache = MinimapPreviewCache(self.cache_dir)
+		self.assertEqual('[[0, 0, 1, 2, 3]]', cache.get(key))
+
+	def test_file_keys(self):
+		key = self.cache.get_file_key(self.map_file, (100, 80))
+		self.assertNotEqual(key, self.cache.get_file_key(self.map_file, (100, 100)))
+
+		# the key only depends on the content
+		copy = os.path.join(self.dir, 'copy.sqlite')
+		shutil.copy(self.map_file, copy)
+		self.assertEqual(key, self.cache.get_file_key(copy, (100, 80)))
+
+		with open(self.map_file, 'w') as f:
+			f.write('changed map content')
+		self.assertNotEqual(key, self.cache.get_file_key(self.map_file, (100, 80)))
+
+		self.assertEqual(None, self.cache.get_file_key(os.path.join(self.dir, 'missing'), (100, 80)))
+		self.assertEqual('data', self.cache.get_or_create(None, Mock(return_value='data')))
+
+	def test_least_recently_used(self):
+		keys = [self.cache.get_key('random', i) for i in xrange(4)]
+		for i, key in enumerate(keys[:3]):
+			self.cache.set(key, str(i))
+			os.utime(self.cache._get_path(key), (1000 + i, 1000 + i))
+
+		self.assertEqual('0', self.cache.get(keys[0])) # now the most recently used one
+		self.cache.set(keys[3], '3')
+		self.assertEqual(None, self.cache.get(keys[1]))
+		self.assertEqual(['0', '2', '3'], [self.cache.get(key) for key in keys if key != keys[1]])
+
+	def test_errors_are_ignored(self):
+		with open(self.cache_dir, 'w') as f:
+			f.write('not a directory')
+		key = self.cache.get_key('random', 0)
+		self.cache.set(key, 'data')
+		self.assertEqual(None, self.cache.get(key))
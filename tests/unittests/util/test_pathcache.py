@@ -0,0 +1,114 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+# ###################################################
+
+import random
+from unittest import TestCase
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath, GridNodes
+from horizons.util.pathfinding.pathcache import PathCache, get_shape_key
+from horizons.util.shapes import Point, Rect
+
+
+class TestPathCache(TestCase):
+
+	def setUp(self):
+		self.cache = PathCache()
+
+	def test_hits_and_misses(self):
+		self.assertEqual((False, None), self.cache.get('a'))
+		self.cache.add('a', [(0, 0), (0, 1)], [(0, 0), (0, 1)])
+		self.assertEqual((True, [(0, 0), (0, 1)]), self.cache.get('a'))
+		self.cache.add('b', None, [])
+		self.assertEqual((True, None), self.cache.get('b'))
+		stats = self.cache.get_statistics()
+		self.assertEqual(2, stats['hits'])
+		self.assertEqual(1, stats['misses'])
+
+	def test_returned_path_is_a_copy(self):
+		self.cache.add('a', [(0, 0), (0, 1)], [(0, 0), (0, 1)])
+		path = self.cache.get('a')[1]
+		del path[1:]
+		self.assertEqual([(0, 0), (0, 1)], self.cache.get('a')[1])
+
+	def test_node_removed_invalidates_paths_that_reached_node(self):
+		self.cache.add('a', [(0, 0), (0, 1)], [(0, 0), (0, 1)])
+		self.cache.add('b', [(1, 0), (1, 1)], [(1, 0), (1, 1)])
+		self.cache.node_removed((0, 1))
+		self.assertFalse(self.cache.get('a')[0])
+		self.assertTrue(self.cache.get('b')[0])
+
+	def test_node_added_invalidates_all_paths(self):
+		self.cache.add('a', [(0, 0), (0, 1)], [(0, 0), (0, 1)])
+		self.cache.add('b', None, [])
+		self.cache.node_added((5, 5))
+		self.assertEqual(0, len(self.cache))
+
+	def test_size_limit(self):
+		self.cache.MAX_PATHS = 2
+		self.cache.add('a', [(0, 0)], [])
+		self.cache.add('b', [(0, 1)], [])
+		self.cache.get('a')
+		self.cache.add('c', [(0, 2)], [])
+		self.assertTrue(self.cache.get('a')[0])
+		self.assertFalse(self.cache.get('b')[0])
+
+	def test_shape_key(self):
+		self.assertEqual(get_shape_key(Point(1, 2)), get_shape_key(Point(1, 2)))
+		self.assertNotEqual(get_shape_key(Point(1, 2)), get_shape_key(Rect.init_from_borders(1, 2, 1, 2)))
+
+
+class TestGridNodesPathCache(TestCase):
+
+	def test_cached_paths_stay_valid_when_other_nodes_are_removed(self):
+		rand = random.Random(3)
+		nodes = GridNodes(0, 0, 29, 29, [((x, y), 1.0) for x in xrange(30) for y in xrange(30)
+		                                 if rand.random() < 0.8])
+		queries = [(Point(rand.randint(0, 29), rand.randint(0, 29)),
+		            Point(rand.randint(0, 29), rand.randint(0, 29))) for i in xrange(40)]
+		for i in xrange(20):
+			for (source, destination), diagonal in zip(queries, [True, False] * 20):
+				key = (get_shape_key(source), get_shape_key(destination), diagonal)
+				pathfinder = GridFindPath()
+				path = pathfinder(source, destination, nodes, diagonal=diagonal)
+				found, cached_path = nodes.path_cache.get(key)
+				if found:
+					self.assertEqual(path, cached_path)
+				else:
+					nodes.path_cache.add(key, path, pathfinder.reached_nodes)
+			for coords in rand.sample(nodes.keys(), 10):
+				del nodes[coords]
+
+	def test_adding_nodes_invalidates_cache(self):
+		nodes = GridNodes(0, 0, 9, 9, {(0, 0): 1.0})
+		nodes.path_cache.add('a', [(0, 0)], [nodes.encode((0, 0))])
+		nodes[(0, 0)] = 1.0 # no change
+		self.assertEqual(1, len(nodes.path_cache))
+		nodes[(0, 1)] = 1.0
+		self.assertEqual(0, len(nodes.path_cache))
+
+	def test_search_reports_reached_nodes(self):
+		nodes = GridNodes(0, 0, 9, 9, [((x, y), 1.0) for x in xrange(10) for y in xrange(10)])
+		pathfinder = GridFindPath()
+		path = pathfinder(Point(0, 0), Point(5, 0), nodes)
+		reached = set(nodes.decode(index) for index in pathfinder.reached_nodes)
+		self.assertTrue(reached.issuperset(path))
+		self.assertFalse((9, 9) in reached)
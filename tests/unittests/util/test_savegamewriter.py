@@ -0,0 +1,145 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.extscheduler import ExtScheduler
+from horizons.util.dbreader import DbReader
+from horizons.util.savegamewriter import SaveBuffer, SavegameWriter, write_savegame
+
+
+class TestSaveBuffer(TestCase):
+
+	def setUp(self):
+		self.buffer = SaveBuffer()
+		self.buffer("INSERT INTO metadata(name, value) VALUES(?, ?)", 'a', 1)
+		self.buffer("INSERT INTO metadata(name, value) VALUES(?, ?)", 'b', 2)
+		self.buffer("UPDATE metadata SET value = ? WHERE name = ?", 3, 'a')
+		self.buffer.execute_many("INSERT INTO metadata(name, value) VALUES(?, ?)", [('c', 4), ('d', 5)])
+		self.dir = tempfile.mkdtemp()
+		self.filename = os.path.join(self.dir, 'test.sqlite')
+
+	def tearDown(self):
+		shutil.rmtree(self.dir)
+
+	def test_batches(self):
+		db = Mock()
+		self.buffer.write(db)
+		self.assertEqual(5, self.buffer.rows)
+		self.assertEqual(3, db.execute_many.call_count)
+		self.assertEqual([('c', 4), ('d', 5)], db.execute_many.call_args[0][1])
+
+	def test_add_row(self):
+		self.buffer.add_row("INSERT INTO metadata(name, value) VALUES(?, ?)", 'e', 6)
+		self.buffer("UPDATE metadata SET value = ? WHERE name = ?", 7, 'b')
+		self.buffer.add_row("INSERT INTO metadata(name, value) VALUES(?, ?)", 'f', 8)
+		self.buffer.flush_rows()
+		db = Mock()
+		self.buffer.write(db)
+		# the queued rows are written in one batch after everything else
+		self.assertEqual(5, db.execute_many.call_count)
+		self.assertEqual([('e', 6), ('f', 8)], db.execute_many.call_args[0][1])
+
+	def test_unflushed_rows(self):
+		self.buffer.add_row("INSERT INTO metadata(name, value) VALUES(?, ?)", 'e', 6)
+		self.assertRaises(AssertionError, self.buffer.write, Mock())
+
+	def test_write_savegame(self):
+		open(self.filename, 'w').close() # existing files are replaced
+		write_savegame(self.filename, self.buffer)
+		db = DbReader(self.filename)
+		self.assertEqual([(u'a', u'3'), (u'b', u'2'), (u'c', u'4'), (u'd', u'5')],
+		                 db("SELECT name, value FROM metadata ORDER BY name"))
+		db.close()
+		self.assertEqual(['test.sqlite'], os.listdir(self.dir))
+
+	def test_failed_write_keeps_old_savegame(self):
+		open(self.filename, 'w').close()
+		self.buffer("INSERT INTO no_such_table VALUES(?)", 1)
+		self.assertRaises(Exception, write_savegame, self.filename, self.buffer)
+		self.assertEqual(0, os.path.getsize(self.filename))
+		self.assertEqual(['test.sqlite'], os.listdir(self.dir))
+
+	def test_dbreader_add_row(self):
+		db = DbReader(':memory:')
+		db("CREATE TABLE test(value INTEGER)")
+		db.add_row("INSERT INTO test(value) VALUES(?)", 1)
+		db.add_row("INSERT INTO test(value) VALUES(?)", 2)
+		self.assertEqual([], db("SELECT value FROM test"))
+		db.flush_rows()
+		self.assertEqual([(1, ), (2, )], db("SELECT value FROM test"))
+		db.flush_rows()
+		self.assertEqual(2, len(db("SELECT value FROM test")))
+		db.close()
+
+
+class TestSavegameWriter(TestCase):
+
+	def setUp(self):
+		ExtScheduler.create_instance(Mock())
+		self.buffer = SaveBuffer()
+		self.buffer("INSERT INTO metadata(name, value) VALUES(?, ?)", 'a', 1)
+		self.buffer.execute_many("INSERT INTO metadata(name, value) VALUES(?, ?)", [('b', 2), ('c', 3), ('d', 4)])
+		self.dir = tempfile.mkdtemp()
+		self.filename = os.path.join(self.dir, 'test.sqlite')
+		self.callback = Mock()
+		self.writer = SavegameWriter()
+
+	def tearDown(self):
+		self.writer.end()
+		ExtScheduler.destroy_instance()
+		shutil.rmtree(self.dir)
+
+	def test_background_writer(self):
+		self.writer.write(self.filename, self.buffer, self.callback)
+		self.writer.wait()
+		self.assertFalse(self.writer.is_writing())
+		self.callback.assert_called_once_with(True)
+		db = DbReader(self.filename)
+		self.assertEqual(4, len(db("SELECT * FROM metadata")))
+		db.close()
+
+	def test_callback_on_main_thread(self):
+		self.writer.write(self.filename, self.buffer, self.callback)
+		self.writer._thread.join()
+		# the writing thread doesn't call it, the next check of the ExtScheduler does
+		self.assertFalse(self.callback.called)
+		self.assertEqual(1, len(ExtScheduler().schedule))
+		ExtScheduler().schedule[0][1].callback()
+		self.callback.assert_called_once_with(True)
+
+	def test_failed_write(self):
+		self.buffer("INSERT INTO no_such_table VALUES(?)", 1)
+		self.writer.write(self.filename, self.buffer, self.callback)
+		self.writer.wait()
+		self.callback.assert_called_once_with(False)
+		self.assertFalse(os.path.exists(self.filename))
+
+	def test_end(self):
+		self.writer.write(self.filename, self.buffer, self.callback)
+		self.writer.end()
+		self.assertFalse(self.callback.called)
+		self.assertTrue(os.path.exists(self.filename))
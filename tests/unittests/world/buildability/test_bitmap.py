@@ -0,0 +1,145 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+
+from tests.unittests import TestCase
+
+from horizons.world.buildability.binarycache import BinaryBuildabilityCache, BitmapBuildabilityCache
+from horizons.world.buildability.bitmap import CoordsBitmap
+from horizons.world.buildability.terraincache import (BitmapTerrainBuildabilityCache,
+                                                      TerrainBuildabilityCache, TerrainRequirement)
+
+class MockTile(object):
+	def __init__(self, classes):
+		self.classes = classes
+
+class MockIsland(object):
+	def __init__(self, ground_map):
+		self.ground_map = ground_map
+
+def create_random_island(seed, width, height):
+	"""Returns an island of land, coast and water tiles (the latter are left out of the ground map)."""
+	rng = random.Random(seed)
+	ground_map = {}
+	for x in xrange(width):
+		for y in xrange(height):
+			value = rng.random()
+			if value < 0.8:
+				ground_map[(x + 10, y + 20)] = MockTile(['constructible'])
+			elif value < 0.9:
+				ground_map[(x + 10, y + 20)] = MockTile(['coastline'])
+	return MockIsland(ground_map)
+
+
+class TestCoordsBitmap(TestCase):
+	def test_set_operations(self):
+		bitmap = CoordsBitmap.init_from_coords([(2, 3), (5, 3), (4, 7)])
+		self.assertEqual((2, 3, 4, 5), (bitmap.left, bitmap.top, bitmap.width, bitmap.height))
+		self.assertEqual(3, len(bitmap))
+		self.assertEqual(set([(2, 3), (5, 3), (4, 7)]), set(bitmap))
+		self.assertTrue((5, 3) in bitmap)
+		self.assertFalse((3, 3) in bitmap)
+		self.assertFalse((6, 3) in bitmap)
+		self.assertFalse((1, 3) in bitmap)
+		self.assertFalse((2, 100) in bitmap)
+
+		bitmap.discard((5, 3))
+		bitmap.discard((100, 100))
+		bitmap.add((3, 4))
+		self.assertEqual(set([(2, 3), (3, 4), (4, 7)]), bitmap)
+		self.assertRaises(AssertionError, bitmap.add, (6, 3))
+
+	def test_combine(self):
+		a = CoordsBitmap.init_from_coords([(0, 0), (1, 0), (2, 2)])
+		b = a.copy_empty()
+		b.update([(1, 0), (2, 1)])
+
+		intersection = a.intersection(b)
+		self.assertTrue(isinstance(intersection, CoordsBitmap))
+		self.assertEqual(set([(1, 0)]), intersection)
+		self.assertEqual(set([(0, 0), (1, 0), (2, 1), (2, 2)]), a.union(b))
+		self.assertEqual(set([(0, 0), (2, 2)]), a.difference(b))
+
+		# other collections result in sets
+		other = set([(2, 2), (7, 7)])
+		self.assertEqual(set([(2, 2)]), a.intersection(other))
+		self.assertTrue(isinstance(a.intersection(other), set))
+		self.assertEqual(set([(0, 0), (1, 0), (2, 2), (7, 7)]), a.union(other))
+		self.assertEqual(set([(0, 0), (1, 0)]), a.difference(other))
+
+	def test_set_view_follows_changes(self):
+		bitmap = CoordsBitmap.init_from_coords([(0, 0), (3, 3)])
+		self.assertEqual(set([(0, 0), (3, 3)]), bitmap.as_set())
+		bitmap.add((1, 1))
+		self.assertTrue((1, 1) in bitmap)
+		self.assertEqual(set([(1, 1)]), bitmap.intersection(set([(1, 1), (2, 2)])))
+		bitmap.discard((0, 0))
+		self.assertFalse((0, 0) in bitmap)
+		bitmap.as_set()
+		bitmap.replace_rows(3, [0])
+		self.assertEqual(set([(1, 1)]), bitmap.as_set())
+
+	def test_erode(self):
+		coords = set((x, y) for x in xrange(4) for y in xrange(3))
+		coords.discard((3, 2))
+		bitmap = CoordsBitmap.init_from_coords(coords)
+		self.assertEqual(set([(0, 0), (1, 0), (2, 0), (0, 1), (1, 1)]), bitmap.erode(2, 2))
+		self.assertEqual(set((x, y) for x in xrange(3) for y in xrange(3)) - set([(2, 2)]), bitmap.erode(2, 1))
+		self.assertEqual(set([(0, 0), (1, 0), (2, 0)]), bitmap.erode(1, 3))
+		self.assertEqual(set(), bitmap.erode(5, 1))
+
+
+class TestBitmapTerrainBuildabilityCache(TestCase):
+	def test_same_as_set_based(self):
+		island = create_random_island(1, 40, 30)
+		set_cache = TerrainBuildabilityCache(island)
+		bitmap_cache = BitmapTerrainBuildabilityCache(island)
+
+		self.assertEqual(set_cache.land_or_coast, bitmap_cache.land_or_coast)
+		for terrain_type in (TerrainRequirement.LAND, TerrainRequirement.LAND_AND_COAST):
+			self.assertEqual(sorted(set_cache.cache[terrain_type]), sorted(bitmap_cache.cache[terrain_type]))
+			for size, coords_set in set_cache.cache[terrain_type].iteritems():
+				self.assertEqual(coords_set, bitmap_cache.cache[terrain_type][size])
+
+
+class TestBitmapBuildabilityCache(TestCase):
+	def test_same_as_set_based(self):
+		terrain_cache = BitmapTerrainBuildabilityCache(create_random_island(2, 30, 30))
+		set_cache = BinaryBuildabilityCache(terrain_cache)
+		bitmap_cache = BitmapBuildabilityCache(terrain_cache)
+
+		rng = random.Random(3)
+		land_or_coast = sorted(terrain_cache.land_or_coast)
+		for _ in xrange(30):
+			outside = [coords for coords in land_or_coast if coords not in set_cache.coords_set]
+			new_coords_list = rng.sample(outside, min(len(outside), rng.randint(1, 60)))
+			set_cache.add_area(new_coords_list)
+			bitmap_cache.add_area(new_coords_list)
+
+			inside = sorted(set_cache.coords_set)
+			removed_coords_list = rng.sample(inside, min(len(inside), rng.randint(1, 20)))
+			set_cache.remove_area(removed_coords_list)
+			bitmap_cache.remove_area(removed_coords_list)
+
+			self.assertEqual(sorted(set_cache.cache), sorted(bitmap_cache.cache))
+			for size in set_cache.cache:
+				self.assertEqual(set(set_cache.cache[size]), bitmap_cache.cache[size])
@@ -0,0 +1,94 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+from collections import defaultdict
+from unittest import TestCase
+
+from horizons.world.production.statehistory import StateHistoryWindow
+
+
+def get_times_naive(history, current_tick, first_tick):
+	"""Sums up the ticks of every run in [first_tick, current_tick)"""
+	runs = []
+	for tick, state in history:
+		if runs and runs[-1][0] == tick:
+			runs.pop()
+		if not runs or runs[-1][1] != state:
+			runs.append((tick, state))
+	result = defaultdict(int)
+	for i, (tick, state) in enumerate(runs):
+		next_tick = runs[i + 1][0] if i + 1 < len(runs) else current_tick
+		ticks = min(next_tick, current_tick) - max(tick, first_tick)
+		if ticks > 0:
+			result[state] += ticks
+	return result
+
+
+class TestStateHistoryWindow(TestCase):
+
+	def test_single_state(self):
+		window = StateHistoryWindow(100, [(10, 1)])
+		self.assertEqual({1: 5}, window.get_times(15, 0))
+		self.assertEqual({1: 3}, window.get_times(15, 12))
+
+	def test_window_moves(self):
+		window = StateHistoryWindow(100, [(0, 1), (10, 2), (20, 1)])
+		self.assertEqual({1: 15, 2: 10}, window.get_times(25, 0))
+		self.assertEqual({1: 10, 2: 5}, window.get_times(30, 15))
+		self.assertEqual({1: 5}, window.get_times(30, 25))
+		self.assertEqual(1, len(window))
+
+	def test_same_tick_replaces_change(self):
+		window = StateHistoryWindow(100)
+		window.add(0, 1)
+		window.add(5, 2)
+		window.add(5, 3)
+		window.add(7, 3)
+		self.assertEqual({1: 5, 3: 5}, window.get_times(10, 0))
+
+	def test_unqueried_window_is_bounded(self):
+		window = StateHistoryWindow(20)
+		for tick in xrange(0, 30000, 5):
+			window.add(tick, tick % 2)
+		self.assertTrue(len(window) <= 6)
+		self.assertEqual({0: 10, 1: 10}, window.get_times(30000, 29980))
+
+	def test_empty(self):
+		self.assertEqual({}, StateHistoryWindow(100).get_times(10, 0))
+
+	def test_random_histories(self):
+		rng = random.Random(42)
+		for i in xrange(50):
+			window = StateHistoryWindow(30)
+			history = []
+			tick = first_tick = 0
+			for j in xrange(100):
+				tick += rng.choice((0, 0, 1, 3, 10))
+				if rng.random() < 0.7:
+					state = rng.randint(0, 3)
+					window.add(tick, state)
+					history.append((tick, state))
+				elif history:
+					first_tick = max(first_tick, tick - rng.randint(0, 30))
+					expected = get_times_naive(history, tick, first_tick)
+					result = dict((k, v) for k, v in window.get_times(tick, first_tick).iteritems() if v)
+					self.assertEqual(dict(expected), result)
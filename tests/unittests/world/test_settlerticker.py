@@ -0,0 +1,90 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+from unittest import TestCase
+from mock import Mock
+
+from horizons.constants import RES
+from horizons.scheduler import Scheduler
+from horizons.world.settlerticker import SettlerTicker
+
+class TestSettlerTicker(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		self.settlement = Mock()
+		self.inventory = self.settlement.owner.get_component.return_value.inventory
+		self.ticker = SettlerTicker(self.settlement)
+		Scheduler().before_ticking()
+
+	def tearDown(self):
+		self.ticker.end()
+		Scheduler.destroy_instance()
+
+	def make_settler(self, taxes):
+		settler = Mock()
+		settler.get_tick_interval.return_value = 3
+		settler.collect_tax.return_value = taxes
+		return settler
+
+	def test_taxes_are_collected_with_one_alter(self):
+		settlers = [self.make_settler(taxes) for taxes in (1, 2, 4)]
+		for settler in settlers:
+			self.ticker.add(settler, 1)
+		self.assertEqual(1, len(Scheduler().get_classinst_calls(self.ticker)))
+
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		for settler in settlers:
+			settler.collect_tax.assert_called_once_with()
+			settler.inhabitant_check.assert_called_once_with()
+			settler.level_check.assert_called_once_with()
+		self.inventory.alter.assert_called_once_with(RES.GOLD, 7)
+
+	def test_settlers_keep_their_interval(self):
+		first, second = self.make_settler(1), self.make_settler(1)
+		self.ticker.add(first, 1)
+		self.ticker.add(second, 2)
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual(3, self.ticker.get_remaining_ticks(first))
+		self.assertEqual(1, self.ticker.get_remaining_ticks(second))
+
+		for tick in xrange(Scheduler.FIRST_TICK_ID + 1, Scheduler.FIRST_TICK_ID + 8):
+			Scheduler().tick(tick)
+		self.assertEqual(3, first.collect_tax.call_count)
+		self.assertEqual(3, second.collect_tax.call_count)
+
+	def test_remove(self):
+		settler = self.make_settler(1)
+		self.ticker.add(settler, 1)
+		self.assertTrue(self.ticker.remove(settler))
+		self.assertFalse(self.ticker.remove(settler))
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		self.assertFalse(settler.collect_tax.called)
+		self.assertFalse(self.inventory.alter.called)
+
+	def test_remove_during_pass(self):
+		settler = self.make_settler(1)
+		settler.level_check.side_effect = lambda: self.ticker.remove(settler)
+		self.ticker.add(settler, 1)
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual(None, self.ticker.get_remaining_ticks(settler))
+		for tick in xrange(Scheduler.FIRST_TICK_ID + 1, Scheduler.FIRST_TICK_ID + 5):
+			Scheduler().tick(tick)
+		self.assertEqual(1, settler.collect_tax.call_count)
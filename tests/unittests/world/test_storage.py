@@ -22,6 +22,8 @@
 import sys
 from unittest import TestCase
 
+from mock import Mock
+
 from horizons.world.storage import (GenericStorage, SpecializedStorage, SizedSpecializedStorage,
                                     TotalStorage, GlobalLimitStorage, PositiveStorage,
                                     PositiveTotalStorage, PositiveSizedSlotStorage,
@@ -180,3 +182,63 @@ class TestOtherStorages(TestCase):
 		self.assertEqual(s.alter(3, 5), 0)
 
 		self.assertEqual(s.alter(4, 1), 1)
+
+
+class TestResourceListeners(TestCase):
+
+	def test_amount(self):
+		s = PositiveSizedSlotStorage(10)
+		listener = Mock()
+		s.add_resource_listener(1, listener, amount=3)
+		s.alter(1, 2)
+		s.alter(2, 5)
+		self.assertEqual(0, listener.call_count)
+		s.alter(1, 1)
+		self.assertEqual(1, listener.call_count)
+
+		s.discard_resource_listener(listener)
+		self.assertFalse(s.has_resource_listener(listener))
+		s.alter(1, 1)
+		self.assertEqual(1, listener.call_count)
+
+	def test_free_space(self):
+		s = PositiveSizedSlotStorage(10)
+		s.alter(1, 10)
+		full = Mock()
+		not_full = Mock()
+		s.add_resource_listener(1, not_full, free_space=2)
+		s.add_resource_listener(2, full, free_space_below=3)
+		s.alter(1, -1)
+		self.assertEqual(0, not_full.call_count)
+		s.alter(1, -1)
+		self.assertEqual(1, not_full.call_count)
+
+		s.alter(2, 7)
+		self.assertEqual(0, full.call_count)
+		s.adjust_limit(-1)
+		self.assertEqual(1, full.call_count)
+
+	def test_total_storage(self):
+		s = PositiveTotalStorage(10)
+		listener = Mock()
+		s.alter(1, 9)
+		s.add_resource_listener(2, listener, free_space=3)
+		s.alter(1, -5)
+		self.assertEqual(1, listener.call_count)
+
+	def test_listener_removes_others(self):
+		s = GenericStorage()
+		second = Mock()
+		def first():
+			s.discard_resource_listener(second)
+		s.add_resource_listener(1, first, amount=1)
+		s.add_resource_listener(1, second, amount=1)
+		s.alter(1, 1)
+		self.assertEqual(0, second.call_count)
+
+	def test_dead_listener(self):
+		s = GenericStorage()
+		listener = Mock(side_effect=ReferenceError)
+		s.add_resource_listener(1, listener, amount=1)
+		s.alter(1, 1) # doesn't raise
+		self.assertEqual(1, listener.call_count)
@@ -0,0 +1,94 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from unittest import TestCase
+
+from horizons.world.tilemap import WorldTileGrid
+
+
+class FakeTile(object):
+	instances = 0
+
+	def __init__(self, session, x, y):
+		FakeTile.instances += 1
+		self.x = x
+		self.y = y
+
+
+class TestWorldTileGrid(TestCase):
+
+	def setUp(self):
+		FakeTile.instances = 0
+		# map from (-2, -2) to (7, 7), fake tiles in blocks of 5 starting at (-4, -4)
+		self.grid = WorldTileGrid(None, -2, -2, 10, 10, FakeTile, (-4, -4), 5)
+		self.island_ground_map = dict(((x, y), 'island') for x in xrange(2, 5) for y in xrange(2, 4))
+		self.grid.add_island(self.island_ground_map)
+
+	def test_fake_tiles_are_created_on_access(self):
+		self.assertEqual(100, len(self.grid.fake_tile_map))
+		self.assertEqual(0, FakeTile.instances)
+		tile = self.grid.fake_tile_map[(0, 0)]
+		self.assertTrue(tile is self.grid.full_map[(0, 0)])
+		self.assertTrue(tile is self.grid.ground_map.get((0, 0)))
+		self.assertEqual(1, FakeTile.instances)
+		# fake tiles are positioned at the bottom left of their block
+		self.assertEqual((-5, 0), (tile.x, tile.y))
+		tile = self.grid.fake_tile_map[(1, 6)]
+		self.assertEqual((0, 10), (tile.x, tile.y))
+
+	def test_sea(self):
+		ground_map = self.grid.ground_map
+		self.assertEqual(94, len(ground_map))
+		self.assertEqual(94, len(list(ground_map)))
+		self.assertTrue((1, 2) in ground_map)
+		self.assertFalse((2, 2) in ground_map)
+		self.assertFalse((8, 0) in ground_map)
+		self.assertEqual(None, ground_map.get((2, 2)))
+		self.assertRaises(KeyError, lambda: ground_map[(2, 2)])
+
+	def test_full_map(self):
+		full_map = self.grid.full_map
+		self.assertEqual(100, len(full_map))
+		self.assertEqual('island', full_map[(2, 2)])
+		self.assertEqual(None, full_map.get((-3, 0)))
+		self.assertFalse((-3, 0) in full_map)
+		self.assertEqual(set(self.grid.fake_tile_map), set(full_map))
+
+		full_map[(2, 2)] = 'changed'
+		full_map[(20, 20)] = 'outside'
+		del full_map[(0, 0)]
+		self.assertEqual('changed', full_map[(2, 2)])
+		self.assertEqual('outside', full_map[(20, 20)])
+		self.assertFalse((0, 0) in full_map)
+		self.assertRaises(KeyError, lambda: full_map[(0, 0)])
+		self.assertEqual(100, len(full_map))
+		self.assertEqual(100, len(list(full_map)))
+
+		# the sea isn't changed
+		self.assertTrue((0, 0) in self.grid.ground_map)
+		self.assertFalse((2, 2) in self.grid.ground_map)
+
+	def test_islands_dont_overlap(self):
+		self.grid.add_island({(2, 2): 'other island', (2, 4): 'other island', (20, 20): 'other island'})
+		self.assertEqual('island', self.grid.full_map[(2, 2)])
+		self.assertEqual('other island', self.grid.full_map[(2, 4)])
+		self.assertFalse((20, 20) in self.grid.full_map)
+		self.assertEqual(93, len(self.grid.ground_map))
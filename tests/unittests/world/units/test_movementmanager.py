@@ -0,0 +1,73 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from unittest import TestCase
+from mock import Mock
+
+from horizons.scheduler import Scheduler
+from horizons.world.units.movementmanager import MovementManager
+
+class TestMovementManager(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		self.manager = MovementManager()
+		Scheduler().before_ticking()
+
+	def tearDown(self):
+		self.manager.end()
+		Scheduler.destroy_instance()
+
+	def test_units_are_moved_in_order(self):
+		order = []
+		units = [Mock() for i in xrange(3)]
+		for i, unit in enumerate(units):
+			unit._move_tick.side_effect = lambda i=i: order.append(i)
+			self.manager.add(unit, 2)
+
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual([], order)
+		Scheduler().tick(Scheduler.FIRST_TICK_ID + 1)
+		self.assertEqual([0, 1, 2], order)
+
+	def test_one_scheduler_call_per_tick(self):
+		for i in xrange(10):
+			self.manager.add(Mock(), 3)
+		self.assertEqual(1, len(Scheduler().get_classinst_calls(self.manager)))
+
+	def test_remove(self):
+		unit = Mock()
+		self.manager.add(unit, 1)
+		self.assertTrue(self.manager.remove(unit))
+		self.assertFalse(self.manager.remove(unit))
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		self.assertFalse(unit._move_tick.called)
+
+	def test_readd_while_moving(self):
+		unit = Mock()
+		unit._move_tick.side_effect = lambda: self.manager.add(unit, 2)
+		self.manager.add(unit, 1)
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual(1, unit._move_tick.call_count)
+		self.assertEqual(2, self.manager.get_remaining_ticks(unit))
+		Scheduler().tick(Scheduler.FIRST_TICK_ID + 1)
+		Scheduler().tick(Scheduler.FIRST_TICK_ID + 2)
+		self.assertEqual(2, unit._move_tick.call_count)
@@ -0,0 +1,83 @@
+# ###################################################
+# Copyright (C) 2008-2013 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+from unittest import TestCase
+
+from horizons.util.shapes import Circle, Point, Rect
+from horizons.world.units.unitgrid import UnitGrid
+
+class Unit(object):
+	def __init__(self, x, y):
+		self.position = Point(x, y)
+
+class TestUnitGrid(TestCase):
+
+	def setUp(self):
+		self.grid = UnitGrid()
+		self.rng = random.Random(4)
+		self.units = []
+		for i in xrange(200):
+			self.add_unit()
+
+	def add_unit(self):
+		unit = Unit(self.rng.randint(0, 150), self.rng.randint(0, 150))
+		self.units.append(unit)
+		self.grid.add(unit)
+
+	def check_queries(self):
+		for i in xrange(20):
+			center = Point(self.rng.randint(-10, 160), self.rng.randint(-10, 160))
+			radius = self.rng.choice([0, 1, 5, 15, 40, 300])
+			circle = Circle(center, radius)
+			expected = [unit for unit in self.units if circle.contains(unit.position)]
+			self.assertEqual(expected, self.grid.get_units_in_radius(center, radius))
+
+			rect = Rect.init_from_topleft_and_size(center.x, center.y, radius, radius // 2)
+			expected = [unit for unit in self.units if rect.contains(unit.position)]
+			self.assertEqual(expected, self.grid.get_units_in_rect(rect))
+		self.assertEqual(self.units, self.grid.get_units())
+
+	def test_queries(self):
+		self.check_queries()
+
+	def test_moving_units(self):
+		for i in xrange(10):
+			for unit in self.rng.sample(self.units, 50):
+				unit.position = Point(unit.position.x + self.rng.randint(-20, 20),
+				                      unit.position.y + self.rng.randint(-20, 20))
+				self.grid.update(unit)
+			self.check_queries()
+
+	def test_add_and_remove(self):
+		for i in xrange(5):
+			for unit in self.rng.sample(self.units, 20):
+				self.units.remove(unit)
+				self.grid.remove(unit)
+			for j in xrange(10):
+				self.add_unit()
+			self.check_queries()
+		self.assertEqual(len(self.units), len(self.grid))
+
+	def test_update_of_other_units(self):
+		unit = Unit(1, 1)
+		self.grid.update(unit)
+		self.assertFalse(unit in self.grid)